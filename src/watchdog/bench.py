@@ -0,0 +1,428 @@
+"""Benchmarks for the health-cycle hot path.
+
+Probes are replaced by fakes with configurable delay and loss so the numbers
+reflect the daemon's own overhead, not the network. Run with
+``python -m watchdog.bench --output bench.json`` and compare two runs with
+``--baseline old.json``. Startup is measured in fresh interpreters, from
+process start to the end of the first health cycle.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from . import connectivity
+from .config import Config
+from .connectivity import ConnectivitySnapshot, DnsResult, HttpResult, LinkMetrics, PingResult
+from .gateway_probe import GatewayResult
+from .metrics import HealthWindow, classify
+
+BENCH_VERSION = 1
+# Metrics compared against a baseline; True when larger is better.
+_REGRESSION_KEYS = {
+    ("cycle", "p95_ms"): False,
+    ("classify", "ops_per_sec"): True,
+    ("startup", "cached", "time_to_first_cycle_ms"): False,
+    ("peak_rss_kb",): False,
+}
+
+
+@contextmanager
+def fake_backends(delay_ms: float = 0.0, loss: float = 0.0, seed: int = 0) -> Iterator[None]:
+    """Swap the probe backends in :mod:`watchdog.connectivity` for fakes.
+
+    Each fake waits ``delay_ms`` and fails with probability ``loss``; the HTTP
+    fake blocks a probe-pool thread like the real client does.
+    """
+    rng = random.Random(seed)
+    delay = delay_ms / 1000.0
+
+    async def ping(hosts, timeout_ms, icmp, interface=None):
+        await asyncio.sleep(delay)
+        out = []
+        for h in hosts:
+            ok = rng.random() >= loss
+            out.append(PingResult(host=h, success=ok, latency_ms=delay_ms if ok else None, sent=1,
+                                  received=int(ok), loss_pct=0.0 if ok else 100.0))
+        return out
+
+    async def dns(hostname, timeout_ms, servers=None, interface=None):
+        await asyncio.sleep(delay)
+        ok = rng.random() >= loss
+        return DnsResult(hostname=hostname, success=ok, latency_ms=delay_ms if ok else None)
+
+    def http(url, timeout_ms, interface=None):
+        time.sleep(delay)
+        ok = rng.random() >= loss
+        return HttpResult(url=url, success=ok, latency_ms=delay_ms if ok else None, status=204 if ok else None)
+
+    async def link(interface, backend="auto"):
+        # -50..-59 dBm: jitters like a real link but stays clear of signal.rssi_degraded, so the
+        # link alone never starts a recovery tier; only ``loss`` does.
+        return LinkMetrics(rssi=-50 - int(rng.random() * 10), bitrate_mbps=72.2, source="bench")
+
+    async def gateway(cfg):
+        await asyncio.sleep(delay)
+        ok = rng.random() >= loss
+        return GatewayResult(gateway="192.168.1.1", operstate="up", address="192.168.1.50", arp_ok=ok,
+                             arp_source="probe", icmp_ok=ok, latency_ms=delay_ms if ok else None)
+
+    saved = {name: getattr(connectivity, name) for name in ("ping_hosts_async", "dns_lookup_async", "http_probe",
+                                                            "_link_metrics_async", "_gateway_probe_async")}
+    connectivity.ping_hosts_async = ping
+    connectivity.dns_lookup_async = dns
+    connectivity.http_probe = http
+    connectivity._link_metrics_async = link
+    connectivity._gateway_probe_async = gateway
+    try:
+        yield
+    finally:
+        for name, fn in saved.items():
+            setattr(connectivity, name, fn)
+
+
+class _SpawnCounter:
+    """Count child processes started through :class:`subprocess.Popen`.
+
+    asyncio subprocesses go through Popen as well, so this covers every
+    command the recovery steps and probe fallbacks run.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self._orig = subprocess.Popen._execute_child  # type: ignore[attr-defined]
+
+    def __enter__(self) -> "_SpawnCounter":
+        orig = self._orig
+
+        def counting(popen, *args, **kwargs):
+            self.count += 1
+            return orig(popen, *args, **kwargs)
+
+        subprocess.Popen._execute_child = counting  # type: ignore[attr-defined]
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        subprocess.Popen._execute_child = self._orig  # type: ignore[attr-defined]
+
+
+def _io_syscalls() -> Optional[int]:
+    """read()+write() style syscalls made so far, from /proc/self/io."""
+    try:
+        with open("/proc/self/io") as f:
+            fields = dict(line.split(":", 1) for line in f)
+        return int(fields["syscr"]) + int(fields["syscw"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _percentiles(samples_ms: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples_ms)
+
+    def pct(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 4)
+
+    return {
+        "mean_ms": round(statistics.fmean(ordered), 4),
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "max_ms": round(ordered[-1], 4),
+    }
+
+
+def bench_cycle(cycles: int, delay_ms: float, loss: float, history_size: int, seed: int = 0) -> Dict[str, Any]:
+    """End-to-end ``InterfaceMonitor.run_cycle`` latency with fake probes.
+
+    Covers gather, classify, record_health/maybe_escalate, the status/metrics
+    writes and the action history, with recovery commands in dry-run.
+    """
+    from .status import close_action_history
+    from .supervisor import InterfaceMonitor
+
+    with tempfile.TemporaryDirectory(prefix="wd-bench-") as tmp:
+        cfg = Config.from_dict({
+            "interface": "bench0",
+            "history_size": history_size,
+            "paths": {"status_json": f"{tmp}/status.json", "state_dir": tmp, "action_history": f"{tmp}/history.log",
+                      "status_shm": f"{tmp}/status.bin"},
+            "features": {"dry_run": True, "prometheus_textfile": f"{tmp}/wd.prom"},
+        })
+        monitor = InterfaceMonitor(cfg)
+        timings: List[float] = []
+        try:
+            with fake_backends(delay_ms, loss, seed), _SpawnCounter() as spawns:
+
+                async def run() -> Optional[int]:
+                    try:
+                        await monitor.run_cycle()  # warm-up: opens files, maps the ring
+                        spawns.count = 0
+                        before = _io_syscalls()
+                        for _ in range(cycles):
+                            t0 = time.perf_counter()
+                            await monitor.run_cycle()
+                            timings.append((time.perf_counter() - t0) * 1000.0)
+                        after = _io_syscalls()
+                    finally:
+                        monitor.close()  # cancels a pending verification on its own loop
+                    return None if before is None or after is None else after - before
+
+                io_calls = asyncio.run(run())
+        finally:
+            close_action_history()
+    result: Dict[str, Any] = {"cycles": cycles, "probe_delay_ms": delay_ms, "loss": loss, **_percentiles(timings)}
+    # Each timed cycle minus the injected probe delay is the daemon's own cost.
+    result["overhead_p50_ms"] = round(max(0.0, result["p50_ms"] - delay_ms), 4)
+    result["spawns_per_cycle"] = round(spawns.count / cycles, 4)
+    result["io_syscalls_per_cycle"] = None if io_calls is None else round(io_calls / cycles, 2)
+    return result
+
+
+def bench_classify(history_size: int, iterations: int, seed: int = 0) -> Dict[str, Any]:
+    """Throughput of :func:`classify` against a full window of ``history_size``."""
+    rng = random.Random(seed)
+    cfg = Config.from_dict({"history_size": history_size})
+    window = HealthWindow(history_size, cfg.history_horizons)
+    snapshots = [
+        ConnectivitySnapshot(
+            ping_results=[PingResult(host=h, success=rng.random() > 0.1, latency_ms=5.0) for h in cfg.hosts.ping],
+            dns_result=DnsResult(hostname=cfg.hosts.dns_lookup, success=True, latency_ms=5.0),
+            http_result=None,
+            link=LinkMetrics(rssi=-60, bitrate_mbps=72.2),
+        )
+        for _ in range(64)
+    ]
+    for i in range(history_size):
+        classify(cfg, snapshots[i % 64], window)
+    t0 = time.perf_counter()
+    for i in range(iterations):
+        classify(cfg, snapshots[i % 64], window)
+    elapsed = time.perf_counter() - t0
+    return {
+        "history_size": history_size,
+        "iterations": iterations,
+        "ops_per_sec": round(iterations / elapsed, 1),
+        "us_per_op": round(elapsed / iterations * 1e6, 3),
+    }
+
+
+# Runs in a fresh interpreter: times the daemon's own imports, config load and first cycle.
+_STARTUP_SCRIPT = """
+import json, sys, time
+marks = {"start": time.monotonic()}
+import watchdog.main
+marks["imported"] = time.monotonic()
+from watchdog.config import load_config
+cfg = load_config(sys.argv[1], sys.argv[2] or None)
+marks["config"] = time.monotonic()
+yaml_imported = "yaml" in sys.modules  # False exactly when the config came from the cache
+if "--no-cycle" in sys.argv:
+    print(json.dumps({**marks, "yaml_imported": yaml_imported}))
+    sys.exit(0)
+import asyncio
+from watchdog.bench import fake_backends
+from watchdog.supervisor import InterfaceMonitor
+excluded = time.monotonic() - marks["config"]
+
+async def first_cycle():
+    monitor = InterfaceMonitor(cfg)
+    try:
+        await monitor.run_cycle()
+        marks["first_cycle"] = time.monotonic() - excluded
+    finally:
+        monitor.close()  # while the loop still runs: it may own tasks to cancel
+
+with fake_backends():
+    asyncio.run(first_cycle())
+print(json.dumps({**marks, "yaml_imported": yaml_imported}))
+"""
+
+
+def _startup_child(config_path: str, cache_dir: Optional[str], profile: bool = False) -> Tuple[Dict[str, Any], str]:
+    argv = [sys.executable, "-c", _STARTUP_SCRIPT, config_path, cache_dir or ""]
+    if profile:
+        argv[1:1] = ["-X", "importtime"]
+        argv.append("--no-cycle")  # keeps the bench's own imports out of the report
+    spawned = time.monotonic()  # CLOCK_MONOTONIC is system-wide, so the child's marks compare directly
+    proc = subprocess.run(argv, capture_output=True, text=True, check=True, env=_child_env())
+    marks = json.loads(proc.stdout.strip().splitlines()[-1])
+    yaml_imported = bool(marks.pop("yaml_imported"))
+    phases = {
+        "interpreter_ms": marks["start"] - spawned,
+        "imports_ms": marks["imported"] - marks["start"],
+        "config_ms": marks["config"] - marks["imported"],
+    }
+    if "first_cycle" in marks:
+        phases["first_cycle_ms"] = marks["first_cycle"] - marks["config"]
+        phases["time_to_first_cycle_ms"] = marks["first_cycle"] - spawned
+    return {**{k: round(v * 1000.0, 2) for k, v in phases.items()}, "yaml_imported": yaml_imported}, proc.stderr
+
+
+def _child_env() -> Dict[str, str]:
+    import os
+
+    import watchdog
+
+    env = dict(os.environ)
+    src = os.path.dirname(os.path.dirname(os.path.abspath(watchdog.__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (src, env.get("PYTHONPATH")) if p)
+    return env
+
+
+def _bench_config(tmp: str) -> str:
+    path = f"{tmp}/watchdog.json"  # JSON is valid YAML, and avoids importing yaml here
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "interface": "bench0",
+            "paths": {"status_json": f"{tmp}/status.json", "state_dir": tmp, "action_history": f"{tmp}/history.log",
+                      "status_shm": f"{tmp}/status.bin"},
+            "features": {"dry_run": True},
+            "escalation": {"tiers": [{"name": "refresh_dhcp"}]},
+        }, f)
+    return path
+
+
+def bench_startup(runs: int = 3, config_path: Optional[str] = None) -> Dict[str, Any]:
+    """Process start to the end of the first health cycle, fake probes, without and with the config cache.
+
+    Each phase is the median over ``runs`` fresh interpreters; ``yaml_imported``
+    is True if any of them had to load the YAML parser.
+    """
+    out: Dict[str, Any] = {"runs": runs}
+    with tempfile.TemporaryDirectory(prefix="wd-startup-") as tmp:
+        path = config_path or _bench_config(tmp)
+        for label, cache_dir in (("cold", None), ("cached", f"{tmp}/cache")):
+            if cache_dir:
+                _startup_child(path, cache_dir)  # fill the cache
+            samples = [_startup_child(path, cache_dir)[0] for _ in range(runs)]
+            out[label] = {k: round(statistics.median(s[k] for s in samples), 2)
+                          for k in samples[0] if k != "yaml_imported"}
+            out[label]["yaml_imported"] = any(s["yaml_imported"] for s in samples)
+    return out
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, float, float]]:
+    """``-X importtime`` output as (module, self_ms, cumulative_ms)."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            self_us, cum_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue  # the header line
+        rows.append((fields[2].strip(), self_us / 1000.0, cum_us / 1000.0))
+    return rows
+
+
+# Loaded on first use only (the run loop, or a config switch such as history
+# compression, an HTTP(S) probe, metrics_listen, events or watch_config), never
+# by importing watchdog.main and loading a config.
+DEFERRED_MODULES = (
+    "asyncio", "gzip", "ssl", "logging.handlers",
+    "watchdog.supervisor", "watchdog.connectivity", "watchdog.dns_probe", "watchdog.icmp",
+    "watchdog.gateway_probe", "watchdog.nl80211", "watchdog.http_client", "watchdog.exporter",
+    "watchdog.events", "watchdog.config_watch",
+)
+
+
+def import_profile(config_path: str, cache_dir: Optional[str] = None, top: int = 15) -> Dict[str, Any]:
+    """Startup report: phase timings up to a loaded config, plus the slowest imports on the way.
+
+    ``deferred_imported`` lists any of :data:`DEFERRED_MODULES` that were
+    loaded anyway; it should be empty.
+    """
+    phases, stderr = _startup_child(config_path, cache_dir, profile=True)
+    rows = parse_importtime(stderr)
+    ours = [r for r in rows if r[0].split(".")[0] == "watchdog"]
+    loaded = {r[0] for r in rows}
+    return {
+        "config_cache": cache_dir,
+        "phases": phases,
+        "deferred_imported": [m for m in DEFERRED_MODULES if m in loaded],
+        "modules_imported": len(rows),
+        "watchdog_self_ms": round(sum(r[1] for r in ours), 2),
+        "slowest_self": [{"module": m, "self_ms": round(a, 2), "cumulative_ms": round(b, 2)}
+                         for m, a, b in sorted(rows, key=lambda r: r[1], reverse=True)[:top]],
+    }
+
+
+def run_all(args: argparse.Namespace) -> Dict[str, Any]:
+    return {
+        "bench_version": BENCH_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "timestamp": time.time(),
+        "cycle": bench_cycle(args.cycles, args.probe_delay_ms, args.loss, args.cycle_history_size, args.seed),
+        "classify": bench_classify(args.history_size, args.iterations, args.seed),
+        "startup": bench_startup(args.startup_runs),
+        # ru_maxrss is in KiB on Linux.
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Return a description of every tracked metric that regressed by more than ``tolerance``."""
+    regressions = []
+    for path, higher_is_better in _REGRESSION_KEYS.items():
+        try:
+            new, old = current, baseline
+            for key in path:
+                new, old = new[key], old[key]
+        except (KeyError, TypeError):
+            continue
+        if not old:
+            continue
+        change = (new - old) / old
+        if (-change if higher_is_better else change) > tolerance:
+            regressions.append(f"{'.'.join(path)}: {old} -> {new} ({change:+.1%})")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m watchdog.bench", description="Benchmark the health cycle")
+    parser.add_argument("--cycles", type=int, default=200)
+    parser.add_argument("--probe-delay-ms", type=float, default=0.0)
+    parser.add_argument("--loss", type=float, default=0.0, help="probability that each fake probe fails")
+    parser.add_argument("--cycle-history-size", type=int, default=20)
+    parser.add_argument("--history-size", type=int, default=10000, help="window size for the classify benchmark")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--startup-runs", type=int, default=3, help="fresh interpreters per startup measurement")
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    parser.add_argument("--baseline", help="earlier results to compare against; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    results = run_all(args)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"regression: {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+__all__ = ["DEFERRED_MODULES", "bench_classify", "bench_cycle", "bench_startup", "compare", "fake_backends", "import_profile"]
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -1,14 +1,23 @@
 from __future__ import annotations
 
 import logging
+import os
+import selectors
+import signal
 import subprocess
-from dataclasses import dataclass
-from typing import List
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
 
 from .config import Config
 
 logger = logging.getLogger(__name__)
 
+MAX_OUTPUT_BYTES = 64 * 1024  # per stream; anything beyond is read and dropped
+_CHUNK = 16 * 1024
+_EXIT_POLL_SECONDS = 0.02  # while a command has closed its pipes but not yet exited
+_EXIT_GRACE_SECONDS = 0.5  # after exit (or SIGKILL) before giving up on the pipes
+
 
 @dataclass(slots=True)
 class CommandResult:
@@ -17,6 +26,161 @@ class CommandResult:
     stdout: str
     stderr: str
     timed_out: bool = False
+    duration_s: float = 0.0
+    truncated: bool = False  # output beyond max_output_bytes was discarded
+
+
+@dataclass(slots=True)
+class _Running:
+    argv: List[str]
+    proc: subprocess.Popen
+    started: float
+    deadline: float
+    buffers: Dict[int, bytearray] = field(default_factory=dict)  # fd -> captured output
+    open_fds: int = 0
+    truncated: bool = False
+    timed_out: bool = False
+    exited: Optional[float] = None
+
+
+def _spawn(argv: List[str], deadline: float, sel: selectors.BaseSelector) -> _Running:
+    # A new session makes the command a process-group leader, so a timeout kills its helpers too.
+    proc = subprocess.Popen(
+        argv, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE, start_new_session=True
+    )
+    run = _Running(argv=argv, proc=proc, started=time.monotonic(), deadline=deadline)
+    for pipe in (proc.stdout, proc.stderr):
+        fd = pipe.fileno()
+        os.set_blocking(fd, False)
+        run.buffers[fd] = bytearray()
+        run.open_fds += 1
+        sel.register(fd, selectors.EVENT_READ, run)
+    return run
+
+
+def _read(run: _Running, fd: int, sel: selectors.BaseSelector, max_output_bytes: int) -> None:
+    try:
+        data = os.read(fd, _CHUNK)
+    except BlockingIOError:
+        return
+    except OSError:
+        data = b""
+    if not data:
+        sel.unregister(fd)
+        run.open_fds -= 1
+        return
+    buf = run.buffers[fd]
+    room = max_output_bytes - len(buf)
+    if len(data) > room:
+        run.truncated = True
+    if room > 0:
+        buf += data[:room]
+
+
+def _kill_group(run: _Running) -> None:
+    run.timed_out = True
+    try:
+        os.killpg(run.proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def _result(run: _Running, sel: selectors.BaseSelector) -> CommandResult:
+    out_fd, err_fd = run.proc.stdout.fileno(), run.proc.stderr.fileno()
+    for fd in (out_fd, err_fd):
+        try:
+            sel.unregister(fd)
+        except (KeyError, ValueError):
+            pass  # already at EOF
+    stdout = run.buffers[out_fd].decode(errors="replace")
+    stderr = run.buffers[err_fd].decode(errors="replace")
+    run.proc.stdout.close()
+    run.proc.stderr.close()
+    rc = run.proc.poll()
+    duration = round(time.monotonic() - run.started, 3)
+    if run.timed_out or rc is None:
+        logger.error("command_timeout", extra={"extra_fields": {"cmd": run.argv, "ms": round(duration * 1000.0, 1)}})
+        return CommandResult(run.argv, 124, stdout, stderr, timed_out=True, duration_s=duration,
+                             truncated=run.truncated)
+    if rc != 0:
+        logger.warning(
+            "command_failed",
+            extra={
+                "extra_fields": {
+                    "cmd": run.argv,
+                    "rc": rc,
+                    "ms": round(duration * 1000.0, 1),
+                    "stderr": stderr.strip()[:500],
+                }
+            },
+        )
+    return CommandResult(run.argv, rc, stdout, stderr, duration_s=duration, truncated=run.truncated)
+
+
+def run_commands(
+    cfg: Config,
+    commands: Sequence[List[str]],
+    timeout: float = 10,
+    deadline: Optional[float] = None,
+    max_output_bytes: int = MAX_OUTPUT_BYTES,
+) -> List[CommandResult]:
+    """Run ``commands`` concurrently and return their results in the same order.
+
+    Each command gets ``timeout`` seconds, and none outlives ``deadline``
+    seconds from the start of the batch. Output is streamed through a selector
+    and capped at ``max_output_bytes`` per stream. A command that overruns has
+    its whole process group killed and reports returncode 124. Honors dry-run.
+    """
+    if cfg.features.dry_run:
+        for argv in commands:
+            logger.info("dry_run_command", extra={"extra_fields": {"cmd": argv}})
+        return [CommandResult(argv=list(argv), returncode=0, stdout="", stderr="") for argv in commands]
+    start = time.monotonic()
+    batch_deadline = start + (deadline if deadline is not None else timeout)
+    results: List[Optional[CommandResult]] = [None] * len(commands)
+    running: Dict[int, _Running] = {}  # index -> command
+    with selectors.DefaultSelector() as sel:
+        try:
+            for i, argv in enumerate(commands):
+                argv = list(argv)
+                try:
+                    running[i] = _spawn(argv, min(time.monotonic() + timeout, batch_deadline), sel)
+                except OSError as e:
+                    logger.error("command_exception", extra={"extra_fields": {"cmd": argv, "error": str(e)}})
+                    results[i] = CommandResult(argv=argv, returncode=127 if isinstance(e, FileNotFoundError) else 1,
+                                               stdout="", stderr=str(e))
+            while running:
+                now = time.monotonic()
+                wait: Optional[float] = None
+                for i, run in list(running.items()):
+                    if run.proc.poll() is None:
+                        if now >= run.deadline and not run.timed_out:
+                            _kill_group(run)
+                        due = run.deadline if run.open_fds and not run.timed_out else now + _EXIT_POLL_SECONDS
+                        if run.timed_out and now >= run.deadline + _EXIT_GRACE_SECONDS:
+                            results[i] = _result(running.pop(i), sel)  # stuck in the kernel; stop waiting
+                            continue
+                    else:
+                        if run.exited is None:
+                            run.exited = now
+                        # A helper it left behind may hold the pipes open; don't wait on it for long.
+                        if run.open_fds == 0 or now >= run.exited + _EXIT_GRACE_SECONDS:
+                            results[i] = _result(running.pop(i), sel)
+                            continue
+                        due = run.exited + _EXIT_GRACE_SECONDS
+                    wait = due - now if wait is None else min(wait, due - now)
+                if running:
+                    for key, _ in sel.select(max(wait or 0.0, 0.0)):
+                        _read(key.data, key.fd, sel, max_output_bytes)
+        finally:
+            for i, run in running.items():  # only left over if something above raised
+                _kill_group(run)
+                results[i] = _result(run, sel)
+    if len(commands) > 1:
+        logger.info("command_batch", extra={"extra_fields": {
+            "commands": len(commands), "ms": round((time.monotonic() - start) * 1000.0, 1),
+            "slowest_ms": round(max(r.duration_s for r in results) * 1000.0, 1)}})
+    return results  # type: ignore[return-value]
 
 
 def run_command(cfg: Config, argv: list[str], timeout: int = 10) -> CommandResult:
@@ -24,31 +188,7 @@ def run_command(cfg: Config, argv: list[str], timeout: int = 10) -> CommandResul
 
     Honors dry-run: in dry-run mode returns success without execution.
     """
-    if cfg.features.dry_run:
-        logger.info("dry_run_command", extra={"extra_fields": {"cmd": argv}})
-        return CommandResult(argv=argv, returncode=0, stdout="", stderr="")
-    try:
-        cp = subprocess.run(argv, capture_output=True, text=True, timeout=timeout, check=False)
-        if cp.returncode != 0:
-            logger.warning(
-                "command_failed",
-                extra={
-                    "extra_fields": {
-                        "cmd": argv,
-                        "rc": cp.returncode,
-                        "stderr": cp.stderr.strip()[:500],
-                    }
-                },
-            )
-        return CommandResult(argv=argv, returncode=cp.returncode, stdout=cp.stdout, stderr=cp.stderr)
-    except subprocess.TimeoutExpired as e:
-        logger.error("command_timeout", extra={"extra_fields": {"cmd": argv, "timeout": timeout}})
-        raw_out = e.stdout.decode() if isinstance(e.stdout, bytes) else (e.stdout or "")
-        raw_err = e.stderr.decode() if isinstance(e.stderr, bytes) else (e.stderr or "")
-        return CommandResult(argv=argv, returncode=124, stdout=str(raw_out), stderr=str(raw_err), timed_out=True)
-    except Exception as e:  # pragma: no cover
-        logger.error("command_exception", extra={"extra_fields": {"cmd": argv, "error": str(e)}})
-        return CommandResult(argv=argv, returncode=1, stdout="", stderr=str(e))
-
-
-__all__ = ["run_command", "CommandResult"]
+    return run_commands(cfg, [argv], timeout=timeout)[0]
+
+
+__all__ = ["run_command", "run_commands", "CommandResult", "MAX_OUTPUT_BYTES"]
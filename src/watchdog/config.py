@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 import dataclasses as dc
+import hashlib
 import json
 import os
 from pathlib import Path
 from typing import Any, List, Optional
 
-import yaml
+CONFIG_CACHE_VERSION = 1
 
 @dc.dataclass(slots=True)
 class EscalationTier:
@@ -16,6 +17,10 @@ class EscalationTier:
     services: Optional[List[str]] = None
     device_id: Optional[str] = None  # USB vendor:product
     hub_port: Optional[str] = None   # For uhubctl if used
+    wpa_commands: Optional[List[str]] = None  # wpa_reconnect: tried in order (default REATTACH, REASSOCIATE)
+    connect_timeout_ms: int = 3000  # wpa_reconnect: wait for CTRL-EVENT-CONNECTED per command
+    parallel: bool = False  # restart_network_services: restart all services at once (opt-in)
+    deadline_seconds: float = 30.0  # restart_network_services: bound on the parallel restarts
 
 @dc.dataclass(slots=True)
 class EscalationConfig:
@@ -40,6 +45,18 @@ class Timeouts:
     ping_ms: int = 800
     dns_ms: int = 1200
     http_ms: int = 2000
+    cycle_ms: int = 3000  # hard deadline for one concurrent probe cycle
+
+@dc.dataclass(slots=True)
+class IcmpSettings:
+    backend: str = "auto"  # auto | dgram | raw | subprocess
+    count: int = 3  # echo requests per host per cycle
+    interval_ms: int = 20  # spacing between bursts
+    bind_interface: bool = False  # send via the watched interface (SO_BINDTODEVICE)
+
+@dc.dataclass(slots=True)
+class LinkSettings:
+    backend: str = "auto"  # auto | nl80211 | procfs | iw
 
 @dc.dataclass(slots=True)
 class Limits:
@@ -52,6 +69,18 @@ class Paths:
     status_json: str = "/var/run/wifi-watchdog/status.json"
     state_dir: str = "/var/lib/wifi-watchdog"
     action_history: str = "/var/lib/wifi-watchdog/action_history.log"
+    sample_ring: Optional[str] = None  # default: <state_dir>/samples.ring
+    status_shm: Optional[str] = "/dev/shm/wifi-watchdog/status.bin"  # lock-free status record; null disables
+
+@dc.dataclass(slots=True)
+class HistorySettings:
+    flush_records: int = 32  # buffered routine records before a write
+    flush_interval_seconds: float = 60.0
+    fsync: str = "important"  # never | important | always
+    max_bytes: int = 1_048_576  # rotate above this size; 0 disables
+    max_age_seconds: int = 0  # rotate files older than this; 0 disables
+    keep: int = 5  # rotated files retained
+    compress: bool = True  # gzip rotated files
 
 @dc.dataclass(slots=True)
 class AdaptiveScheduling:
@@ -61,22 +90,87 @@ class AdaptiveScheduling:
     healthy_cycles_for_backoff: int = 6
     backoff_factor: float = 1.25  # multiplicative
 
+@dc.dataclass(slots=True)
+class ProbeCadence:
+    period_seconds: float
+    jitter: float = 0.1  # +/- fraction of the period
+    backoff_factor: float = 1.5  # period growth per run while healthy (with adaptive.enabled); 1 disables
+    max_period_seconds: float = 0.0  # backoff ceiling; 0 means period_seconds
+
+@dc.dataclass(slots=True)
+class CadenceSettings:
+    """Independent per-probe schedules; off means one combined cycle per interval."""
+    enabled: bool = False
+    link: ProbeCadence = dc.field(default_factory=lambda: ProbeCadence(2.0, max_period_seconds=10.0))
+    ping: ProbeCadence = dc.field(default_factory=lambda: ProbeCadence(5.0, max_period_seconds=30.0))
+    dns: ProbeCadence = dc.field(default_factory=lambda: ProbeCadence(15.0, max_period_seconds=60.0))
+    http: ProbeCadence = dc.field(default_factory=lambda: ProbeCadence(60.0, max_period_seconds=300.0))
+    gateway: ProbeCadence = dc.field(default_factory=lambda: ProbeCadence(10.0, max_period_seconds=60.0))
+
+    @staticmethod
+    def from_dict(d: dict[str, Any]) -> "CadenceSettings":
+        out = CadenceSettings(enabled=bool(d.get("enabled", False)))
+        for kind in ("link", "ping", "dns", "http", "gateway"):
+            if d.get(kind):
+                setattr(out, kind, ProbeCadence(**{**dc.asdict(getattr(out, kind)), **d[kind]}))
+        return out
+
+@dc.dataclass(slots=True)
+class EventSettings:
+    rtnetlink: bool = True  # carrier, address and default-route changes
+    wpa_supplicant: bool = True  # CTRL-EVENT-* from the control socket
+    wpa_ctrl_dir: str = "/var/run/wpa_supplicant"
+    wpa_ping_seconds: float = 10.0  # keepalive PING while attached
+    wpa_pong_timeout_ms: int = 2000  # no PONG by then: wpa_supplicant is gone, reattach
+    debounce_ms: int = 250  # let a burst of related events settle before probing
+    min_gap_seconds: float = 2.0  # minimum spacing of event-triggered cycles
+
+@dc.dataclass(slots=True)
+class VerificationSettings:
+    enabled: bool = True
+    window_seconds: float = 10.0  # how long to watch after a tier
+    interval_ms: int = 250  # spacing of verification rounds
+    probe_timeout_ms: int = 300
+    required_successes: int = 3  # consecutive rounds where every target answers
+    holdoff_seconds: float = 30.0  # no further escalation after a recovered/converging verification
+    reference: Optional[str] = None  # remote target checked with the gateway; default: first hosts.ping
+
+@dc.dataclass(slots=True)
+class GatewaySettings:
+    """Default gateway, address and lease checks that tell a LAN fault from an upstream one."""
+    enabled: bool = True
+    arp_timeout_ms: int = 300  # ICMP to the gateway uses timeouts.ping_ms
+    lease_file: Optional[str] = None  # default: the dhcpcd or dhclient lease of the interface
+
+@dc.dataclass(slots=True)
+class SnapshotSettings:
+    enabled: bool = True  # warm-start state in <state_dir>/state.<interface>.json
+    interval_seconds: float = 60.0  # also written before every tier and on shutdown
+    max_age_seconds: float = 900.0  # older snapshots restore only tier and reboot timestamps
+
 @dc.dataclass(slots=True)
 class LoggingConfig:
     level: str = "INFO"
     json: bool = True
-    destination: str = "stdout"  # or file path
+    destination: str = "stdout"  # stderr, journal, or a file path
+    queue_size: int = 10000  # records buffered for the writer thread; 0 writes synchronously
+    dedup_seconds: float = 300.0  # repeated identical health_cycle records become one summary per period; 0 disables
 
 @dc.dataclass(slots=True)
 class Features:
     prometheus_textfile: Optional[str] = None
     dry_run: bool = False
     systemd_watchdog: bool = False
+    status_heartbeat_seconds: int = 60  # rewrite unchanged status files at least this often
+    sample_ring_records: int = 40320  # per-cycle samples kept (about a week at 15 s); 0 disables
+    metrics_listen: Optional[str] = None  # "host:port" for the embedded /metrics endpoint; None disables
+    watch_config: bool = False  # reload when the config file changes (SIGHUP always reloads)
 
 @dc.dataclass(slots=True)
 class Hosts:
     ping: List[str] = dc.field(default_factory=lambda: ["1.1.1.1", "8.8.8.8"])  # minimal
     dns_lookup: str = "example.com"
+    dns_servers: Optional[List[str]] = None  # default: nameservers from /etc/resolv.conf
     http_probe: Optional[str] = None
 
 @dc.dataclass(slots=True)
@@ -84,6 +178,7 @@ class Config:
     interface: str = "wlan0"
     check_interval_seconds: int = 15
     history_size: int = 20
+    history_horizons: List[int] = dc.field(default_factory=lambda: [5, 60])  # extra aggregate windows (cycles)
     thresholds: Thresholds = dc.field(default_factory=Thresholds)
     signal: SignalThresholds = dc.field(default_factory=SignalThresholds)
     hosts: Hosts = dc.field(default_factory=Hosts)
@@ -94,6 +189,16 @@ class Config:
     logging: LoggingConfig = dc.field(default_factory=LoggingConfig)
     features: Features = dc.field(default_factory=Features)
     adaptive: AdaptiveScheduling = dc.field(default_factory=AdaptiveScheduling)
+    icmp: IcmpSettings = dc.field(default_factory=IcmpSettings)
+    link: LinkSettings = dc.field(default_factory=LinkSettings)
+    history: HistorySettings = dc.field(default_factory=HistorySettings)
+    cadence: CadenceSettings = dc.field(default_factory=CadenceSettings)
+    events: EventSettings = dc.field(default_factory=EventSettings)
+    verification: VerificationSettings = dc.field(default_factory=VerificationSettings)
+    snapshot: SnapshotSettings = dc.field(default_factory=SnapshotSettings)
+    gateway: GatewaySettings = dc.field(default_factory=GatewaySettings)
+    # Supervisor mode: one fully resolved Config per watched interface.
+    interfaces: List["Config"] = dc.field(default_factory=list)
 
     @staticmethod
     def from_dict(d: dict[str, Any]) -> "Config":
@@ -112,6 +217,14 @@ class Config:
         features = Features(**d.get("features", {}))
         adaptive = AdaptiveScheduling(**d.get("adaptive", {}))
         hosts = Hosts(**d.get("hosts", {}))
+        icmp = IcmpSettings(**d.get("icmp", {}))
+        link = LinkSettings(**d.get("link", {}))
+        history = HistorySettings(**d.get("history", {}))
+        cadence = CadenceSettings.from_dict(d.get("cadence") or {})
+        events = EventSettings(**d.get("events", {}))
+        verification = VerificationSettings(**d.get("verification", {}))
+        snapshot = SnapshotSettings(**d.get("snapshot", {}))
+        gateway = GatewaySettings(**d.get("gateway", {}))
 
         esc_raw = d.get("escalation", {}) or {}
         healthy_reset = esc_raw.get("healthy_reset_consecutive", 3)
@@ -120,10 +233,13 @@ class Config:
             tiers_list.append(EscalationTier(**t))
         escalation = EscalationConfig(healthy_reset_consecutive=healthy_reset, tiers=tiers_list)
 
+        interfaces = [Config.from_dict(_interface_dict(d, entry)) for entry in d.get("interfaces") or []]
+
         return Config(
             interface=d.get("interface", "wlan0"),
             check_interval_seconds=int(d.get("check_interval_seconds", 15)),
             history_size=int(d.get("history_size", 20)),
+            history_horizons=[int(h) for h in d.get("history_horizons", [5, 60])],
             thresholds=thresholds,
             signal=signal,
             hosts=hosts,
@@ -134,27 +250,164 @@ class Config:
             logging=logging_cfg,
             features=features,
             adaptive=adaptive,
+            icmp=icmp,
+            link=link,
+            history=history,
+            cadence=cadence,
+            events=events,
+            verification=verification,
+            snapshot=snapshot,
+            gateway=gateway,
+            interfaces=interfaces,
         )
 
     def to_json(self) -> str:
         return json.dumps(dc.asdict(self), indent=2)
 
 
-def load_config(path: str | os.PathLike[str]) -> Config:
-    with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
+def _deep_merge(base: dict[str, Any], override: dict[str, Any]) -> dict[str, Any]:
+    out = dict(base)
+    for k, v in override.items():
+        if isinstance(v, dict) and isinstance(out.get(k), dict):
+            out[k] = _deep_merge(out[k], v)
+        else:
+            out[k] = v
+    return out
+
+
+def _suffixed(path: str, interface: str) -> str:
+    p = Path(path)
+    return str(p.with_name(f"{p.stem}.{interface}{p.suffix}"))
+
+
+def _interface_dict(base: dict[str, Any], entry: Any) -> dict[str, Any]:
+    """Merge one ``interfaces`` entry over the top-level settings.
+
+    An entry is an interface name or a mapping of overrides. Output files not
+    overridden explicitly get the interface name added so monitors never write
+    the same file, and ICMP probes are bound to the interface by default.
+    """
+    override = {"interface": entry} if isinstance(entry, str) else dict(entry or {})
+    merged = _deep_merge({k: v for k, v in base.items() if k != "interfaces"}, override)
+    name = merged.get("interface", "wlan0")
+    own_paths = override.get("paths") or {}
+    paths = dict(merged.get("paths") or {})
+    defaults = Paths()
+    for key in ("status_json", "action_history", "status_shm"):
+        if key not in own_paths and paths.get(key, getattr(defaults, key)):
+            paths[key] = _suffixed(paths.get(key, getattr(defaults, key)), name)
+    if "sample_ring" not in own_paths:
+        state_dir = paths.get("state_dir", defaults.state_dir)
+        paths["sample_ring"] = _suffixed(paths.get("sample_ring") or f"{state_dir}/samples.ring", name)
+    merged["paths"] = paths
+    features = dict(merged.get("features") or {})
+    if features.get("prometheus_textfile") and "prometheus_textfile" not in (override.get("features") or {}):
+        features["prometheus_textfile"] = _suffixed(features["prometheus_textfile"], name)
+    merged["features"] = features
+    icmp = dict(merged.get("icmp") or {})
+    if "bind_interface" not in (override.get("icmp") or {}):
+        icmp["bind_interface"] = True
+    merged["icmp"] = icmp
+    return merged
+
+
+def diff_config(old: Config, new: Config) -> List[str]:
+    """Dotted names of the settings that differ; lists compare whole (``escalation.tiers``)."""
+    out: List[str] = []
+
+    def walk(a: Any, b: Any, prefix: str) -> None:
+        if isinstance(a, dict) and isinstance(b, dict):
+            for k in sorted(a.keys() | b.keys()):
+                walk(a.get(k), b.get(k), f"{prefix}{k}.")
+        elif a != b:
+            out.append(prefix[:-1])
+
+    walk(dc.asdict(old), dc.asdict(new), "")
+    return out
+
+
+def _config_cache_key(raw: bytes, st: os.stat_result) -> dict[str, Any]:
+    return {
+        "version": CONFIG_CACHE_VERSION,
+        # A new release may change defaults or fields, so the code is part of the key too.
+        "schema": os.stat(__file__).st_mtime_ns,
+        "mtime_ns": st.st_mtime_ns,
+        "sha256": hashlib.sha256(raw).hexdigest(),
+    }
+
+
+def config_cache_file(path: str | os.PathLike[str], cache_dir: str | os.PathLike[str]) -> Path:
+    digest = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:12]
+    return Path(cache_dir) / f"config-{digest}.json"
+
+
+def _read_config_cache(cache: Path, key: dict[str, Any]) -> Optional[Config]:
+    try:
+        with open(cache, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("key") != key:
+            return None
+        return Config.from_dict(cached["config"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_config_cache(cache: Path, key: dict[str, Any], cfg: Config) -> None:
+    tmp = cache.with_name(cache.name + ".tmp")
+    try:
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps({"key": key, "config": dc.asdict(cfg)}, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, cache)
+    except OSError:
+        pass  # read-only or missing cache dir: just parse the YAML next time too
+
+
+def load_config(path: str | os.PathLike[str], cache_dir: str | os.PathLike[str] | None = None) -> Config:
+    """Parse and validate the YAML config at ``path``.
+
+    With ``cache_dir`` the validated config is also stored there as JSON, keyed
+    on the YAML's mtime and SHA-256, and reused while both match. That skips
+    importing and running the YAML parser, the slowest part of startup on
+    small boards.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+        st = os.fstat(f.fileno())
+    key = cache = None
+    if cache_dir is not None:
+        key = _config_cache_key(raw, st)
+        cache = config_cache_file(path, cache_dir)
+        cached = _read_config_cache(cache, key)
+        if cached is not None:
+            return cached
+    import yaml  # deferred: not needed at all on a cache hit
+
+    data = yaml.safe_load(raw.decode("utf-8")) or {}
     cfg = Config.from_dict(data)
     validate_config(cfg)
+    if cache is not None and key is not None:
+        _write_config_cache(cache, key, cfg)
     return cfg
 
 
 def validate_config(cfg: Config) -> None:
     if cfg.check_interval_seconds < 5:
         raise ValueError("check_interval_seconds must be >= 5")
+    if cfg.history_size < 1:
+        raise ValueError("history_size must be >= 1")
+    if any(h < 1 for h in cfg.history_horizons):
+        raise ValueError("history_horizons entries must be >= 1")
     if cfg.thresholds.degraded_fail_ratio >= cfg.thresholds.lost_fail_ratio:
         raise ValueError("degraded_fail_ratio must be < lost_fail_ratio")
     if not cfg.escalation.tiers:
         raise ValueError("At least one escalation tier required")
+    for t in cfg.escalation.tiers:
+        if t.wpa_commands and not set(t.wpa_commands) <= {"RECONNECT", "REASSOCIATE", "REATTACH"}:
+            raise ValueError(f"tier {t.name}: wpa_commands may only contain RECONNECT, REASSOCIATE, REATTACH")
+        if t.connect_timeout_ms < 100:
+            raise ValueError(f"tier {t.name}: connect_timeout_ms must be >= 100")
+        if t.deadline_seconds <= 0:
+            raise ValueError(f"tier {t.name}: deadline_seconds must be > 0")
     names = [t.name for t in cfg.escalation.tiers]
     if len(names) != len(set(names)):
         raise ValueError("Duplicate escalation tier names detected")
@@ -162,15 +415,83 @@ def validate_config(cfg: Config) -> None:
         raise ValueError("min_seconds_between_reboots must be >= 0")
     if cfg.limits.min_uptime_before_reboot < 0:
         raise ValueError("min_uptime_before_reboot must be >= 0")
+    if cfg.timeouts.cycle_ms <= 0:
+        raise ValueError("timeouts.cycle_ms must be > 0")
+    if cfg.icmp.backend not in {"auto", "dgram", "raw", "subprocess"}:
+        raise ValueError("icmp.backend must be one of auto, dgram, raw, subprocess")
+    if cfg.icmp.count < 1:
+        raise ValueError("icmp.count must be >= 1")
+    if cfg.link.backend not in {"auto", "nl80211", "procfs", "iw"}:
+        raise ValueError("link.backend must be one of auto, nl80211, procfs, iw")
+    if cfg.features.status_heartbeat_seconds < 0:
+        raise ValueError("features.status_heartbeat_seconds must be >= 0")
+    if cfg.features.sample_ring_records < 0:
+        raise ValueError("features.sample_ring_records must be >= 0")
+    if cfg.features.metrics_listen is not None:
+        _, sep, port = cfg.features.metrics_listen.rpartition(":")
+        if not sep or not port.isdigit() or not 0 <= int(port) <= 65535:
+            raise ValueError("features.metrics_listen must be host:port")
+    if cfg.history.fsync not in {"never", "important", "always"}:
+        raise ValueError("history.fsync must be one of never, important, always")
+    if cfg.history.flush_records < 1:
+        raise ValueError("history.flush_records must be >= 1")
+    if cfg.history.keep < 0 or cfg.history.max_bytes < 0 or cfg.history.max_age_seconds < 0:
+        raise ValueError("history.keep, max_bytes and max_age_seconds must be >= 0")
     if cfg.adaptive.min_interval_seconds < 5:
         raise ValueError("adaptive.min_interval_seconds must be >= 5")
     if cfg.adaptive.max_interval_seconds < cfg.adaptive.min_interval_seconds:
         raise ValueError("adaptive.max_interval_seconds must be >= min_interval_seconds")
+    if cfg.events.debounce_ms < 0 or cfg.events.min_gap_seconds < 0:
+        raise ValueError("events.debounce_ms and events.min_gap_seconds must be >= 0")
+    if cfg.events.wpa_ping_seconds <= 0 or cfg.events.wpa_pong_timeout_ms <= 0:
+        raise ValueError("events.wpa_ping_seconds and events.wpa_pong_timeout_ms must be > 0")
+    v = cfg.verification
+    if v.window_seconds <= 0 or v.interval_ms < 10 or v.probe_timeout_ms < 10 or v.required_successes < 1:
+        raise ValueError("verification: window_seconds > 0, interval_ms/probe_timeout_ms >= 10, "
+                         "required_successes >= 1")
+    if v.holdoff_seconds < 0:
+        raise ValueError("verification.holdoff_seconds must be >= 0")
+    for kind in ("link", "ping", "dns", "http", "gateway"):
+        pc = getattr(cfg.cadence, kind)
+        if pc.period_seconds < 0.5:
+            raise ValueError(f"cadence.{kind}.period_seconds must be >= 0.5")
+        if not 0 <= pc.jitter < 1:
+            raise ValueError(f"cadence.{kind}.jitter must be in [0, 1)")
+        if pc.backoff_factor < 1:
+            raise ValueError(f"cadence.{kind}.backoff_factor must be >= 1")
+        if pc.max_period_seconds and pc.max_period_seconds < pc.period_seconds:
+            raise ValueError(f"cadence.{kind}.max_period_seconds must be 0 or >= period_seconds")
+    if cfg.gateway.arp_timeout_ms < 10:
+        raise ValueError("gateway.arp_timeout_ms must be >= 10")
+    if cfg.snapshot.interval_seconds < 1 or cfg.snapshot.max_age_seconds < 0:
+        raise ValueError("snapshot.interval_seconds must be >= 1 and snapshot.max_age_seconds >= 0")
+    if cfg.logging.queue_size < 0:
+        raise ValueError("logging.queue_size must be >= 0")
+    if cfg.logging.dedup_seconds < 0:
+        raise ValueError("logging.dedup_seconds must be >= 0")
+    names = [c.interface for c in cfg.interfaces]
+    if len(names) != len(set(names)):
+        raise ValueError("Duplicate entries in interfaces")
+    for sub in cfg.interfaces:
+        validate_config(sub)
     # Additional checks could be added here
 
 
+def sample_ring_path(cfg: Config) -> str:
+    return cfg.paths.sample_ring or str(Path(cfg.paths.state_dir) / "samples.ring")
+
+
+def interface_configs(cfg: Config) -> List[Config]:
+    """Configs to supervise: the ``interfaces`` list, or just ``cfg`` itself."""
+    return list(cfg.interfaces) or [cfg]
+
+
 __all__ = [
     "Config",
+    "interface_configs",
+    "sample_ring_path",
     "load_config",
+    "config_cache_file",
+    "diff_config",
     "validate_config",
 ]
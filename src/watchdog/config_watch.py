@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# linux/inotify.h
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len; then len bytes of NUL-padded name
+
+
+class ConfigWatcher:
+    """Call ``callback`` after the config file is rewritten, via inotify on its directory.
+
+    The directory is watched rather than the file because editors and config
+    management usually replace the file by rename. Bursts of events (write,
+    then rename) are debounced into one call.
+    """
+
+    def __init__(self, path: str, callback: Callable[[], None], debounce: float = 0.5) -> None:
+        self.path = os.path.abspath(path)
+        self.callback = callback
+        self.debounce = debounce
+        self._fd: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Optional[asyncio.TimerHandle] = None
+
+    def start(self) -> None:
+        """Begin watching; raises OSError where inotify is unavailable."""
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        directory = os.path.dirname(self.path).encode()
+        if libc.inotify_add_watch(fd, directory, IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE) < 0:
+            err = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(err, f"inotify_add_watch failed for {directory.decode()}")
+        self._fd = fd
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(fd, self._on_readable)
+
+    def _on_readable(self) -> None:
+        try:
+            data = os.read(self._fd, 4096) if self._fd is not None else b""
+        except (BlockingIOError, InterruptedError):
+            return
+        name = os.path.basename(self.path).encode()
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            _, _, _, length = _EVENT.unpack_from(data, offset)
+            start = offset + _EVENT.size
+            offset = start + length
+            if data[start:offset].rstrip(b"\0") == name:
+                self._schedule()
+
+    def _schedule(self) -> None:
+        if self._pending is not None:
+            self._pending.cancel()
+        assert self._loop is not None
+        self._pending = self._loop.call_later(self.debounce, self._fire)
+
+    def _fire(self) -> None:
+        self._pending = None
+        self.callback()
+
+    def close(self) -> None:
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+        if self._fd is not None:
+            if self._loop is not None:
+                self._loop.remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = None
+
+
+__all__ = ["ConfigWatcher"]
@@ -1,25 +1,49 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+import math
+import re
 import subprocess
 import time
 import socket
-import urllib.request
-from dataclasses import dataclass
-from typing import List, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
-from .config import Config
+from .config import Config, IcmpSettings
+from .dns_probe import ResolverResult, probe_resolvers, read_resolv_conf
+from .gateway_probe import (
+    GatewayResult, arp_probe, interface_address, read_lease_remaining, read_neighbor, read_operstate,
+)
+from .icmp import IcmpProber
+from .nl80211 import Nl80211Reader, StationInfo, read_proc_wireless
+
+if TYPE_CHECKING:
+    from .http_client import HttpProbeClient
+
+logger = logging.getLogger(__name__)
 
 @dataclass(slots=True)
 class PingResult:
     host: str
     success: bool
-    latency_ms: Optional[float]
+    latency_ms: Optional[float]  # mean RTT of received replies
+    sent: int = 0
+    received: int = 0
+    loss_pct: Optional[float] = None
+    jitter_ms: Optional[float] = None
 
 @dataclass(slots=True)
 class DnsResult:
     hostname: str
-    success: bool
-    latency_ms: Optional[float]
+    success: bool  # at least one resolver answered
+    latency_ms: Optional[float]  # fastest successful resolver
+    resolvers: List[ResolverResult] = field(default_factory=list)
+    # False when the answer came from the system resolver, which cannot be bound
+    # to the probed interface and may have gone out through another route.
+    interface_scoped: bool = True
 
 @dataclass(slots=True)
 class HttpResult:
@@ -27,11 +51,26 @@ class HttpResult:
     success: bool
     latency_ms: Optional[float]
     status: Optional[int]
+    # Phase timings are filled in as far as the request got, including on failure.
+    dns_ms: Optional[float] = None
+    connect_ms: Optional[float] = None
+    tls_ms: Optional[float] = None
+    ttfb_ms: Optional[float] = None
+    reused: bool = False
+    error: Optional[str] = None
 
 @dataclass(slots=True)
 class LinkMetrics:
     rssi: Optional[int]
-    bitrate_mbps: Optional[float]
+    bitrate_mbps: Optional[float]  # tx bitrate
+    rx_bitrate_mbps: Optional[float] = None
+    noise_dbm: Optional[int] = None
+    tx_retries: Optional[int] = None
+    tx_failed: Optional[int] = None
+    beacon_loss: Optional[int] = None
+    bssid: Optional[str] = None
+    freq_mhz: Optional[int] = None
+    source: Optional[str] = None  # nl80211 | procfs | iw
 
 @dataclass(slots=True)
 class ConnectivitySnapshot:
@@ -39,93 +78,439 @@ class ConnectivitySnapshot:
     dns_result: DnsResult
     http_result: Optional[HttpResult]
     link: LinkMetrics
+    gateway: Optional[GatewayResult] = None  # None when gateway probing is off
+
+
+# One small pool per interface for probes that only exist as blocking calls
+# (link stats, HTTP, the system-resolver fallback): hung probes on a degraded
+# interface fill only that interface's pool, never a healthy one's. Not shut
+# down by asyncio.run(), so a hung resolver cannot stall the end of a cycle.
+_PROBE_POOL_WORKERS = 3  # one per blocking probe kind
+_probe_pools: Dict[Optional[str], ThreadPoolExecutor] = {}
+_probe_pools_lock = threading.Lock()
+
+
+def _probe_pool(interface: Optional[str]) -> ThreadPoolExecutor:
+    with _probe_pools_lock:
+        pool = _probe_pools.get(interface)
+        if pool is None:
+            pool = _probe_pools[interface] = ThreadPoolExecutor(
+                max_workers=_PROBE_POOL_WORKERS, thread_name_prefix=f"probe-{interface or 'any'}"
+            )
+        return pool
 
 
 def _run_cmd(args: list[str], timeout: float) -> subprocess.CompletedProcess:
     return subprocess.run(args, capture_output=True, text=True, timeout=timeout, check=False)
 
 
-def ping_hosts(hosts: List[str], timeout_ms: int) -> List[PingResult]:
-    results: List[PingResult] = []
-    for h in hosts:
-        start = time.perf_counter()
-        try:
-            # Use one echo request with timeout (Linux ping)
-            cp = _run_cmd(["ping", "-c", "1", "-W", str(int(timeout_ms/1000)), h], timeout=timeout_ms/1000 + 1)
-            success = cp.returncode == 0
-        except Exception:
-            success = False
-        latency = (time.perf_counter() - start) * 1000.0 if success else None
-        results.append(PingResult(host=h, success=success, latency_ms=latency))
-    return results
+async def _run_cmd_async(args: list[str], timeout: float) -> tuple[int, str]:
+    """Run a command without blocking the loop; kill it on timeout or cancellation."""
+    proc = await asyncio.create_subprocess_exec(
+        *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+    )
+    try:
+        out, _ = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    except BaseException:
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        raise
+    return proc.returncode if proc.returncode is not None else 1, out.decode(errors="replace")
+
+
+def ping_hosts(hosts: List[str], timeout_ms: int, icmp: Optional[IcmpSettings] = None) -> List[PingResult]:
+    return asyncio.run(ping_hosts_async(hosts, timeout_ms, icmp or IcmpSettings()))
+
 
+def _system_resolve(hostname: str) -> None:
+    socket.getaddrinfo(hostname, None, proto=socket.IPPROTO_TCP)
 
-def dns_lookup(hostname: str, timeout_ms: int) -> DnsResult:
+
+async def dns_lookup_async(
+    hostname: str, timeout_ms: int, servers: Optional[List[str]] = None, interface: Optional[str] = None
+) -> DnsResult:
+    """Query each resolver directly (configured list, else ``/etc/resolv.conf``).
+
+    Per-resolver latency and rcode let a dead local resolver be told apart from
+    a dead upstream; the queries leave through ``interface`` when given. Without
+    any known resolver the system resolver is used on the interface's probe
+    pool, still bounded by ``timeout_ms``; it cannot be bound to the interface,
+    so that result is marked ``interface_scoped=False``.
+    """
+    servers = servers or read_resolv_conf()
+    if servers:
+        results = await probe_resolvers(hostname, servers, timeout_ms, interface=interface)
+        ok = [r.latency_ms for r in results if r.success and r.latency_ms is not None]
+        return DnsResult(hostname=hostname, success=bool(ok), latency_ms=min(ok) if ok else None, resolvers=results)
+    loop = asyncio.get_running_loop()
     start = time.perf_counter()
-    success = False
     try:
-        socket.setdefaulttimeout(timeout_ms / 1000.0)
-        socket.gethostbyname(hostname)
-        success = True
+        await asyncio.wait_for(
+            loop.run_in_executor(_probe_pool(interface), _system_resolve, hostname), timeout_ms / 1000.0
+        )
+    except asyncio.CancelledError:
+        raise
     except Exception:
-        success = False
-    latency = (time.perf_counter() - start) * 1000.0 if success else None
-    return DnsResult(hostname=hostname, success=success, latency_ms=latency)
+        return DnsResult(hostname=hostname, success=False, latency_ms=None, interface_scoped=False)
+    return DnsResult(
+        hostname=hostname, success=True, latency_ms=(time.perf_counter() - start) * 1000.0, interface_scoped=False
+    )
 
 
-def http_probe(url: str, timeout_ms: int) -> HttpResult:
-    start = time.perf_counter()
-    success = False
-    status: Optional[int] = None
+def dns_lookup(
+    hostname: str, timeout_ms: int, servers: Optional[List[str]] = None, interface: Optional[str] = None
+) -> DnsResult:
+    return asyncio.run(dns_lookup_async(hostname, timeout_ms, servers, interface))
+
+
+# One client per (bound interface, URL), like the ICMP probers: each interface
+# keeps its own connection and never answers for another's link.
+_http_clients: Dict[tuple[Optional[str], str], HttpProbeClient] = {}
+
+
+def http_probe(url: str, timeout_ms: int, interface: Optional[str] = None) -> HttpResult:
+    """HEAD ``url`` over a persistent connection (see :class:`HttpProbeClient`)."""
+    key = (interface, url)
+    client = _http_clients.get(key)
+    if client is None:
+        from .http_client import HttpProbeClient  # deferred: most configs never probe HTTP
+
+        try:
+            client = _http_clients[key] = HttpProbeClient(url, interface)
+        except ValueError as e:
+            return HttpResult(url=url, success=False, latency_ms=None, status=None, error=str(e))
+    out = client.probe(timeout_ms)
+    success = out.error is None and 200 <= (out.status or 0) < 400
+    return HttpResult(
+        url=url,
+        success=success,
+        latency_ms=out.total_ms if success else None,
+        status=out.status,
+        dns_ms=out.dns_ms,
+        connect_ms=out.connect_ms,
+        tls_ms=out.tls_ms,
+        ttfb_ms=out.ttfb_ms,
+        reused=out.reused,
+        error=out.error,
+    )
+
+
+def _parse_iw_link(text: str) -> LinkMetrics:
+    rssi = None
+    bitrate = None
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("signal:"):
+            # e.g. signal: -54 dBm
+            parts = line.split()
+            if len(parts) >= 2:
+                try:
+                    rssi = int(parts[1])
+                except ValueError:
+                    pass
+        elif line.startswith("tx bitrate:"):
+            # e.g. tx bitrate: 72.2 MBit/s
+            parts = line.split()
+            for p in parts:
+                if p.replace('.', '', 1).isdigit():
+                    try:
+                        bitrate = float(p)
+                        break
+                    except ValueError:
+                        pass
+    return LinkMetrics(rssi=rssi, bitrate_mbps=bitrate, source="iw")
+
+
+def _from_station(info: StationInfo, source: str) -> LinkMetrics:
+    return LinkMetrics(
+        rssi=info.rssi,
+        bitrate_mbps=info.tx_bitrate_mbps,
+        rx_bitrate_mbps=info.rx_bitrate_mbps,
+        noise_dbm=info.noise_dbm,
+        tx_retries=info.tx_retries,
+        tx_failed=info.tx_failed,
+        beacon_loss=info.beacon_loss,
+        bssid=info.bssid,
+        freq_mhz=info.freq_mhz,
+        source=source,
+    )
+
+
+def read_default_gateway(interface: str, path: str = "/proc/net/route") -> Optional[str]:
+    """IPv4 default gateway via ``interface`` from the kernel routing table, if any."""
     try:
-        req = urllib.request.Request(url, method="HEAD")
-        with urllib.request.urlopen(req, timeout=timeout_ms / 1000.0) as resp:  # type: ignore[arg-type]
-            status = getattr(resp, 'status', None)
-            success = 200 <= (status or 0) < 400
-    except Exception:
-        success = False
-    latency = (time.perf_counter() - start) * 1000.0 if success else None
-    return HttpResult(url=url, success=success, latency_ms=latency, status=status)
+        with open(path, "r", encoding="utf-8") as f:
+            next(f, None)  # header
+            for line in f:
+                fields = line.split()
+                # Iface Destination Gateway Flags ... Mask
+                if len(fields) >= 8 and fields[0] == interface and fields[1] == "00000000" and fields[7] == "00000000":
+                    gw = int(fields[2], 16)
+                    if gw:
+                        return socket.inet_ntoa(gw.to_bytes(4, "little"))
+    except (OSError, ValueError):
+        pass
+    return None
+
 
+# One reader per interface, each behind its own lock: link probes run on the
+# shared probe executor and a netlink socket must not carry two requests at once.
+_nl_readers: Dict[str, Nl80211Reader] = {}
+_nl_locks: Dict[str, threading.Lock] = {}
+_nl_unavailable = False
 
-def link_metrics(interface: str) -> LinkMetrics:
+
+def read_link_stats(interface: str, backend: str = "auto") -> Optional[LinkMetrics]:
+    """Fork-free link statistics: nl80211 first, then ``/proc/net/wireless``.
+
+    Returns None when neither source is usable so the caller can fall back to
+    ``iw``. Cheap enough to call every second, from any thread.
+    """
+    global _nl_unavailable
+    if backend in ("auto", "nl80211") and not _nl_unavailable:
+        with _nl_locks.setdefault(interface, threading.Lock()):
+            reader = _nl_readers.get(interface)
+            try:
+                if reader is None:
+                    reader = _nl_readers[interface] = Nl80211Reader()
+                return _from_station(reader.read(interface), "nl80211")
+            except OSError as e:
+                # Missing family/permission is permanent; anything else (e.g. the
+                # interface vanished during a USB reset) retries with a fresh socket.
+                logger.debug("nl80211_read_failed", extra={"extra_fields": {"error": str(e)}})
+                if reader is None:
+                    _nl_unavailable = True
+                else:
+                    reader.close()
+                    del _nl_readers[interface]
+    if backend in ("auto", "procfs"):
+        info = read_proc_wireless(interface)
+        if info is not None:
+            return _from_station(info, "procfs")
+    return None
+
+
+def link_metrics(interface: str, backend: str = "auto") -> LinkMetrics:
+    if backend != "iw":
+        fast = read_link_stats(interface, backend)
+        if fast is not None or backend != "auto":
+            return fast or LinkMetrics(rssi=None, bitrate_mbps=None)
     try:
         cp = _run_cmd(["iw", "dev", interface, "link"], timeout=2)
         if cp.returncode != 0:
             return LinkMetrics(rssi=None, bitrate_mbps=None)
-        rssi = None
-        bitrate = None
-        for line in cp.stdout.splitlines():
-            line = line.strip()
-            if line.startswith("signal:"):
-                # e.g. signal: -54 dBm
-                parts = line.split()
-                if len(parts) >= 2:
-                    try:
-                        rssi = int(parts[1])
-                    except ValueError:
-                        pass
-            elif line.startswith("tx bitrate:"):
-                # e.g. tx bitrate: 72.2 MBit/s
-                parts = line.split()
-                for p in parts:
-                    if p.replace('.', '', 1).isdigit():
-                        try:
-                            bitrate = float(p)
-                            break
-                        except ValueError:
-                            pass
-        return LinkMetrics(rssi=rssi, bitrate_mbps=bitrate)
+        return _parse_iw_link(cp.stdout)
+    except Exception:
+        return LinkMetrics(rssi=None, bitrate_mbps=None)
+
+
+_PING_TIME_RE = re.compile(r"time[=<]([\d.]+) ms")
+
+# One prober per (backend, bound interface): interfaces never queue behind each other.
+_icmp_probers: Dict[tuple[str, Optional[str]], IcmpProber] = {}
+# Failed opens, by the same key: monotonic time of the next attempt. The cause is
+# often temporary (the interface is mid USB reset, ping_group_range not yet set).
+_icmp_retry_at: Dict[tuple[str, Optional[str]], float] = {}
+ICMP_RETRY_SECONDS = 60.0
+
+
+def _get_icmp_prober(backend: str, interface: Optional[str] = None) -> Optional[IcmpProber]:
+    """Return the shared ICMP prober, or None while sockets cannot be opened (retried every minute)."""
+    if backend == "subprocess":
+        return None
+    key = (backend, interface)
+    prober = _icmp_probers.get(key)
+    if prober is not None:
+        return prober
+    now = time.monotonic()
+    retry_at = _icmp_retry_at.get(key)
+    if retry_at is not None and now < retry_at:
+        return None
+    try:
+        prober = _icmp_probers[key] = IcmpProber(backend, interface)
+    except PermissionError as e:
+        log = logger.warning if retry_at is None else logger.debug
+        log("icmp_socket_unavailable", extra={"extra_fields": {"interface": interface, "error": str(e)}})
+        _icmp_retry_at[key] = now + ICMP_RETRY_SECONDS
+        return None
+    _icmp_retry_at.pop(key, None)
+    return prober
+
+
+async def _ping_one_async(host: str, timeout_ms: int, interface: Optional[str] = None) -> PingResult:
+    """Fallback prober using the system ``ping`` binary (one echo)."""
+    wait_s = max(1, math.ceil(timeout_ms / 1000))  # -W takes whole seconds; never 0
+    argv = ["ping", "-n", "-c", "1", "-W", str(wait_s)] + (["-I", interface] if interface else []) + [host]
+    try:
+        rc, out = await _run_cmd_async(argv, timeout=wait_s + 1)
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        rc, out = 1, ""
+    success = rc == 0
+    latency = None
+    if success:
+        m = _PING_TIME_RE.search(out)
+        latency = float(m.group(1)) if m else None
+    return PingResult(
+        host=host, success=success, latency_ms=latency, sent=1,
+        received=1 if success else 0, loss_pct=0.0 if success else 100.0,
+    )
+
+
+async def ping_hosts_async(
+    hosts: List[str], timeout_ms: int, icmp: IcmpSettings, interface: Optional[str] = None
+) -> List[PingResult]:
+    """Echo every host concurrently; ``interface`` binds the probes when ``icmp.bind_interface`` is set."""
+    bind = interface if icmp.bind_interface else None
+    prober = _get_icmp_prober(icmp.backend, bind)
+    if prober is None:
+        return list(await asyncio.gather(*(_ping_one_async(h, timeout_ms, bind) for h in hosts)))
+    stats = await prober.probe(hosts, icmp.count, icmp.interval_ms, timeout_ms)
+    results = []
+    for h in hosts:
+        st = stats[h]
+        results.append(PingResult(
+            host=h, success=st.received > 0, latency_ms=st.avg_rtt_ms, sent=st.sent,
+            received=st.received, loss_pct=st.loss_pct, jitter_ms=st.jitter_ms,
+        ))
+    return results
+
+
+async def _link_metrics_async(interface: str, backend: str = "auto") -> LinkMetrics:
+    if backend != "iw":
+        loop = asyncio.get_running_loop()
+        fast = await loop.run_in_executor(_probe_pool(interface), read_link_stats, interface, backend)
+        if fast is not None or backend != "auto":
+            return fast or LinkMetrics(rssi=None, bitrate_mbps=None)
+    try:
+        rc, out = await _run_cmd_async(["iw", "dev", interface, "link"], timeout=2)
+    except asyncio.CancelledError:
+        raise
     except Exception:
         return LinkMetrics(rssi=None, bitrate_mbps=None)
+    if rc != 0:
+        return LinkMetrics(rssi=None, bitrate_mbps=None)
+    return _parse_iw_link(out)
+
+
+async def _gateway_probe_async(cfg: Config) -> GatewayResult:
+    """Check the interface's address, lease and default gateway (ARP and one ICMP echo).
+
+    Everything but the two gateway probes is a procfs/sysfs read or one ioctl.
+    Without packet-socket permission the ARP verdict comes from the kernel
+    neighbour table, read after the echo so the kernel has just resolved (or
+    failed to resolve) the gateway.
+    """
+    iface = cfg.interface
+    result = GatewayResult(
+        gateway=read_default_gateway(iface),
+        operstate=read_operstate(iface),
+        address=interface_address(iface),
+        lease_remaining_s=read_lease_remaining(iface, cfg.gateway.lease_file),
+    )
+    gw = result.gateway
+    if gw is None:
+        return result
+    icmp = IcmpSettings(backend=cfg.icmp.backend, count=1, interval_ms=0, bind_interface=cfg.icmp.bind_interface)
+    arp = arp_probe(iface, gw, result.address, cfg.gateway.arp_timeout_ms) if result.address else asyncio.sleep(0)
+    mac, pings = await asyncio.gather(arp, ping_hosts_async([gw], cfg.timeouts.ping_ms, icmp, iface))
+    result.icmp_ok = pings[0].success
+    result.latency_ms = pings[0].latency_ms
+    if mac is None:
+        mac = read_neighbor(gw, iface)
+        result.arp_source = "neigh"
+    else:
+        result.arp_source = "probe"
+    result.arp_ok = bool(mac)
+    result.mac = mac or None
+    return result
+
+
+PROBE_KINDS = ("link", "ping", "dns", "http", "gateway")
+
+
+def active_probe_kinds(cfg: Config) -> List[str]:
+    """Probe kinds that run for ``cfg``: HTTP and gateway probes are optional."""
+    optional = {"http": bool(cfg.hosts.http_probe), "gateway": cfg.gateway.enabled}
+    return [k for k in PROBE_KINDS if optional.get(k, True)]
+
+
+def _start_probe(cfg: Config, kind: str) -> "asyncio.Future[Any]":
+    loop = asyncio.get_running_loop()
+    if kind == "ping":
+        return asyncio.ensure_future(ping_hosts_async(cfg.hosts.ping, cfg.timeouts.ping_ms, cfg.icmp, cfg.interface))
+    if kind == "dns":
+        return asyncio.ensure_future(
+            dns_lookup_async(cfg.hosts.dns_lookup, cfg.timeouts.dns_ms, cfg.hosts.dns_servers, cfg.interface)
+        )
+    if kind == "http":
+        return loop.run_in_executor(
+            _probe_pool(cfg.interface), http_probe, cfg.hosts.http_probe, cfg.timeouts.http_ms, cfg.interface
+        )
+    if kind == "link":
+        return asyncio.ensure_future(_link_metrics_async(cfg.interface, cfg.link.backend))
+    if kind == "gateway":
+        return asyncio.ensure_future(_gateway_probe_async(cfg))
+    raise ValueError(f"unknown probe kind: {kind}")
+
+
+def _probe_fallback(cfg: Config, kind: str) -> Any:
+    """Result reported for a probe that timed out or raised."""
+    if kind == "ping":
+        return [PingResult(host=h, success=False, latency_ms=None, loss_pct=100.0) for h in cfg.hosts.ping]
+    if kind == "dns":
+        return DnsResult(hostname=cfg.hosts.dns_lookup, success=False, latency_ms=None)
+    if kind == "http":
+        return HttpResult(url=cfg.hosts.http_probe or "", success=False, latency_ms=None, status=None)
+    if kind == "gateway":
+        return None  # unknown rather than unreachable: a hung probe says nothing about the LAN
+    return LinkMetrics(rssi=None, bitrate_mbps=None)
+
+
+async def probe_once(cfg: Config, kind: str) -> Any:
+    """Run a single probe kind under the ``timeouts.cycle_ms`` deadline."""
+    fut = _start_probe(cfg, kind)
+    done, _ = await asyncio.wait([fut], timeout=cfg.timeouts.cycle_ms / 1000.0)
+    if not done:
+        fut.cancel()
+        return _probe_fallback(cfg, kind)
+    if fut.cancelled() or fut.exception() is not None:
+        return _probe_fallback(cfg, kind)
+    return fut.result()
+
+
+async def gather_snapshot_async(cfg: Config) -> ConnectivitySnapshot:
+    """Run every probe concurrently under one ``timeouts.cycle_ms`` deadline.
+
+    A cycle costs roughly as long as its slowest probe instead of the sum of all
+    of them. Probes still outstanding at the deadline are cancelled and reported
+    as failures.
+    """
+    kinds = active_probe_kinds(cfg)
+    futures = {k: _start_probe(cfg, k) for k in kinds}
+    _, not_done = await asyncio.wait(futures.values(), timeout=cfg.timeouts.cycle_ms / 1000.0)
+    for fut in not_done:
+        fut.cancel()
+
+    def _result(kind):
+        fut = futures.get(kind)
+        if fut is None:
+            return None
+        if fut in not_done or fut.cancelled() or fut.exception() is not None:
+            return _probe_fallback(cfg, kind)
+        return fut.result()
+
+    return ConnectivitySnapshot(
+        ping_results=_result("ping"), dns_result=_result("dns"), http_result=_result("http"), link=_result("link"),
+        gateway=_result("gateway"),
+    )
 
 
 def gather_snapshot(cfg: Config) -> ConnectivitySnapshot:
-    pings = ping_hosts(cfg.hosts.ping, cfg.timeouts.ping_ms)
-    dns_res = dns_lookup(cfg.hosts.dns_lookup, cfg.timeouts.dns_ms)
-    http_res = http_probe(cfg.hosts.http_probe, cfg.timeouts.http_ms) if cfg.hosts.http_probe else None
-    link = link_metrics(cfg.interface)
-    return ConnectivitySnapshot(ping_results=pings, dns_result=dns_res, http_result=http_res, link=link)
+    """Synchronous wrapper around :func:`gather_snapshot_async`."""
+    return asyncio.run(gather_snapshot_async(cfg))
 
 __all__ = [
     "PingResult",
@@ -134,4 +519,9 @@ __all__ = [
     "LinkMetrics",
     "ConnectivitySnapshot",
     "gather_snapshot",
+    "gather_snapshot_async",
+    "probe_once",
+    "ping_hosts_async",
+    "active_probe_kinds",
+    "PROBE_KINDS",
 ]
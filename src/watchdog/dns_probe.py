@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import logging
+import random
+import socket
+import struct
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+QTYPE_A = 1
+QCLASS_IN = 1
+FLAG_RD = 0x0100
+FLAG_TC = 0x0200
+FLAG_QR = 0x8000
+RCODE_NAMES = {0: "NOERROR", 1: "FORMERR", 2: "SERVFAIL", 3: "NXDOMAIN", 4: "NOTIMP", 5: "REFUSED"}
+_HEADER = struct.Struct("!HHHHHH")
+
+
+class DnsProtocolError(Exception):
+    """Malformed or mismatched response."""
+
+
+@dataclass(slots=True)
+class ResolverResult:
+    server: str
+    success: bool  # NOERROR with at least one answer
+    latency_ms: Optional[float]
+    rcode: Optional[str] = None
+    answers: int = 0
+    transport: str = "udp"
+    error: Optional[str] = None
+
+
+def build_query(hostname: str, qid: int, qtype: int = QTYPE_A) -> bytes:
+    qname = b"".join(
+        bytes([len(label)]) + label for label in (p.encode("idna") for p in hostname.rstrip(".").split(".")) if label
+    ) + b"\0"
+    return _HEADER.pack(qid, FLAG_RD, 1, 0, 0, 0) + qname + struct.pack("!HH", qtype, QCLASS_IN)
+
+
+def parse_response(data: bytes, qid: int) -> Tuple[int, int, bool]:
+    """Return ``(rcode, answer_count, truncated)`` for a response to ``qid``."""
+    if len(data) < _HEADER.size:
+        raise DnsProtocolError("short response")
+    rid, flags, _qd, an, _ns, _ar = _HEADER.unpack_from(data)
+    if rid != qid or not flags & FLAG_QR:
+        raise DnsProtocolError("id mismatch")
+    return flags & 0x000F, an, bool(flags & FLAG_TC)
+
+
+def read_resolv_conf(path: str = "/etc/resolv.conf") -> List[str]:
+    servers: List[str] = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] == "nameserver":
+                    servers.append(parts[1])
+    except OSError:
+        pass
+    return servers
+
+
+class _UdpExchange(asyncio.DatagramProtocol):
+    def __init__(self, qid: int) -> None:
+        self.qid = qid
+        self.response: asyncio.Future[bytes] = asyncio.get_running_loop().create_future()
+
+    def datagram_received(self, data: bytes, addr) -> None:  # type: ignore[override]
+        if self.response.done():
+            return
+        try:
+            parse_response(data, self.qid)
+        except DnsProtocolError:
+            return  # stray or spoofed packet; keep waiting
+        self.response.set_result(data)
+
+    def error_received(self, exc: Exception) -> None:  # type: ignore[override]
+        if not self.response.done():
+            self.response.set_exception(exc)
+
+
+def _socket(server: str, kind: int, interface: Optional[str]) -> socket.socket:
+    """Non-blocking socket for ``server``, bound to ``interface`` (SO_BINDTODEVICE) when given."""
+    family = socket.AF_INET6 if ipaddress.ip_address(server).version == 6 else socket.AF_INET
+    sock = socket.socket(family, kind)
+    try:
+        if interface:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BINDTODEVICE, interface.encode() + b"\0")
+        sock.setblocking(False)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+async def _query_udp(server: str, port: int, query: bytes, qid: int, interface: Optional[str] = None) -> bytes:
+    loop = asyncio.get_running_loop()
+    sock = _socket(server, socket.SOCK_DGRAM, interface)
+    try:
+        sock.connect((server, port))
+    except OSError:
+        sock.close()
+        raise
+    transport, protocol = await loop.create_datagram_endpoint(lambda: _UdpExchange(qid), sock=sock)
+    try:
+        transport.sendto(query)
+        return await protocol.response
+    finally:
+        transport.close()
+
+
+async def _query_tcp(server: str, port: int, query: bytes, interface: Optional[str] = None) -> bytes:
+    sock = _socket(server, socket.SOCK_STREAM, interface)
+    try:
+        await asyncio.get_running_loop().sock_connect(sock, (server, port))
+    except BaseException:
+        sock.close()
+        raise
+    reader, writer = await asyncio.open_connection(sock=sock)
+    try:
+        writer.write(struct.pack("!H", len(query)) + query)
+        await writer.drain()
+        (length,) = struct.unpack("!H", await reader.readexactly(2))
+        return await reader.readexactly(length)
+    finally:
+        writer.close()
+
+
+async def query_resolver(
+    server: str, hostname: str, timeout_ms: int, port: int = 53, interface: Optional[str] = None
+) -> ResolverResult:
+    """Resolve ``hostname`` against one server with a hard deadline.
+
+    Falls back to TCP when the UDP answer is truncated. With ``interface`` the
+    query leaves through that device only. Never raises.
+    """
+    qid = random.getrandbits(16)
+    query = build_query(hostname, qid)
+    start = time.perf_counter()
+    transport = "udp"
+    try:
+        async with asyncio.timeout(timeout_ms / 1000.0):
+            data = await _query_udp(server, port, query, qid, interface)
+            rcode, answers, truncated = parse_response(data, qid)
+            if truncated:
+                transport = "tcp"
+                data = await _query_tcp(server, port, query, interface)
+                rcode, answers, _ = parse_response(data, qid)
+    except TimeoutError:
+        return ResolverResult(server=server, success=False, latency_ms=None, transport=transport, error="timeout")
+    except (OSError, ValueError, DnsProtocolError, asyncio.IncompleteReadError) as e:
+        return ResolverResult(server=server, success=False, latency_ms=None, transport=transport, error=str(e) or type(e).__name__)
+    latency = (time.perf_counter() - start) * 1000.0
+    return ResolverResult(
+        server=server,
+        success=rcode == 0 and answers > 0,
+        latency_ms=latency,
+        rcode=RCODE_NAMES.get(rcode, str(rcode)),
+        answers=answers,
+        transport=transport,
+    )
+
+
+async def probe_resolvers(
+    hostname: str, servers: List[str], timeout_ms: int, port: int = 53, interface: Optional[str] = None
+) -> List[ResolverResult]:
+    """Query every server concurrently; each is bounded by ``timeout_ms``."""
+    return list(await asyncio.gather(*(query_resolver(s, hostname, timeout_ms, port, interface) for s in servers)))
+
+
+__all__ = [
+    "ResolverResult",
+    "build_query",
+    "parse_response",
+    "probe_resolvers",
+    "query_resolver",
+    "read_resolv_conf",
+]
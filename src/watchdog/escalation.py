@@ -4,12 +4,12 @@ import dataclasses as dc
 import logging
 import time
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, Optional
 import os
 
 from .config import Config, EscalationTier
 from .metrics import HealthState, ClassificationResult
-from . import recovery_steps as steps
+from .recovery import RecoveryControl
 from .status import append_action_history, inc_tier_counter
 
 logger = logging.getLogger(__name__)
@@ -20,8 +20,9 @@ class TierState:
 
 
 class EscalationManager:
-    def __init__(self, cfg: Config) -> None:
+    def __init__(self, cfg: Config, clock: Callable[[], float] = time.time) -> None:
         self.cfg = cfg
+        self._clock = clock
         self._tiers = cfg.escalation.tiers
         self._tier_states: Dict[str, TierState] = {t.name: TierState() for t in self._tiers}
         self._current_index = 0
@@ -30,9 +31,63 @@ class EscalationManager:
         self._reboot_day = self._today_key()
         self._load_reboot_state()
         self._last_reboot_ts = 0.0
+        self._hold_until = 0.0
+        # Called on the tier's thread once a reboot is allowed, right before it is issued.
+        self.before_reboot: Optional[Callable[[], None]] = None
+
+    def reconfigure(self, cfg: Config) -> None:
+        """Adopt ``cfg``'s ladder, keeping per-tier state, the ladder position and reboot accounting."""
+        current = self._tiers[self._current_index].name if self._current_index < len(self._tiers) else None
+        self.cfg = cfg
+        self._tiers = cfg.escalation.tiers
+        self._tier_states = {t.name: self._tier_states.get(t.name) or TierState() for t in self._tiers}
+        names = [t.name for t in self._tiers]
+        if current in names:
+            self._current_index = names.index(current)
+        else:
+            self._current_index = min(self._current_index, len(self._tiers) - 1)
+
+    def export_state(self) -> Dict[str, Any]:
+        """Ladder position, per-tier last invocation and reboot spacing, for a warm-start snapshot."""
+        current = self._tiers[self._current_index].name if self._current_index < len(self._tiers) else None
+        return {
+            "ladder_tier": current,
+            "ladder_index": self._current_index,
+            "consecutive_healthy": self._consecutive_healthy,
+            "tiers": {name: s.last_invoked for name, s in self._tier_states.items()},
+            "last_reboot_ts": self._last_reboot_ts,
+        }
+
+    def restore_state(self, data: Dict[str, Any], ladder: bool = True, tier_times: bool = True) -> None:
+        """Apply :meth:`export_state` output; timestamps in the future are dropped.
+
+        Tiers are matched by name, as in :meth:`reconfigure`. With ``ladder``
+        False only the timestamps are restored and the ladder starts over;
+        with ``tier_times`` also False only the last reboot time is.
+        """
+        now = self._clock()
+        if tier_times:
+            for name, ts in (data.get("tiers") or {}).items():
+                if name in self._tier_states and 0 < ts <= now:
+                    self._tier_states[name].last_invoked = float(ts)
+        ts = data.get("last_reboot_ts") or 0.0
+        if 0 < ts <= now:
+            self._last_reboot_ts = float(ts)
+        if not ladder:
+            return
+        names = [t.name for t in self._tiers]
+        if data.get("ladder_tier") in names:
+            self._current_index = names.index(data["ladder_tier"])
+        else:
+            self._current_index = min(int(data.get("ladder_index") or 0), len(self._tiers) - 1)
+        self._consecutive_healthy = int(data.get("consecutive_healthy") or 0)
+
+    def hold(self, seconds: float) -> None:
+        """Suppress further escalation for ``seconds`` (0 releases an existing hold)."""
+        self._hold_until = self._clock() + seconds if seconds > 0 else 0.0
 
     def _today_key(self) -> str:
-        return time.strftime("%Y-%m-%d")
+        return time.strftime("%Y-%m-%d", time.localtime(self._clock()))
 
     def _reboot_state_file(self) -> Path:
         return Path(self.cfg.paths.state_dir) / "reboot_state.txt"
@@ -66,45 +121,82 @@ class EscalationManager:
         else:
             self._consecutive_healthy = 0
 
-    def maybe_escalate(self, classification: ClassificationResult) -> Optional[str]:
+    def next_tier(self, classification: ClassificationResult) -> Optional[EscalationTier]:
+        """Pick the tier due for ``classification`` and advance the ladder past it, or None.
+
+        The caller runs the tier with :meth:`run_tier`, typically off the event loop,
+        then reports the outcome with :meth:`record_invocation` back on the event loop.
+        """
         if classification.state == HealthState.HEALTHY:
             return None
+        if self._hold_until and self._clock() < self._hold_until:
+            return None  # the previous tier is still being verified or converging
         # escalate only if lost or degraded persist
         tier = self._tiers[self._current_index] if self._current_index < len(self._tiers) else None
         if not tier or not tier.enabled:
             return None
         state = self._tier_states[tier.name]
-        now = time.time()
+        now = self._clock()
         if now - state.last_invoked < tier.min_interval_seconds:
             return None
-
-        success = self._invoke_tier(tier)
         state.last_invoked = now
         # advance ladder regardless of success to avoid stalling on a broken tier
         if self._current_index < len(self._tiers) - 1:
             self._current_index += 1
+        return tier
+
+    def run_tier(self, tier: EscalationTier, control: Optional[RecoveryControl] = None) -> bool:
+        """Execute ``tier``; safe on a worker thread because it records nothing itself."""
+        return self._invoke_tier(tier, control)
+
+    def maybe_escalate(self, classification: ClassificationResult) -> Optional[str]:
+        """Pick and run the due tier inline; returns its name."""
+        tier = self.next_tier(classification)
+        if tier is None:
+            return None
+        self.record_invocation(tier.name, self.run_tier(tier))
+        return tier.name
+
+    def record_invocation(self, tier: str, success: bool) -> None:
+        """Write history, counters and metrics for a finished tier (event-loop thread only)."""
         try:
-            append_action_history(self.cfg, {"event": "tier_invoke", "tier": tier.name, "success": success})
-            inc_tier_counter(tier.name)
+            append_action_history(self.cfg, {"event": "tier_invoke", "tier": tier, "success": success})
+            inc_tier_counter(tier, self.cfg.interface)
+            if self.cfg.features.metrics_listen:
+                from .exporter import REGISTRY  # deferred: only loaded with the /metrics endpoint
+
+                REGISTRY.record_tier(self.cfg.interface, tier, success)
         except Exception:  # pragma: no cover
             pass
-        return tier.name
 
-    def _invoke_tier(self, tier: EscalationTier) -> bool:
+    def _uptime_seconds(self) -> Optional[float]:
+        try:
+            with open("/proc/uptime", "r", encoding="utf-8") as f:
+                return float(f.read().split()[0])
+        except Exception:
+            return None
+
+    def _invoke_tier(self, tier: EscalationTier, control: Optional[RecoveryControl] = None) -> bool:
         logger.info("invoke_tier", extra={"extra_fields": {"tier": tier.name}})
+        from . import recovery_steps as steps  # deferred until the first tier: keeps daemon startup short
+
+        if tier.name == "wpa_reconnect":
+            return steps.wpa_reconnect(self.cfg, tier, control)
         if tier.name == "refresh_dhcp":
-            return steps.refresh_dhcp(self.cfg)
+            return steps.refresh_dhcp(self.cfg, control)
         if tier.name == "restart_network_services":
-            return steps.restart_network_services(self.cfg, tier)
+            return steps.restart_network_services(self.cfg, tier, control)
         if tier.name == "cycle_interface":
-            return steps.cycle_interface(self.cfg)
+            return steps.cycle_interface(self.cfg, control)
         if tier.name == "reset_usb_device":
-            return steps.reset_usb_device(self.cfg, tier)
+            return steps.reset_usb_device(self.cfg, tier, control)
         if tier.name == "power_cycle_hub":
-            return steps.power_cycle_hub(self.cfg, tier)
+            return steps.power_cycle_hub(self.cfg, tier, control)
         if tier.name == "reboot":
             if self._allow_reboot():
-                ok = steps.reboot_system(self.cfg)
+                if self.before_reboot is not None:
+                    self.before_reboot()
+                ok = steps.reboot_system(self.cfg, control)
                 if ok:
                     self._reboots_today += 1
                     self._persist_reboot_state()
@@ -116,6 +208,8 @@ class EscalationManager:
         return False
 
     def _allow_reboot(self) -> bool:
+        # Reboots are system-wide: pick up reboots counted by other interface monitors.
+        self._load_reboot_state()
         # simple frequency guard
         if self._today_key() != self._reboot_day:
             self._reboot_day = self._today_key()
@@ -123,15 +217,11 @@ class EscalationManager:
         if self._reboots_today >= self.cfg.limits.max_reboots_per_day:
             return False
         # uptime guard
-        try:
-            with open("/proc/uptime", "r", encoding="utf-8") as f:
-                uptime_seconds = float(f.read().split()[0])
-            if uptime_seconds < self.cfg.limits.min_uptime_before_reboot:
-                logger.info("skip_reboot_min_uptime", extra={"extra_fields": {"uptime": uptime_seconds}})
-                return False
-        except Exception:
-            pass
-        now = time.time()
+        uptime_seconds = self._uptime_seconds()
+        if uptime_seconds is not None and uptime_seconds < self.cfg.limits.min_uptime_before_reboot:
+            logger.info("skip_reboot_min_uptime", extra={"extra_fields": {"uptime": uptime_seconds}})
+            return False
+        now = self._clock()
         if self._last_reboot_ts and (now - self._last_reboot_ts) < self.cfg.limits.min_seconds_between_reboots:
             logger.info("skip_reboot_spacing", extra={"extra_fields": {"since_last": now - self._last_reboot_ts}})
             return False
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import socket
+import struct
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from .nl80211 import NLM_F_DUMP, NLM_F_REQUEST, NLMSG_DONE, NLMSG_ERROR, iter_attrs
+from .wpa_ctrl import WpaCtrl, parse_event
+
+logger = logging.getLogger(__name__)
+
+# rtnetlink (linux/rtnetlink.h, linux/if_link.h, linux/if.h)
+NETLINK_ROUTE = 0
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV4_ROUTE = 0x40
+RTMGRP_IPV6_IFADDR = 0x100
+RTMGRP_IPV6_ROUTE = 0x400
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_GETLINK = 18
+RTM_NEWADDR = 20
+RTM_DELADDR = 21
+RTM_NEWROUTE = 24
+RTM_DELROUTE = 25
+IFLA_IFNAME = 3
+RTA_OIF = 4
+RT_TABLE_MAIN = 254
+IFF_UP = 0x1
+IFF_RUNNING = 0x40
+IFF_LOWER_UP = 0x10000
+_CARRIER_FLAGS = IFF_UP | IFF_RUNNING | IFF_LOWER_UP
+
+_NLMSGHDR = struct.Struct("=IHHII")
+_IFINFOMSG = struct.Struct("=BxHiII")
+_IFADDRMSG = struct.Struct("=BBBBI")
+_RTMSG = struct.Struct("=BBBBBBBBI")
+
+# wpa_supplicant events worth an immediate look; scan chatter and the like is ignored.
+WPA_EVENTS = frozenset({
+    "CTRL-EVENT-CONNECTED",
+    "CTRL-EVENT-DISCONNECTED",
+    "CTRL-EVENT-ASSOC-REJECT",
+    "CTRL-EVENT-AUTH-REJECT",
+    "CTRL-EVENT-SSID-TEMP-DISABLED",
+    "CTRL-EVENT-BEACON-LOSS",
+    "CTRL-EVENT-TERMINATING",
+})
+
+
+@dataclass(slots=True)
+class LinkEvent:
+    interface: str
+    source: str  # rtnetlink | wpa_supplicant
+    kind: str  # e.g. carrier_down, addr_del, default_route_new, CTRL-EVENT-DISCONNECTED
+    detail: str = ""
+
+
+def _ifname(index: int) -> Optional[str]:
+    try:
+        return socket.if_indextoname(index)
+    except OSError:
+        return None
+
+
+def parse_rtnetlink(data: bytes, carrier: Dict[int, int]) -> List[LinkEvent]:
+    """Turn a batch of rtnetlink messages into events worth re-probing for.
+
+    ``carrier`` remembers the last up/running/lower-up flags per ifindex, so the
+    frequent RTM_NEWLINK notifications that change nothing relevant (wireless
+    extension events, statistics) are dropped. An interface seen for the first
+    time counts as a change unless it is fully up: the listener seeds
+    ``carrier`` at start, so an unseen index is a new device or a missed dump.
+    """
+    events: List[LinkEvent] = []
+    offset = 0
+    while offset + _NLMSGHDR.size <= len(data):
+        length, msg_type, _, _, _ = _NLMSGHDR.unpack_from(data, offset)
+        if length < _NLMSGHDR.size:
+            break
+        body = offset + _NLMSGHDR.size
+        end = offset + length
+        offset += (length + 3) & ~3
+        if msg_type in (RTM_NEWLINK, RTM_DELLINK) and body + _IFINFOMSG.size <= end:
+            _, _, index, flags, _ = _IFINFOMSG.unpack_from(data, body)
+            name = None
+            for attr, payload in iter_attrs(data, body + _IFINFOMSG.size, end):
+                if attr == IFLA_IFNAME:
+                    name = payload.rstrip(b"\0").decode(errors="replace")
+            name = name or _ifname(index)
+            if name is None:
+                continue
+            if msg_type == RTM_DELLINK:
+                carrier.pop(index, None)
+                events.append(LinkEvent(name, "rtnetlink", "link_removed"))
+                continue
+            state = flags & _CARRIER_FLAGS
+            previous = carrier.get(index)
+            carrier[index] = state
+            if previous != state and (previous is not None or state != _CARRIER_FLAGS):
+                up = state == _CARRIER_FLAGS
+                events.append(LinkEvent(name, "rtnetlink", "carrier_up" if up else "carrier_down", f"flags=0x{flags:x}"))
+        elif msg_type in (RTM_NEWADDR, RTM_DELADDR) and body + _IFADDRMSG.size <= end:
+            family, prefixlen, _, _, index = _IFADDRMSG.unpack_from(data, body)
+            name = _ifname(index)
+            if name is not None:
+                kind = "addr_new" if msg_type == RTM_NEWADDR else "addr_del"
+                fam = "inet6" if family == socket.AF_INET6 else "inet"
+                events.append(LinkEvent(name, "rtnetlink", kind, f"{fam}/{prefixlen}"))
+        elif msg_type in (RTM_NEWROUTE, RTM_DELROUTE) and body + _RTMSG.size <= end:
+            family, dst_len, _, _, table, _, _, _, _ = _RTMSG.unpack_from(data, body)
+            if dst_len != 0 or table != RT_TABLE_MAIN:
+                continue  # only the default route matters for reachability
+            for attr, payload in iter_attrs(data, body + _RTMSG.size, end):
+                if attr == RTA_OIF and len(payload) >= 4:
+                    name = _ifname(struct.unpack("=I", payload[:4])[0])
+                    if name is not None:
+                        kind = "default_route_new" if msg_type == RTM_NEWROUTE else "default_route_del"
+                        events.append(LinkEvent(name, "rtnetlink", kind,
+                                                "inet6" if family == socket.AF_INET6 else "inet"))
+    return events
+
+
+class RtnetlinkListener:
+    """Subscribe to link, address and route multicast groups on the event loop."""
+
+    GROUPS = RTMGRP_LINK | RTMGRP_IPV4_IFADDR | RTMGRP_IPV6_IFADDR | RTMGRP_IPV4_ROUTE | RTMGRP_IPV6_ROUTE
+
+    def __init__(self, callback: Callable[[LinkEvent], None]) -> None:
+        self.callback = callback
+        self._sock: Optional[socket.socket] = None
+        self._carrier: Dict[int, int] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self) -> None:
+        self._seed_carrier()
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 18)
+            sock.bind((0, self.GROUPS))
+            sock.setblocking(False)
+        except OSError:
+            sock.close()
+            raise
+        self._sock = sock
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(sock.fileno(), self._on_readable)
+
+    def _seed_carrier(self) -> None:
+        """Record every interface's current flags (RTM_GETLINK dump) as the baseline.
+
+        Without it the first notification for an interface only sets the
+        baseline, and a carrier loss that happens to be that first one is lost.
+        """
+        try:
+            with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE) as sock:
+                sock.settimeout(1.0)
+                body = _IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0)
+                sock.send(_NLMSGHDR.pack(_NLMSGHDR.size + len(body), RTM_GETLINK,
+                                         NLM_F_REQUEST | NLM_F_DUMP, 1, 0) + body)
+                done = False
+                while not done:
+                    data = sock.recv(65536)
+                    parse_rtnetlink(data, self._carrier)  # fills the map; the events are startup noise
+                    offset = 0
+                    while offset + _NLMSGHDR.size <= len(data):
+                        length, msg_type, _, _, _ = _NLMSGHDR.unpack_from(data, offset)
+                        done = done or msg_type in (NLMSG_DONE, NLMSG_ERROR)
+                        if length < _NLMSGHDR.size:
+                            break
+                        offset += (length + 3) & ~3
+        except OSError as e:
+            logger.warning("rtnetlink_dump_failed", extra={"extra_fields": {"error": str(e)}})
+
+    def _on_readable(self) -> None:
+        sock = self._sock
+        if sock is None:
+            return
+        while True:
+            try:
+                data = sock.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:  # ENOBUFS: events were dropped; the next cycle will notice anyway
+                logger.warning("rtnetlink_recv_error", extra={"extra_fields": {"error": str(e)}})
+                return
+            for event in parse_rtnetlink(data, self._carrier):
+                self.callback(event)
+
+    def close(self) -> None:
+        if self._sock is not None:
+            if self._loop is not None:
+                self._loop.remove_reader(self._sock.fileno())
+            self._sock.close()
+            self._sock = None
+
+
+class WpaEventListener:
+    """Attach to wpa_supplicant's control socket and forward link-relevant events.
+
+    While attached, a ``PING`` goes out every ``ping_seconds``; no ``PONG``
+    within ``pong_timeout`` means wpa_supplicant went away without a
+    TERMINATING event (killed, hung, restarted) and the attachment is dropped.
+    Reattach attempts back off from one second up to ``retry_seconds``.
+    """
+
+    RETRY_INITIAL_SECONDS = 1.0
+
+    def __init__(self, interface: str, ctrl_dir: str, callback: Callable[[LinkEvent], None],
+                 retry_seconds: float = 10.0, ping_seconds: float = 10.0, pong_timeout: float = 2.0) -> None:
+        self.interface = interface
+        self.ctrl_dir = ctrl_dir
+        self.callback = callback
+        self.retry_seconds = retry_seconds
+        self.ping_seconds = ping_seconds
+        self.pong_timeout = pong_timeout
+        self._ctrl: Optional[WpaCtrl] = None
+        self._pong = asyncio.Event()
+
+    async def _keepalive(self, lost: asyncio.Event) -> None:
+        while True:
+            await asyncio.sleep(self.ping_seconds)
+            self._pong.clear()
+            try:
+                if self._ctrl is None:
+                    return
+                self._ctrl.send("PING")
+                await asyncio.wait_for(self._pong.wait(), self.pong_timeout)
+            except (OSError, asyncio.TimeoutError) as e:
+                logger.warning("wpa_events_lost", extra={"extra_fields": {
+                    "interface": self.interface, "error": str(e) or "no PONG"}})
+                lost.set()
+                return
+
+    def _drain(self, lost: asyncio.Event) -> None:
+        ctrl = self._ctrl
+        while ctrl is not None:
+            try:
+                message = ctrl.recv_event()
+            except OSError:
+                lost.set()
+                return
+            if message is None:
+                return
+            level, text = parse_event(message)
+            if level is None:
+                if text == "PONG":
+                    self._pong.set()
+                continue
+            name, _, detail = text.partition(" ")
+            if name in WPA_EVENTS:
+                self.callback(LinkEvent(self.interface, "wpa_supplicant", name, detail))
+                if name == "CTRL-EVENT-TERMINATING":
+                    lost.set()
+                    return
+
+    async def run(self, stop: asyncio.Event) -> None:
+        loop = asyncio.get_running_loop()
+        warned = False
+        delay = min(self.RETRY_INITIAL_SECONDS, self.retry_seconds)
+        while not stop.is_set():
+            lost = asyncio.Event()
+            try:
+                self._ctrl = WpaCtrl(self.interface, self.ctrl_dir).open()
+                await loop.run_in_executor(None, self._ctrl.attach)
+            except (OSError, TimeoutError) as e:
+                self.close()
+                if not warned:
+                    logger.info("wpa_events_unavailable", extra={"extra_fields": {"interface": self.interface,
+                                                                                  "error": str(e)}})
+                    warned = True
+            else:
+                warned = False
+                delay = min(self.RETRY_INITIAL_SECONDS, self.retry_seconds)
+                logger.info("wpa_events_attached", extra={"extra_fields": {"interface": self.interface}})
+                fd = self._ctrl.fileno()
+                loop.add_reader(fd, self._drain, lost)
+                waiters = [asyncio.ensure_future(stop.wait()), asyncio.ensure_future(lost.wait()),
+                           asyncio.ensure_future(self._keepalive(lost))]
+                try:
+                    await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    for w in waiters:
+                        w.cancel()
+                    loop.remove_reader(fd)
+                    self.close()
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, self.retry_seconds)
+
+    def close(self) -> None:
+        if self._ctrl is not None:
+            self._ctrl.close()
+            self._ctrl = None
+
+
+__all__ = ["LinkEvent", "RtnetlinkListener", "WpaEventListener", "parse_rtnetlink", "WPA_EVENTS"]
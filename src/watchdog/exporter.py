@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .config import Config
+from .connectivity import ConnectivitySnapshot
+from .metrics import ClassificationResult, FaultLevel
+
+logger = logging.getLogger(__name__)
+
+RTT_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+LOSS_BUCKETS_PCT = (0, 10, 25, 50, 75, 100)
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+CYCLE_BUCKETS_S = (0.05, 0.1, 0.25, 0.5, 1, 2, 3, 5, 10, 30)
+RECOVER_BUCKETS_S = (0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600)
+_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+_MAX_REQUEST_BYTES = 8192
+FAULT_LEVELS = (FaultLevel.LINK, FaultLevel.LAN, FaultLevel.DNS, FaultLevel.UPSTREAM)
+
+
+def _labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    return ",".join(f'{k}="{v}"' for k, v in pairs)
+
+
+class Histogram:
+    """Fixed-bucket histogram backed by a preallocated array.
+
+    Only the event-loop thread observes; a scrape reads the counts in between,
+    so no lock is needed and a scrape can never hold up the probe loop.
+    """
+
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = array("Q", bytes(8 * (len(self.bounds) + 1)))  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def render(self, name: str, labels: Sequence[Tuple[str, str]], out: List[str]) -> None:
+        cumulative = 0
+        for bound, n in zip(self.bounds, self.counts):
+            cumulative += n
+            out.append(f"{name}_bucket{{{_labels([*labels, ('le', str(bound))])}}} {cumulative}")
+        cumulative += self.counts[-1]
+        out.append(f"{name}_bucket{{{_labels([*labels, ('le', '+Inf')])}}} {cumulative}")
+        lbl = _labels(labels)
+        out.append(f"{name}_sum{{{lbl}}} {self.total}")
+        out.append(f"{name}_count{{{lbl}}} {self.count}")
+
+
+class InterfaceMetrics:
+    __slots__ = (
+        "ping_rtt", "ping_loss", "dns_latency", "http_latency", "http_ttfb", "cycle_duration",
+        "rssi", "bitrate", "state", "fail_ratio", "tier_invocations", "tier_successes", "time_to_recover",
+        "gateway_rtt", "gateway_reachable", "fault",
+    )
+
+    def __init__(self, hosts: Sequence[str]) -> None:
+        self.ping_rtt: Dict[str, Histogram] = {h: Histogram(RTT_BUCKETS_MS) for h in hosts}
+        self.ping_loss: Dict[str, Histogram] = {h: Histogram(LOSS_BUCKETS_PCT) for h in hosts}
+        self.dns_latency = Histogram(LATENCY_BUCKETS_MS)
+        self.http_latency = Histogram(LATENCY_BUCKETS_MS)
+        self.http_ttfb = Histogram(LATENCY_BUCKETS_MS)
+        self.cycle_duration = Histogram(CYCLE_BUCKETS_S)
+        self.rssi: Optional[int] = None
+        self.bitrate: Optional[float] = None
+        self.state: Optional[str] = None
+        self.fail_ratio = 0.0
+        self.tier_invocations: Dict[str, int] = {}
+        self.tier_successes: Dict[str, int] = {}
+        self.time_to_recover: Dict[str, Histogram] = {}
+        self.gateway_rtt = Histogram(RTT_BUCKETS_MS)
+        self.gateway_reachable: Optional[bool] = None
+        self.fault: Optional[str] = None
+
+
+class MetricsRegistry:
+    """In-memory metrics for every monitored interface, rendered on scrape."""
+
+    def __init__(self) -> None:
+        self._interfaces: Dict[str, InterfaceMetrics] = {}
+
+    def register(self, cfg: Config) -> InterfaceMetrics:
+        m = self._interfaces.get(cfg.interface)
+        if m is None:
+            m = self._interfaces[cfg.interface] = InterfaceMetrics(cfg.hosts.ping)
+        return m
+
+    def _get(self, interface: str) -> InterfaceMetrics:
+        m = self._interfaces.get(interface)
+        if m is None:
+            m = self._interfaces[interface] = InterfaceMetrics(())
+        return m
+
+    def observe_cycle(
+        self, interface: str, snapshot: ConnectivitySnapshot, classification: ClassificationResult, duration_s: float
+    ) -> None:
+        m = self._get(interface)
+        for p in snapshot.ping_results:
+            rtt = m.ping_rtt.get(p.host)
+            if rtt is None:
+                rtt = m.ping_rtt[p.host] = Histogram(RTT_BUCKETS_MS)
+                m.ping_loss[p.host] = Histogram(LOSS_BUCKETS_PCT)
+            if p.latency_ms is not None:
+                rtt.observe(p.latency_ms)
+            m.ping_loss[p.host].observe(p.loss_pct if p.loss_pct is not None else (0.0 if p.success else 100.0))
+        if snapshot.dns_result.latency_ms is not None:
+            m.dns_latency.observe(snapshot.dns_result.latency_ms)
+        http = snapshot.http_result
+        if http is not None:
+            if http.latency_ms is not None:
+                m.http_latency.observe(http.latency_ms)
+            if http.ttfb_ms is not None:
+                m.http_ttfb.observe(http.ttfb_ms)
+        gw = snapshot.gateway
+        if gw is not None:
+            if gw.latency_ms is not None:
+                m.gateway_rtt.observe(gw.latency_ms)
+            m.gateway_reachable = gw.reachable if gw.gateway is not None else None
+        m.cycle_duration.observe(duration_s)
+        m.fault = classification.fault
+        m.rssi = snapshot.link.rssi
+        m.bitrate = snapshot.link.bitrate_mbps
+        m.state = classification.state
+        m.fail_ratio = classification.fail_ratio
+
+    def record_tier(self, interface: str, tier: str, success: bool) -> None:
+        m = self._get(interface)
+        m.tier_invocations[tier] = m.tier_invocations.get(tier, 0) + 1
+        if success:
+            m.tier_successes[tier] = m.tier_successes.get(tier, 0) + 1
+
+    def record_recovery(self, interface: str, tier: str, time_to_recover_s: float) -> None:
+        m = self._get(interface)
+        h = m.time_to_recover.get(tier)
+        if h is None:
+            h = m.time_to_recover[tier] = Histogram(RECOVER_BUCKETS_S)
+        h.observe(time_to_recover_s)
+
+    def render(self) -> str:
+        out: List[str] = []
+        items = list(self._interfaces.items())
+
+        def family(name: str, kind: str, help_text: str) -> None:
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+
+        family("wifi_watchdog_state", "gauge", "1 when the interface is HEALTHY, else 0")
+        for iface, m in items:
+            if m.state is not None:
+                out.append(f'wifi_watchdog_state{{interface="{iface}"}} {1 if m.state == "HEALTHY" else 0}')
+        family("wifi_watchdog_fail_ratio", "gauge", "Failed-cycle ratio over the health window")
+        for iface, m in items:
+            out.append(f'wifi_watchdog_fail_ratio{{interface="{iface}"}} {m.fail_ratio}')
+        family("wifi_watchdog_fault", "gauge", "1 for the level (link, lan, dns, upstream) of the current fault")
+        for iface, m in items:
+            if m.state is not None:
+                for level in FAULT_LEVELS:
+                    out.append(f'wifi_watchdog_fault{{interface="{iface}",level="{level}"}} {int(m.fault == level)}')
+        family("wifi_watchdog_gateway_reachable", "gauge", "1 when the default gateway answered ARP or ICMP")
+        for iface, m in items:
+            if m.gateway_reachable is not None:
+                out.append(f'wifi_watchdog_gateway_reachable{{interface="{iface}"}} {int(m.gateway_reachable)}')
+        family("wifi_watchdog_rssi_dbm", "gauge", "Signal strength of the current association")
+        for iface, m in items:
+            if m.rssi is not None:
+                out.append(f'wifi_watchdog_rssi_dbm{{interface="{iface}"}} {m.rssi}')
+        family("wifi_watchdog_tx_bitrate_mbps", "gauge", "Current tx bitrate")
+        for iface, m in items:
+            if m.bitrate is not None:
+                out.append(f'wifi_watchdog_tx_bitrate_mbps{{interface="{iface}"}} {m.bitrate}')
+        family("wifi_watchdog_ping_rtt_ms", "histogram", "ICMP echo round-trip time per host")
+        for iface, m in items:
+            for host, h in list(m.ping_rtt.items()):
+                h.render("wifi_watchdog_ping_rtt_ms", [("interface", iface), ("host", host)], out)
+        family("wifi_watchdog_ping_loss_pct", "histogram", "Per-cycle ICMP loss per host")
+        for iface, m in items:
+            for host, h in list(m.ping_loss.items()):
+                h.render("wifi_watchdog_ping_loss_pct", [("interface", iface), ("host", host)], out)
+        family("wifi_watchdog_gateway_rtt_ms", "histogram", "ICMP echo round-trip time to the default gateway")
+        for iface, m in items:
+            m.gateway_rtt.render("wifi_watchdog_gateway_rtt_ms", [("interface", iface)], out)
+        family("wifi_watchdog_dns_latency_ms", "histogram", "Fastest successful resolver latency")
+        for iface, m in items:
+            m.dns_latency.render("wifi_watchdog_dns_latency_ms", [("interface", iface)], out)
+        family("wifi_watchdog_http_latency_ms", "histogram", "HTTP probe total latency")
+        for iface, m in items:
+            m.http_latency.render("wifi_watchdog_http_latency_ms", [("interface", iface)], out)
+        family("wifi_watchdog_http_ttfb_ms", "histogram", "HTTP probe time to first byte")
+        for iface, m in items:
+            m.http_ttfb.render("wifi_watchdog_http_ttfb_ms", [("interface", iface)], out)
+        family("wifi_watchdog_cycle_duration_seconds", "histogram", "Wall time of one health cycle")
+        for iface, m in items:
+            m.cycle_duration.render("wifi_watchdog_cycle_duration_seconds", [("interface", iface)], out)
+        family("wifi_watchdog_tier_invocations_total", "counter", "Recovery tier invocations")
+        for iface, m in items:
+            for tier, n in list(m.tier_invocations.items()):
+                out.append(f'wifi_watchdog_tier_invocations_total{{interface="{iface}",tier="{tier}"}} {n}')
+        family("wifi_watchdog_tier_successes_total", "counter", "Recovery tier invocations that reported success")
+        for iface, m in items:
+            for tier, n in list(m.tier_successes.items()):
+                out.append(f'wifi_watchdog_tier_successes_total{{interface="{iface}",tier="{tier}"}} {n}')
+        family("wifi_watchdog_time_to_recover_seconds", "histogram",
+               "Detection to verified recovery, by the tier that fixed it")
+        for iface, m in items:
+            for tier, h in list(m.time_to_recover.items()):
+                h.render("wifi_watchdog_time_to_recover_seconds", [("interface", iface), ("tier", tier)], out)
+        return "\n".join(out) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def _parse_listen(listen: str) -> Tuple[str, int]:
+    host, _, port = listen.rpartition(":")
+    return (host.strip("[]") or "0.0.0.0"), int(port)
+
+
+class MetricsServer:
+    """Minimal HTTP/1.1 server for ``GET /metrics`` on the daemon's event loop."""
+
+    def __init__(self, listen: str, registry: MetricsRegistry = REGISTRY, timeout: float = 5.0) -> None:
+        self.host, self.port = _parse_listen(listen)
+        self.registry = registry
+        self.timeout = timeout
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        sock = self._server.sockets[0] if self._server.sockets else None
+        if sock is not None:
+            self.port = sock.getsockname()[1]
+        logger.info("metrics_listening", extra={"extra_fields": {"host": self.host, "port": self.port}})
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            async with asyncio.timeout(self.timeout):
+                head = await reader.readuntil(b"\r\n\r\n")
+                if len(head) > _MAX_REQUEST_BYTES:
+                    raise ValueError("request too large")
+                method, path, *_ = head.split(b"\r\n", 1)[0].decode("latin-1").split(" ")
+                if method in ("GET", "HEAD") and path.split("?", 1)[0] == "/metrics":
+                    body = self.registry.render().encode()
+                    status = "200 OK"
+                else:
+                    body, status = b"not found\n", "404 Not Found"
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: {_CONTENT_TYPE}\r\n"
+                    f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                )
+                if method != "HEAD":
+                    writer.write(body)
+                await writer.drain()
+        except (TimeoutError, ValueError, ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+
+__all__ = ["Histogram", "MetricsRegistry", "MetricsServer", "REGISTRY"]
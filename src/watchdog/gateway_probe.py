@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import asyncio
+import calendar
+import fcntl
+import logging
+import os
+import re
+import socket
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+SYSFS_NET = "/sys/class/net"
+PROC_ARP = "/proc/net/arp"
+ETH_P_ARP = 0x0806
+SIOCGIFADDR = 0x8915
+_ATF_COM = 0x2  # neighbour entry resolved
+_ARP = struct.Struct("!HHBBH6s4s6s4s")  # htype, ptype, hlen, plen, oper, sha, spa, tha, tpa
+_BOOTP_OPTIONS = 240  # fixed BOOTP header (236) + magic cookie
+_DHCP_LEASE_TIME = 51
+# dhclient: "expire 4 2026/10/15 18:04:05;" (UTC) or "expire never;"
+_DHCLIENT_EXPIRE = re.compile(r"expire (?:\d+ (\d+/\d+/\d+ \d+:\d+:\d+)|(never));")
+
+LEASE_FILES = (
+    "/var/lib/dhcpcd/{iface}.lease",
+    "/var/lib/dhcpcd5/dhcpcd-{iface}.lease",
+    "/var/lib/dhcp/dhclient.{iface}.leases",
+)
+
+_arp_unavailable = False
+
+
+@dataclass(slots=True)
+class GatewayResult:
+    gateway: Optional[str]  # IPv4 default gateway via the interface, from /proc/net/route
+    operstate: Optional[str]  # up, down, dormant (associating), ...
+    address: Optional[str]  # IPv4 address on the interface
+    lease_remaining_s: Optional[float] = None  # DHCP lease time left; None without a lease file
+    arp_ok: Optional[bool] = None  # gateway answered ARP; None if not tested
+    arp_source: Optional[str] = None  # "probe" (own request) or "neigh" (kernel neighbour table)
+    mac: Optional[str] = None
+    icmp_ok: Optional[bool] = None
+    latency_ms: Optional[float] = None
+    ts: float = field(default_factory=time.monotonic)  # when the probe ran (monotonic clock)
+
+    @property
+    def reachable(self) -> bool:
+        """The gateway answered at layer 2 or 3."""
+        return bool(self.arp_ok or self.icmp_ok)
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (time.monotonic() if now is None else now) - self.ts
+
+
+def read_operstate(interface: str, root: str = SYSFS_NET) -> Optional[str]:
+    try:
+        with open(os.path.join(root, interface, "operstate"), "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def interface_address(interface: str) -> Optional[str]:
+    """Primary IPv4 address of ``interface`` (one ioctl), or None if it has none."""
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            req = struct.pack("16s16x", interface.encode()[:15])
+            res = fcntl.ioctl(s.fileno(), SIOCGIFADDR, req)
+    except OSError:
+        return None
+    return socket.inet_ntoa(res[20:24])
+
+
+def read_hwaddr(interface: str, root: str = SYSFS_NET) -> Optional[bytes]:
+    try:
+        with open(os.path.join(root, interface, "address"), "r", encoding="utf-8") as f:
+            return bytes.fromhex(f.read().strip().replace(":", ""))
+    except (OSError, ValueError):
+        return None
+
+
+def read_neighbor(ip: str, interface: str, path: str = PROC_ARP) -> Optional[str]:
+    """MAC of ``ip`` on ``interface`` if the kernel neighbour entry is resolved."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            next(f, None)  # header
+            for line in f:
+                # IP address  HW type  Flags  HW address  Mask  Device
+                fields = line.split()
+                if len(fields) >= 6 and fields[0] == ip and fields[5] == interface:
+                    if int(fields[2], 16) & _ATF_COM:
+                        return fields[3]
+                    return None
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def arp_request(src_mac: bytes, src_ip: str, target_ip: str) -> bytes:
+    return _ARP.pack(1, 0x0800, 6, 4, 1, src_mac, socket.inet_aton(src_ip), bytes(6), socket.inet_aton(target_ip))
+
+
+def parse_arp_reply(packet: bytes, target_ip: str) -> Optional[str]:
+    """Sender MAC if ``packet`` is an ARP reply from ``target_ip``."""
+    if len(packet) < _ARP.size:
+        return None
+    _, ptype, _, _, oper, sha, spa, _, _ = _ARP.unpack_from(packet)
+    if ptype != 0x0800 or oper != 2 or spa != socket.inet_aton(target_ip):
+        return None
+    return sha.hex(":")
+
+
+async def arp_probe(interface: str, target_ip: str, src_ip: str, timeout_ms: int) -> Optional[str]:
+    """Send one ARP request for ``target_ip`` and wait for the reply.
+
+    Returns the target's MAC, "" when it did not answer in time, or None when
+    the probe cannot run here (no CAP_NET_RAW, no packet sockets); the caller
+    then falls back to the kernel neighbour table.
+    """
+    global _arp_unavailable
+    src_mac = read_hwaddr(interface)
+    if _arp_unavailable or src_mac is None or len(src_mac) != 6:
+        return None
+    try:
+        sock = socket.socket(socket.AF_PACKET, socket.SOCK_DGRAM, socket.htons(ETH_P_ARP))
+    except (OSError, AttributeError) as e:
+        _arp_unavailable = True
+        logger.info("arp_probe_unavailable", extra={"extra_fields": {"error": str(e)}})
+        return None
+    loop = asyncio.get_running_loop()
+    deadline = time.monotonic() + timeout_ms / 1000.0
+    try:
+        sock.setblocking(False)
+        sock.bind((interface, ETH_P_ARP))
+        sock.sendto(arp_request(src_mac, src_ip, target_ip), (interface, ETH_P_ARP, 0, 0, b"\xff" * 6))
+        while (left := deadline - time.monotonic()) > 0:
+            try:
+                packet = await asyncio.wait_for(loop.sock_recv(sock, 64), left)
+            except asyncio.TimeoutError:
+                break
+            mac = parse_arp_reply(packet, target_ip)
+            if mac is not None:
+                return mac
+    except OSError as e:  # interface gone mid-probe, or no address
+        logger.debug("arp_probe_failed", extra={"extra_fields": {"interface": interface, "error": str(e)}})
+    finally:
+        sock.close()
+    return ""
+
+
+def _dhcpcd_lease_time(data: bytes) -> Optional[int]:
+    i = _BOOTP_OPTIONS
+    while i + 1 < len(data):
+        code = data[i]
+        if code == 255:
+            break
+        if code == 0:
+            i += 1
+            continue
+        length = data[i + 1]
+        if code == _DHCP_LEASE_TIME and length == 4:
+            return struct.unpack_from("!I", data, i + 2)[0]
+        i += 2 + length
+    return None
+
+
+def read_lease_remaining(interface: str, path: Optional[str] = None, now: Optional[float] = None) -> Optional[float]:
+    """Seconds left on the interface's DHCP lease (negative once expired).
+
+    Reads a dhcpcd binary lease (lease time plus file mtime) or the last lease
+    of a dhclient leases file. ``path`` overrides the usual locations. None
+    when no lease file is found, it cannot be understood or the lease never
+    expires.
+    """
+    now = time.time() if now is None else now
+    candidates: List[str] = [path] if path else [p.format(iface=interface) for p in LEASE_FILES]
+    for candidate in candidates:
+        try:
+            with open(candidate, "rb") as f:
+                data = f.read()
+            mtime = os.stat(candidate).st_mtime
+        except OSError:
+            continue
+        if candidate.endswith(".leases"):
+            matches = _DHCLIENT_EXPIRE.findall(data.decode("utf-8", errors="replace"))
+            if not matches:
+                return None
+            expire, never = matches[-1]
+            if never:
+                return None
+            return calendar.timegm(time.strptime(expire, "%Y/%m/%d %H:%M:%S")) - now
+        lease = _dhcpcd_lease_time(data)
+        if lease is None:
+            return None
+        return None if lease == 0xFFFFFFFF else mtime + lease - now
+    return None
+
+
+__all__ = [
+    "GatewayResult",
+    "arp_probe",
+    "interface_address",
+    "read_lease_remaining",
+    "read_neighbor",
+    "read_operstate",
+]
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional
+
+from .config import HistorySettings
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryWriter:
+    """Buffered, rotating JSON-lines writer for the action history.
+
+    The file stays open between records. Routine records are batched in memory
+    and written when ``flush_records`` accumulate, ``flush_interval_seconds``
+    have passed, or an important record (tier invocation, reboot, ...) arrives.
+    ``fsync`` is ``never``, ``important`` (only when an important record forces
+    the flush) or ``always``. The file is rotated to ``<name>.1[.gz]`` when it
+    exceeds ``max_bytes`` or its first record is older than ``max_age_seconds``;
+    ``keep`` rotations survive. Rotation itself only renames; gzip runs on a
+    background thread, so the caller (usually the event loop) never waits for it.
+    All public methods hold one lock, so any thread may append.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], settings: Optional[HistorySettings] = None) -> None:
+        self.path = Path(path)
+        self.settings = settings or HistorySettings()
+        self._buffer: List[str] = []
+        self._file: Optional[IO[str]] = None
+        self._size = 0
+        self._first_record_at: Optional[float] = None
+        self._last_flush = time.monotonic()
+        self._lock = threading.RLock()  # append -> flush -> rotate re-enter
+        self._compressor: Optional[threading.Thread] = None
+
+    def _open(self) -> IO[str]:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self.settings.compress and self._staged().exists() and self._compressor is None:
+                self._compress_in_background()  # left over from a crash mid-compression
+            self._file = self.path.open("a", encoding="utf-8")
+            self._size = os.fstat(self._file.fileno()).st_size
+            self._first_record_at = self._read_first_ts() if self._size else None
+        return self._file
+
+    def _read_first_ts(self) -> float:
+        """``ts`` of the file's first record. The mtime is no use here: every append refreshes it."""
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                return float(json.loads(f.readline())["ts"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return time.time()
+
+    def append(self, record: Dict[str, Any], important: bool = False) -> None:
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        s = self.settings
+        with self._lock:
+            self._buffer.append(line)
+            if (
+                important
+                or len(self._buffer) >= s.flush_records
+                or time.monotonic() - self._last_flush >= s.flush_interval_seconds
+            ):
+                self.flush(fsync=s.fsync == "always" or (important and s.fsync == "important"))
+
+    def flush(self, fsync: bool = False) -> None:
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._buffer:
+                return
+            f = self._open()
+            data = "".join(self._buffer)
+            self._buffer.clear()
+            f.write(data)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+            if self._first_record_at is None:
+                self._first_record_at = time.time()
+            self._size += len(data.encode("utf-8"))
+            if self._should_rotate():
+                self.rotate()
+
+    def _should_rotate(self) -> bool:
+        s = self.settings
+        if s.max_bytes and self._size >= s.max_bytes:
+            return True
+        return bool(
+            s.max_age_seconds and self._first_record_at is not None
+            and time.time() - self._first_record_at >= s.max_age_seconds
+        )
+
+    def _rotated_name(self, n: int) -> Path:
+        suffix = ".gz" if self.settings.compress else ""
+        return self.path.with_name(f"{self.path.name}.{n}{suffix}")
+
+    def _staged(self) -> Path:
+        """Uncompressed ``<name>.1`` awaiting gzip."""
+        return self.path.with_name(f"{self.path.name}.1")
+
+    def _compress_in_background(self) -> None:
+        self._compressor = threading.Thread(
+            target=self._compress, args=(self._staged(), self._rotated_name(1)), name="history-gzip", daemon=True
+        )
+        self._compressor.start()
+
+    def _compress(self, src: Path, target: Path) -> None:
+        import gzip
+        import shutil
+
+        tmp = target.with_name(target.name + ".tmp")
+        try:
+            with src.open("rb") as src_f, gzip.open(tmp, "wb") as dst_f:
+                shutil.copyfileobj(src_f, dst_f)
+            tmp.rename(target)
+            src.unlink()
+        except OSError as e:
+            logger.warning("history_compress_failed", extra={"extra_fields": {"path": str(src), "error": str(e)}})
+
+    def _wait_compressor(self) -> None:
+        if self._compressor is not None:
+            self._compressor.join()
+            self._compressor = None
+
+    def rotate(self) -> None:
+        with self._lock:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._first_record_at = None
+        # Only blocks when rotations come faster than gzip: the previous <name>.1 must be done.
+        self._wait_compressor()
+        if not self.path.exists():
+            return
+        keep = self.settings.keep
+        if keep <= 0:
+            self.path.unlink()
+            return
+        oldest = self._rotated_name(keep)
+        if oldest.exists():
+            oldest.unlink()
+        for n in range(keep - 1, 0, -1):
+            src = self._rotated_name(n)
+            if src.exists():
+                src.rename(self._rotated_name(n + 1))
+        if self.settings.compress:
+            self.path.rename(self._staged())
+            self._compress_in_background()
+        else:
+            self.path.rename(self._rotated_name(1))
+        logger.info("history_rotated", extra={"extra_fields": {"path": str(self.path)}})
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self.flush(fsync=self.settings.fsync != "never")
+            finally:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                self._wait_compressor()
+
+
+__all__ = ["HistoryWriter"]
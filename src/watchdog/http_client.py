@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import logging
+import socket
+import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+_MAX_HEADER_BYTES = 16384
+# getaddrinfo cannot be interrupted; it runs here so a hung resolver strands one of
+# these threads instead of the probe (and the client's lock) past the deadline.
+_resolver: Optional[ThreadPoolExecutor] = None
+
+
+@dataclass(slots=True)
+class HttpProbeOutcome:
+    status: Optional[int] = None
+    dns_ms: Optional[float] = None
+    connect_ms: Optional[float] = None
+    tls_ms: Optional[float] = None
+    ttfb_ms: Optional[float] = None
+    total_ms: Optional[float] = None
+    reused: bool = False  # request went over an already-open connection
+    tls_resumed: bool = False  # TLS handshake resumed a cached session
+    error: Optional[str] = None
+
+
+class _Deadline:
+    def __init__(self, seconds: float) -> None:
+        self._end = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        left = self._end - time.monotonic()
+        if left <= 0:
+            raise socket.timeout("deadline exceeded")
+        return left
+
+
+def _ms_since(start: float) -> float:
+    return (time.perf_counter() - start) * 1000.0
+
+
+class HttpProbeClient:
+    """Keep-alive HEAD prober for one URL.
+
+    The TCP connection (and TLS session for https) is kept between probes, so a
+    healthy cycle costs one request/response instead of a full TCP and TLS
+    handshake. Thread-safe: a probe that finds the client busy (previous probe
+    still stuck) fails fast instead of queueing. With ``interface`` set the
+    connection leaves through that device only (SO_BINDTODEVICE), as the ICMP
+    prober does; a probe that cannot bind fails rather than take another route.
+    """
+
+    def __init__(self, url: str, interface: Optional[str] = None) -> None:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"unsupported probe url: {url!r}")
+        self.url = url
+        self.interface = interface
+        self.tls = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.tls else 80)
+        self.path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self._host_header = parts.netloc.rsplit("@", 1)[-1]
+        self._ctx = ssl.create_default_context() if self.tls else None
+        self._session: Optional[ssl.SSLSession] = None
+        self._sock: Optional[socket.socket] = None
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+    def _resolve(self, deadline: _Deadline) -> List[Tuple[Any, ...]]:
+        global _resolver
+        if _resolver is None:
+            _resolver = ThreadPoolExecutor(max_workers=2, thread_name_prefix="http-dns")
+        future = _resolver.submit(socket.getaddrinfo, self.host, self.port, type=socket.SOCK_STREAM)
+        try:
+            return future.result(timeout=deadline.remaining())
+        except FutureTimeout:
+            future.cancel()
+            raise socket.timeout(f"resolving {self.host} exceeded the deadline") from None
+
+    def _connect(self, out: HttpProbeOutcome, deadline: _Deadline) -> socket.socket:
+        t0 = time.perf_counter()
+        infos = self._resolve(deadline)
+        out.dns_ms = _ms_since(t0)
+        family, socktype, proto, _canon, addr = infos[0]
+        sock = socket.socket(family, socktype, proto)
+        try:
+            if self.interface:
+                try:
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_BINDTODEVICE, self.interface.encode() + b"\0")
+                except OSError as e:
+                    raise PermissionError(f"cannot bind HTTP socket to {self.interface}: {e}") from e
+            sock.settimeout(deadline.remaining())
+            t0 = time.perf_counter()
+            sock.connect(addr)
+            out.connect_ms = _ms_since(t0)
+            if self._ctx is not None:
+                tls = self._ctx.wrap_socket(
+                    sock, server_hostname=self.host, session=self._session, do_handshake_on_connect=False
+                )
+                sock = tls
+                tls.settimeout(deadline.remaining())
+                t0 = time.perf_counter()
+                tls.do_handshake()
+                out.tls_ms = _ms_since(t0)
+                out.tls_resumed = tls.session_reused
+                self._session = tls.session
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    def _exchange(self, sock: socket.socket, out: HttpProbeOutcome, deadline: _Deadline) -> Tuple[int, bool]:
+        request = (
+            f"HEAD {self.path} HTTP/1.1\r\nHost: {self._host_header}\r\n"
+            "User-Agent: wifi-watchdog\r\nAccept: */*\r\nConnection: keep-alive\r\n\r\n"
+        ).encode("ascii")
+        sock.settimeout(deadline.remaining())
+        t0 = time.perf_counter()
+        sock.sendall(request)
+        buf = b""
+        while b"\r\n\r\n" not in buf:
+            sock.settimeout(deadline.remaining())
+            chunk = sock.recv(4096)
+            if not chunk:
+                raise ConnectionResetError("connection closed before response")
+            if not buf:
+                out.ttfb_ms = _ms_since(t0)
+            buf += chunk
+            if len(buf) > _MAX_HEADER_BYTES:
+                raise ValueError("response headers too large")
+        head = buf.split(b"\r\n\r\n", 1)[0].decode("latin-1").split("\r\n")
+        status_parts = head[0].split(" ", 2)
+        if len(status_parts) < 2 or not status_parts[0].startswith("HTTP/"):
+            raise ValueError(f"malformed status line: {head[0][:80]!r}")
+        status = int(status_parts[1])
+        keep_alive = status_parts[0] != "HTTP/1.0"
+        for line in head[1:]:
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "connection":
+                keep_alive = value.strip().lower() != "close"
+        return status, keep_alive
+
+    def probe(self, timeout_ms: int) -> HttpProbeOutcome:
+        out = HttpProbeOutcome()
+        if not self._lock.acquire(blocking=False):
+            out.error = "busy"
+            return out
+        start = time.perf_counter()
+        try:
+            deadline = _Deadline(timeout_ms / 1000.0)
+            for attempt in range(2):
+                out.reused = self._sock is not None
+                try:
+                    if self._sock is None:
+                        self._sock = self._connect(out, deadline)
+                    status, keep_alive = self._exchange(self._sock, out, deadline)
+                except (ConnectionError, BrokenPipeError):
+                    self.close()
+                    # A reused keep-alive connection may have been dropped by the
+                    # server while idle; retry once on a fresh connection.
+                    if out.reused and attempt == 0 and out.ttfb_ms is None:
+                        continue
+                    raise
+                out.status = status
+                if not keep_alive:
+                    self.close()
+                break
+        except Exception as e:
+            self.close()
+            out.error = str(e) or type(e).__name__
+        finally:
+            out.total_ms = _ms_since(start)
+            self._lock.release()
+        return out
+
+
+__all__ = ["HttpProbeClient", "HttpProbeOutcome"]
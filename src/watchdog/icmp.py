@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import logging
+import os
+import socket
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ICMP_ECHO_REPLY = 0
+ICMP_ECHO_REQUEST = 8
+_HEADER = struct.Struct("!BBHHH")  # type, code, checksum, id, seq
+_PAYLOAD = b"wifi-watchdog-ic"  # 16 bytes, keeps packets small on constrained links
+
+
+@dataclass(slots=True)
+class EchoStats:
+    host: str
+    sent: int = 0
+    received: int = 0
+    rtts_ms: List[float] = field(default_factory=list)
+
+    @property
+    def loss_pct(self) -> float:
+        if not self.sent:
+            return 100.0
+        return 100.0 * (self.sent - self.received) / self.sent
+
+    @property
+    def avg_rtt_ms(self) -> Optional[float]:
+        return sum(self.rtts_ms) / len(self.rtts_ms) if self.rtts_ms else None
+
+    @property
+    def jitter_ms(self) -> Optional[float]:
+        """Mean absolute difference between consecutive RTTs (RFC 3550 style)."""
+        if len(self.rtts_ms) < 2:
+            return None
+        diffs = [abs(b - a) for a, b in zip(self.rtts_ms, self.rtts_ms[1:])]
+        return sum(diffs) / len(diffs)
+
+
+def checksum(data: bytes) -> int:
+    if len(data) % 2:
+        data += b"\0"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def build_echo_request(ident: int, seq: int, payload: bytes = _PAYLOAD) -> bytes:
+    header = _HEADER.pack(ICMP_ECHO_REQUEST, 0, 0, ident, seq)
+    csum = checksum(header + payload)
+    return _HEADER.pack(ICMP_ECHO_REQUEST, 0, csum, ident, seq) + payload
+
+
+def parse_echo_reply(packet: bytes, raw: bool) -> Optional[Tuple[int, int]]:
+    """Return ``(ident, seq)`` for an echo reply, or None for anything else.
+
+    Raw sockets deliver the IPv4 header in front of the ICMP message; datagram
+    ICMP sockets do not.
+    """
+    if raw:
+        if len(packet) < 20:
+            return None
+        ihl = (packet[0] & 0x0F) * 4
+        packet = packet[ihl:]
+    if len(packet) < _HEADER.size:
+        return None
+    icmp_type, _code, _csum, ident, seq = _HEADER.unpack_from(packet)
+    if icmp_type != ICMP_ECHO_REPLY:
+        return None
+    return ident, seq
+
+
+class IcmpProber:
+    """Send echo bursts to many hosts over a single ICMP socket.
+
+    ``mode`` is ``"auto"`` (unprivileged datagram socket, then raw), ``"dgram"``
+    or ``"raw"``. Opening the socket raises ``PermissionError`` when neither is
+    allowed (see ``net.ipv4.ping_group_range`` / CAP_NET_RAW). The socket is not
+    bound to an event loop, so one prober can serve successive ``asyncio.run``
+    calls. With ``interface`` set, probes leave through that device only
+    (SO_BINDTODEVICE), which is what a multi-interface setup needs.
+    """
+
+    _instances = 0
+
+    def __init__(self, mode: str = "auto", interface: Optional[str] = None) -> None:
+        self.mode = mode
+        self.interface = interface
+        self._sock, self.raw = self._open(mode)
+        if interface:
+            try:
+                self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_BINDTODEVICE, interface.encode() + b"\0")
+            except OSError as e:
+                self._sock.close()
+                raise PermissionError(f"cannot bind ICMP socket to {interface}: {e}") from e
+        # Raw sockets see every echo reply on the host; a distinct id per prober
+        # keeps probers for different interfaces from claiming each other's replies.
+        IcmpProber._instances += 1
+        self._ident = (os.getpid() + IcmpProber._instances * 0x1000) & 0xFFFF
+        self._seq = 0
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @staticmethod
+    def _open(mode: str) -> Tuple[socket.socket, bool]:
+        kinds = {"dgram": [False], "raw": [True]}.get(mode, [False, True])
+        last_err: Optional[OSError] = None
+        for raw in kinds:
+            try:
+                sock = socket.socket(
+                    socket.AF_INET, socket.SOCK_RAW if raw else socket.SOCK_DGRAM, socket.IPPROTO_ICMP
+                )
+                sock.setblocking(False)
+                return sock, raw
+            except OSError as e:
+                last_err = e
+        raise PermissionError(f"cannot open ICMP socket ({mode}): {last_err}")
+
+    def close(self) -> None:
+        self._sock.close()
+
+    def _next_seq(self) -> int:
+        self._seq = (self._seq + 1) & 0xFFFF
+        return self._seq
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    async def _resolve(self, hosts: List[str], timeout: float) -> Dict[str, Optional[str]]:
+        loop = asyncio.get_running_loop()
+        out: Dict[str, Optional[str]] = {}
+        lookups = {}
+        for h in hosts:
+            try:
+                out[h] = str(ipaddress.IPv4Address(h))
+            except ValueError:
+                lookups[h] = asyncio.ensure_future(
+                    asyncio.wait_for(loop.getaddrinfo(h, None, family=socket.AF_INET), timeout)
+                )
+        for h, fut in lookups.items():
+            try:
+                infos = await fut
+                out[h] = infos[0][4][0] if infos else None
+            except Exception:
+                out[h] = None
+        return out
+
+    async def probe(
+        self, hosts: List[str], count: int = 3, interval_ms: int = 20, timeout_ms: int = 800
+    ) -> Dict[str, EchoStats]:
+        """Ping every host ``count`` times and wait ``timeout_ms`` after the last send."""
+        async with self._get_lock():
+            return await self._probe(hosts, count, interval_ms, timeout_ms)
+
+    async def _probe(self, hosts: List[str], count: int, interval_ms: int, timeout_ms: int) -> Dict[str, EchoStats]:
+        loop = asyncio.get_running_loop()
+        stats = {h: EchoStats(host=h) for h in hosts}
+        addrs = await self._resolve(hosts, timeout_ms / 1000.0)
+        # (addr, seq) -> (host, send time in ns); multiple hosts may share an address.
+        inflight: Dict[Tuple[str, int], List[Tuple[str, int]]] = {}
+        all_done = loop.create_future()
+
+        def on_readable() -> None:
+            while True:
+                try:
+                    packet, (src, _port) = self._sock.recvfrom(1024)
+                except (BlockingIOError, InterruptedError):
+                    return
+                except OSError:
+                    return
+                now = time.perf_counter_ns()
+                parsed = parse_echo_reply(packet, self.raw)
+                if parsed is None:
+                    continue
+                ident, seq = parsed
+                # Datagram sockets have the id rewritten by the kernel; replies are
+                # already demultiplexed to us, so only check it on raw sockets.
+                if self.raw and ident != self._ident:
+                    continue
+                waiters = inflight.pop((src, seq), None)
+                if not waiters:
+                    continue
+                for host, sent_ns in waiters:
+                    st = stats[host]
+                    st.received += 1
+                    st.rtts_ms.append((now - sent_ns) / 1e6)
+                if not inflight and sending_done and not all_done.done():
+                    all_done.set_result(None)
+
+        sending_done = False
+        loop.add_reader(self._sock.fileno(), on_readable)
+        try:
+            targets = [(h, a) for h, a in addrs.items() if a is not None]
+            for i in range(count):
+                if i:
+                    await asyncio.sleep(interval_ms / 1000.0)
+                for host, addr in targets:
+                    seq = self._next_seq()
+                    pkt = build_echo_request(self._ident, seq)
+                    try:
+                        self._sock.sendto(pkt, (addr, 0))
+                    except OSError as e:
+                        logger.debug("icmp_send_failed", extra={"extra_fields": {"host": host, "error": str(e)}})
+                        stats[host].sent += 1
+                        continue
+                    stats[host].sent += 1
+                    inflight.setdefault((addr, seq), []).append((host, time.perf_counter_ns()))
+            sending_done = True
+            if inflight:
+                try:
+                    await asyncio.wait_for(all_done, timeout_ms / 1000.0)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            loop.remove_reader(self._sock.fileno())
+        for host, addr in addrs.items():
+            if addr is None:
+                stats[host].sent = count  # unresolvable counts as full loss
+        return stats
+
+
+__all__ = ["IcmpProber", "EchoStats", "build_echo_request", "parse_echo_reply", "checksum"]
@@ -2,11 +2,25 @@ from __future__ import annotations
 
 import json
 import logging
+import queue
+import socket
+import struct
 import sys
-from typing import Any, Dict, Optional
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
 
 from .config import LoggingConfig
 
+if TYPE_CHECKING:
+    import logging.handlers
+
+JOURNAL_SOCKET = "/run/systemd/journal/socket"
+SYSLOG_IDENTIFIER = "wifi-watchdog"
+# Fields of a health_cycle record that make two records "the same"; rssi jitters every cycle.
+_CYCLE_KEY_FIELDS = ("state", "fail_ratio", "consecutive_fails", "invoked_tier", "fault")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
 
 class JsonFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:  # type: ignore[override]
@@ -22,13 +36,219 @@ class JsonFormatter(logging.Formatter):
         return json.dumps(base, separators=(",", ":"))
 
 
-def setup_logging(cfg: LoggingConfig) -> None:
-    root = logging.getLogger()
-    root.handlers.clear()
-    root.setLevel(getattr(logging, cfg.level.upper(), logging.INFO))
+def _syslog_priority(levelno: int) -> int:
+    if levelno >= logging.CRITICAL:
+        return 2
+    if levelno >= logging.ERROR:
+        return 3
+    if levelno >= logging.WARNING:
+        return 4
+    if levelno >= logging.INFO:
+        return 6
+    return 7
+
+
+def _journal_name(key: str) -> str:
+    name = "".join(c if c.isalnum() else "_" for c in key.upper()).lstrip("_")
+    return name if name and not name[0].isdigit() else f"F_{name}"
+
+
+def _journal_field(name: str, value: Any) -> bytes:
+    if not isinstance(value, str):
+        value = json.dumps(value, separators=(",", ":")) if isinstance(value, (dict, list, tuple)) else str(value)
+    data = value.encode("utf-8", errors="replace")
+    if b"\n" in data:  # binary-safe form: name, newline, little-endian length, data
+        return name.encode() + b"\n" + struct.pack("<Q", len(data)) + data + b"\n"
+    return name.encode() + b"=" + data + b"\n"
+
+
+class JournalHandler(logging.Handler):
+    """Send records to journald's native socket with ``extra_fields`` as journal fields.
+
+    ``journalctl -o json`` or ``journalctl STATE=LOST`` then see each field
+    without parsing the message text.
+    """
+
+    def __init__(self, path: str = JOURNAL_SOCKET) -> None:
+        super().__init__()
+        self.path = path
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            self._sock.connect(path)
+        except OSError:
+            self._sock.close()
+            raise
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            fields = getattr(record, "extra_fields", None) or {}
+            message = record.getMessage()
+            if fields:
+                message += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+            parts = [
+                _journal_field("MESSAGE", message),
+                _journal_field("PRIORITY", _syslog_priority(record.levelno)),
+                _journal_field("SYSLOG_IDENTIFIER", SYSLOG_IDENTIFIER),
+                _journal_field("LOGGER", record.name),
+                _journal_field("EVENT", record.getMessage()),
+            ]
+            if record.exc_info:
+                parts.append(_journal_field("EXC_INFO", logging.Formatter().formatException(record.exc_info)))
+            parts += [_journal_field(_journal_name(k), v) for k, v in fields.items()]
+            self._sock.send(b"".join(parts))
+        except Exception:
+            self.handleError(record)
+
+    def close(self) -> None:
+        self._sock.close()
+        super().close()
+
+
+class _DroppingQueueHandler(logging.Handler):
+    """Enqueue without ever blocking; when the queue is full the record is counted and dropped.
+
+    Formatting happens on the listener thread, so the record is queued as is.
+    A plain Handler rather than QueueHandler keeps logging.handlers unimported
+    until the queue is actually set up.
+    """
+
+    def __init__(self, q: "queue.Queue[logging.LogRecord]") -> None:
+        super().__init__()
+        self.queue = q
+        self.dropped = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.enqueue(record)
+        except Exception:
+            self.handleError(record)
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        q = self.queue
+        if not self.dropped:
+            try:
+                q.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+            return
+        # The note only goes in together with the record: a note followed by a
+        # dropped record would leave the record out of every reported count.
+        if q.maxsize - q.qsize() < 2:
+            self.dropped += 1
+            return
+        note = logging.makeLogRecord({
+            "name": __name__, "levelno": logging.WARNING, "levelname": "WARNING",
+            "msg": "log_records_dropped", "extra_fields": {"count": self.dropped},
+        })
+        try:
+            q.put_nowait(note)
+        except queue.Full:  # another thread took the slots since the check
+            self.dropped += 1
+            return
+        try:
+            q.put_nowait(record)
+        except queue.Full:
+            self.dropped = 1  # the note covers the earlier ones; this record is the next to report
+            return
+        self.dropped = 0
 
+
+class _Run:
+    __slots__ = ("key", "started", "count", "rssi_min", "rssi_max", "last")
+
+    def __init__(self, key: Tuple[Any, ...], started: float) -> None:
+        self.key = key
+        self.started = started
+        self.count = 0
+        self.rssi_min: Optional[int] = None
+        self.rssi_max: Optional[int] = None
+        self.last: Optional[logging.LogRecord] = None
+
+
+class DedupHandler(logging.Handler):
+    """Collapse repeated identical ``health_cycle`` records into periodic summaries.
+
+    The first record of a run passes through. Repeats (same interface, state,
+    fail ratio, failure streak, tier and fault level) are counted instead, and a
+    ``health_cycle_summary`` with the count and RSSI range is emitted when the
+    run ends or every ``interval`` seconds while it lasts. Other records pass
+    straight to ``target``.
+    """
+
+    def __init__(self, target: logging.Handler, interval: float, clock=time.monotonic) -> None:
+        super().__init__()
+        self.target = target
+        self.interval = interval
+        self.clock = clock
+        self._runs: Dict[Any, _Run] = {}
+
+    def _summary(self, run: _Run, now: float) -> None:
+        if not run.count or run.last is None:
+            return
+        fields = run.last.extra_fields  # type: ignore[attr-defined]
+        summary = logging.makeLogRecord({
+            "name": run.last.name, "levelno": run.last.levelno, "levelname": run.last.levelname,
+            "msg": "health_cycle_summary",
+            "extra_fields": {
+                **{k: fields.get(k) for k in ("interface",) + _CYCLE_KEY_FIELDS},
+                "repeated": run.count,
+                "seconds": round(now - run.started, 1),
+                "rssi_min": run.rssi_min,
+                "rssi_max": run.rssi_max,
+            },
+        })
+        self.target.handle(summary)
+        run.count = 0
+        run.rssi_min = run.rssi_max = None
+        run.started = now
+
+    def emit(self, record: logging.LogRecord) -> None:
+        fields = getattr(record, "extra_fields", None)
+        if record.msg != "health_cycle" or not isinstance(fields, dict):
+            self.target.handle(record)
+            return
+        now = self.clock()
+        iface = fields.get("interface")
+        key = tuple(fields.get(k) for k in _CYCLE_KEY_FIELDS)
+        run = self._runs.get(iface)
+        if run is not None and run.key == key:
+            run.count += 1
+            run.last = record
+            rssi = fields.get("rssi")
+            if rssi is not None:
+                run.rssi_min = rssi if run.rssi_min is None else min(run.rssi_min, rssi)
+                run.rssi_max = rssi if run.rssi_max is None else max(run.rssi_max, rssi)
+            if now - run.started >= self.interval:
+                self._summary(run, now)
+            return
+        if run is not None:
+            self._summary(run, now)
+        self._runs[iface] = _Run(key, now)
+        self.target.handle(record)
+
+    def flush(self) -> None:
+        now = self.clock()
+        for run in self._runs.values():
+            self._summary(run, now)
+        self.target.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self.target.close()
+        super().close()
+
+
+def _destination_handler(cfg: LoggingConfig) -> logging.Handler:
     handler: logging.Handler
-    if cfg.destination == "stdout":
+    if cfg.destination == "journal":
+        try:
+            handler = JournalHandler()
+        except OSError as e:
+            handler = logging.StreamHandler(sys.stderr)
+            print(f"journald socket unavailable ({e}); logging to stderr", file=sys.stderr)
+        else:
+            return handler  # journald keeps the fields; no text formatting needed
+    elif cfg.destination == "stdout":
         handler = logging.StreamHandler(sys.stdout)
     elif cfg.destination == "stderr":
         handler = logging.StreamHandler(sys.stderr)
@@ -39,7 +259,49 @@ def setup_logging(cfg: LoggingConfig) -> None:
         handler.setFormatter(JsonFormatter())
     else:
         handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    return handler
+
+
+def setup_logging(cfg: LoggingConfig) -> None:
+    """Route the root logger to ``cfg.destination``.
+
+    With ``queue_size`` > 0 log calls only enqueue the record; deduplication,
+    formatting and I/O happen on a background thread, and records arriving
+    while the queue is full are dropped and counted rather than blocking the
+    probe loop. Safe to call again (config reload): the previous pipeline is
+    drained first.
+    """
+    shutdown_logging()
+    root = logging.getLogger()
+    root.handlers.clear()
+    root.setLevel(getattr(logging, cfg.level.upper(), logging.INFO))
+
+    handler = _destination_handler(cfg)
+    if cfg.dedup_seconds > 0:
+        handler = DedupHandler(handler, cfg.dedup_seconds)
+    if cfg.queue_size <= 0:
+        root.addHandler(handler)
+        return
+    global _listener
+    from logging.handlers import QueueListener
+
+    q: "queue.Queue[logging.LogRecord]" = queue.Queue(cfg.queue_size)
+    _listener = QueueListener(q, handler)
+    _listener.start()
+    root.addHandler(_DroppingQueueHandler(q))
+
+
+def shutdown_logging() -> None:
+    """Drain the background pipeline, emit pending summaries and close the destination."""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for h in listener.handlers:
+            h.close()
+    for h in logging.getLogger().handlers:
+        if isinstance(h, DedupHandler):
+            h.flush()
 
-    root.addHandler(handler)
 
-__all__ = ["setup_logging"]
+__all__ = ["DedupHandler", "JournalHandler", "JsonFormatter", "setup_logging", "shutdown_logging"]
@@ -1,150 +1,145 @@
 from __future__ import annotations
 
 import logging
+import os
 import signal
 import sys
-import time
-import random
-import os
-from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from .config import load_config, Config, interface_configs
+from .logging_setup import setup_logging, shutdown_logging
 
-from .config import load_config, Config
-from .logging_setup import setup_logging
-from .connectivity import gather_snapshot
-from .metrics import HealthWindow, classify
-from .escalation import EscalationManager
-from .status import write_status, write_prometheus, append_action_history
+if TYPE_CHECKING:
+    from .supervisor import Supervisor
 
 logger = logging.getLogger(__name__)
 
+
+def __getattr__(name: str) -> Any:
+    # update_adaptive_interval is re-exported without importing the supervisor
+    # (and every probe module behind it) at import time.
+    if name == "update_adaptive_interval":
+        from .supervisor import update_adaptive_interval
+
+        return update_adaptive_interval
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+DEFAULT_CACHE_DIR = "/var/cache/wifi-watchdog"
+
 _shutdown = False
+_supervisor: Optional[Supervisor] = None
 
 def _handle_signal(signum, frame):  # type: ignore[override]
     global _shutdown
     logger.info("signal_received", extra={"extra_fields": {"signal": signum}})
     _shutdown = True
+    if _supervisor is not None:
+        _supervisor.stop.set()
 
-def run(cfg: Config) -> None:
-    setup_logging(cfg.logging)
-    logger.info("watchdog_start", extra={"extra_fields": {"interface": cfg.interface}})
-    window = HealthWindow(cfg.history_size)
-    escalator = EscalationManager(cfg)
-    current_interval = cfg.check_interval_seconds
-    consecutive_healthy = 0
+def reload_config(supervisor: Supervisor, path: str, cache_dir: Optional[str] = None) -> Optional[Dict[str, List[str]]]:
+    """Re-read ``path`` and apply it to the running ``supervisor``.
+
+    An unreadable or invalid file is logged and rejected; the running config
+    stays in force. Returns what was applied and what needs a restart.
+    """
+    try:
+        cfg = load_config(path, cache_dir)
+    except Exception as e:
+        logger.error("config_reload_rejected", extra={"extra_fields": {"path": path, "error": str(e)}})
+        return None
+    if cfg.logging != supervisor.monitors[0].cfg.logging:
+        setup_logging(cfg.logging)
+    result = supervisor.reload(cfg)
+    logger.info("config_reloaded", extra={"extra_fields": {"path": path, **result}})
+    return result
+
+
+def run(cfg: Config, config_path: Optional[str] = None, cache_dir: Optional[str] = None) -> None:
+    """Watch every configured interface until a shutdown signal arrives.
+
+    A plain config watches ``cfg.interface``; with an ``interfaces`` list each
+    entry gets its own monitor, all sharing one event loop. Given
+    ``config_path``, SIGHUP (and, with ``features.watch_config``, any rewrite
+    of the file) reloads it in place.
+    """
+    global _supervisor
+    import asyncio
 
-    Path(cfg.paths.state_dir).mkdir(parents=True, exist_ok=True)
+    from .supervisor import Supervisor
 
-    # Send READY=1 to systemd if Type=notify is used (always safe; ignored when not under systemd).
-    _sd_notify("READY=1")
+    setup_logging(cfg.logging)
+    cfgs = interface_configs(cfg)
+    logger.info("watchdog_start", extra={"extra_fields": {"interfaces": [c.interface for c in cfgs]}})
+    _supervisor = Supervisor(cfgs)
 
-    while not _shutdown:
-        start = time.time()
-        classification = None  # type: ignore[assignment]
-        try:
-            snapshot = gather_snapshot(cfg)
-            classification = classify(cfg, snapshot, window)
-            escalator.record_health(classification)
-            invoked_tier = escalator.maybe_escalate(classification)
-
-            logger.info(
-                "health_cycle",
-                extra={
-                    "extra_fields": {
-                        "state": classification.state,
-                        "fail_ratio": round(classification.fail_ratio, 3),
-                        "consecutive_fails": classification.consecutive_fail_packets,
-                        "rssi": classification.rssi,
-                        "invoked_tier": invoked_tier,
-                    }
-                },
-            )
-            write_status(cfg, classification, {"invoked_tier": invoked_tier})
-            write_prometheus(cfg, classification)
-            append_action_history(
-                cfg,
-                {
-                    "event": "cycle",
-                    "state": classification.state,
-                    "fail_ratio": round(classification.fail_ratio, 3),
-                    "invoked_tier": invoked_tier,
-                },
-            )
-        except Exception as e:  # pragma: no cover
-            logger.exception("cycle_error", extra={"extra_fields": {"error": str(e)}})
-        # Adaptive interval logic
-        if cfg.adaptive.enabled and classification is not None:
-            current_interval, consecutive_healthy, backoff_event, reset_event = update_adaptive_interval(
-                cfg, classification.state, current_interval, consecutive_healthy
-            )
-            if backoff_event:
-                logger.info("interval_backoff", extra={"extra_fields": backoff_event})
-            if reset_event:
-                logger.info("interval_reset", extra={"extra_fields": reset_event})
-        else:
-            current_interval = cfg.check_interval_seconds
-
-        elapsed = time.time() - start
-        base_sleep = max(0, current_interval - elapsed)
-        jitter = random.uniform(-0.1 * current_interval, 0.1 * current_interval)
-        # systemd watchdog kick (optional)
-        if cfg.features.systemd_watchdog:
-            _sd_notify("WATCHDOG=1")
-        time.sleep(max(0.5, base_sleep + jitter))
-
-
-def update_adaptive_interval(cfg: Config, state: str, current_interval: int, consecutive_healthy: int):
-    backoff_event = None
-    reset_event = None
-    if state == "HEALTHY":
-        consecutive_healthy += 1
-        if consecutive_healthy >= cfg.adaptive.healthy_cycles_for_backoff:
-            new_interval = min(int(current_interval * cfg.adaptive.backoff_factor), cfg.adaptive.max_interval_seconds)
-            if new_interval != current_interval:
-                backoff_event = {"old": current_interval, "new": new_interval}
-            current_interval = new_interval
-    else:
-        if current_interval != cfg.check_interval_seconds:
-            reset_event = {"old": current_interval, "reset_to": cfg.check_interval_seconds}
-        current_interval = cfg.check_interval_seconds
-        consecutive_healthy = 0
-    return current_interval, consecutive_healthy, backoff_event, reset_event
-    # (Shutdown logging handled outside this helper.)
-
-
-def _sd_notify(message: str) -> None:
-    """Send a systemd sd_notify style message if NOTIFY_SOCKET is present.
-
-    message examples: "READY=1", "WATCHDOG=1", "STATUS=...".
-    Safe to call even when not managed by systemd (silently no-ops).
-    """
-    notify_sock = os.getenv("NOTIFY_SOCKET")
-    if not notify_sock:
-        return
-    try:  # pragma: no cover - environment dependent
-        import socket as _sock
-        addr = notify_sock
-        if addr.startswith('@'):  # abstract namespace
-            addr = '\0' + addr[1:]
-        af_unix = getattr(_sock, "AF_UNIX", None)
-        if af_unix is None:
+    async def _main() -> None:
+        assert _supervisor is not None
+        if _shutdown:
             return
-        s = _sock.socket(af_unix, _sock.SOCK_DGRAM)
-        s.settimeout(0.05)
-        s.connect(addr)
-        s.sendall(message.encode("utf-8"))
-        s.close()
-    except Exception:
-        pass
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, _handle_signal, sig, None)
+            except (NotImplementedError, RuntimeError):  # pragma: no cover - non-main thread
+                pass
+        watcher = None
+        if config_path:
+            sup = _supervisor
+
+            def _reload() -> None:
+                reload_config(sup, config_path, cache_dir)
+
+            loop.add_signal_handler(signal.SIGHUP, _reload)
+            if cfg.features.watch_config:
+                from .config_watch import ConfigWatcher
+
+                watcher = ConfigWatcher(config_path, _reload)
+                try:
+                    watcher.start()
+                except OSError as e:
+                    logger.warning("config_watch_unavailable", extra={"extra_fields": {"error": str(e)}})
+                    watcher = None
+        try:
+            await _supervisor.run()
+        finally:
+            if watcher is not None:
+                watcher.close()
+
+    try:
+        asyncio.run(_main())
+    finally:
+        _supervisor = None
+        shutdown_logging()
+
+
+def _config_cache_dir() -> str:
+    # systemd's CacheDirectory= exports CACHE_DIRECTORY (colon-separated if several).
+    return (os.getenv("CACHE_DIRECTORY") or DEFAULT_CACHE_DIR).split(":")[0]
 
 
 def main() -> int:
-    if len(sys.argv) < 2:
-        print("Usage: python -m watchdog.main <config.yml>", file=sys.stderr)
+    args = sys.argv[1:]
+    paths = [a for a in args if not a.startswith("--")]
+    if len(paths) != 1:
+        print("Usage: python -m watchdog.main [--no-config-cache] [--import-profile] <config.yml>", file=sys.stderr)
         return 1
-    cfg = load_config(sys.argv[1])
+    cache_dir = None if "--no-config-cache" in args else _config_cache_dir()
+    if "--import-profile" in args:
+        import json
+
+        from .bench import import_profile
+
+        report = import_profile(paths[0], cache_dir)
+        print(json.dumps(report, indent=2))
+        if report["deferred_imported"]:
+            print(f"loaded at import: {', '.join(report['deferred_imported'])}", file=sys.stderr)
+            return 1
+        return 0
+    cfg = load_config(paths[0], cache_dir)
     signal.signal(signal.SIGTERM, _handle_signal)
     signal.signal(signal.SIGINT, _handle_signal)
-    run(cfg)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)  # until the loop installs the reload handler
+    run(cfg, paths[0], cache_dir)
     return 0
 
 if __name__ == "__main__":  # pragma: no cover
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from collections import deque
-from dataclasses import dataclass
-from typing import Deque, List
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Sequence
 
 from .config import Config
 from .connectivity import ConnectivitySnapshot
@@ -14,35 +14,137 @@ class HealthState:
     LOST = "LOST"
 
 
+class FaultLevel:
+    """Where a failing cycle breaks, nearest first."""
+    LINK = "link"  # interface down or not associated
+    LAN = "lan"  # no address, expired lease, no default route, or the gateway does not answer
+    DNS = "dns"  # internet hosts answer but no resolver does
+    UPSTREAM = "upstream"  # the gateway answers, internet hosts do not
+
+
 @dataclass(slots=True)
 class WindowEntry:
     success_ratio: float
     rssi: int | None
 
 
+@dataclass(slots=True)
+class HorizonStats:
+    fail_ratio: float  # sliding: failed cycles / cycles over the last ``horizon``
+    ewma: float  # exponentially weighted failure rate, alpha = 2 / (horizon + 1)
+
+
+_NO_RSSI = -32768
+
+
 class HealthWindow:
-    def __init__(self, size: int) -> None:
+    """Fixed-memory ring buffer of per-cycle results with O(1) aggregates.
+
+    Besides the raw samples the ring stores the running failure count after each
+    entry, so the failure count over any suffix up to the capacity is a single
+    subtraction. The main window (``size``) and every extra horizon share one
+    ring sized for the largest of them.
+    """
+
+    def __init__(self, size: int, horizons: Sequence[int] = ()) -> None:
         self.size = size
-        self._entries: Deque[WindowEntry] = deque(maxlen=size)
+        self.horizons: tuple[int, ...] = tuple(sorted({h for h in horizons if h > 0} | {size}))
+        self._capacity = max(self.horizons) + 1  # +1 keeps the cumulative base of the oldest entry
+        self._ratio = array("d", bytes(8 * self._capacity))
+        self._rssi = array("h", [_NO_RSSI]) * self._capacity
+        self._cum_fails = array("q", bytes(8 * self._capacity))
+        self._count = 0  # entries ever added
+        self._fails = 0  # failed entries ever added
+        self._streak = 0
+        self._ewma = {h: 0.0 for h in self.horizons}
+
+    def __len__(self) -> int:
+        return min(self._count, self.size)
 
     def add(self, entry: WindowEntry) -> None:
-        self._entries.append(entry)
+        failed = entry.success_ratio < 1.0
+        slot = self._count % self._capacity
+        self._ratio[slot] = entry.success_ratio
+        self._rssi[slot] = _NO_RSSI if entry.rssi is None else max(-32767, min(32767, entry.rssi))
+        self._fails += failed
+        self._cum_fails[slot] = self._fails
+        self._streak = self._streak + 1 if failed else 0
+        x = 1.0 if failed else 0.0
+        for h in self.horizons:
+            if self._count == 0:
+                self._ewma[h] = x
+            else:
+                alpha = 2.0 / (h + 1)
+                self._ewma[h] += alpha * (x - self._ewma[h])
+        self._count += 1
+
+    def _fails_in_last(self, n: int) -> int:
+        if n >= self._count:
+            return self._fails
+        base_slot = (self._count - n - 1) % self._capacity
+        return self._fails - self._cum_fails[base_slot]
 
     def fail_ratio_recent(self, n: int) -> float:
-        if not self._entries:
+        n = min(n, self._count, self._capacity - 1)
+        if n <= 0:
             return 0.0
-        recent = list(self._entries)[-n:]
-        fails = sum(1 for e in recent if e.success_ratio < 1.0)
-        return fails / len(recent)
+        return self._fails_in_last(n) / n
+
+    def fail_ratio(self) -> float:
+        return self.fail_ratio_recent(self.size)
 
     def consecutive_non_full_success(self) -> int:
-        cnt = 0
-        for e in reversed(self._entries):
-            if e.success_ratio < 1.0:
-                cnt += 1
-            else:
-                break
-        return cnt
+        return min(self._streak, len(self))
+
+    def aggregates(self) -> Dict[int, HorizonStats]:
+        return {h: HorizonStats(fail_ratio=self.fail_ratio_recent(h), ewma=self._ewma[h]) for h in self.horizons}
+
+    def resized(self, size: int, horizons: Sequence[int] = ()) -> "HealthWindow":
+        """A window of the new dimensions holding as many of the newest entries as it can.
+
+        Entries beyond the main window but within the longest horizon are kept
+        too, so aggregates over the surviving horizons carry on unchanged.
+        """
+        new = HealthWindow(size, horizons)
+        for entry in self._recent(new._capacity - 1):
+            new.add(entry)
+        return new
+
+    def _recent(self, n: int) -> Iterator[WindowEntry]:
+        """Yield up to ``n`` of the newest stored entries, oldest first."""
+        for i in range(self._count - min(n, self._count, self._capacity - 1), self._count):
+            slot = i % self._capacity
+            rssi = self._rssi[slot]
+            yield WindowEntry(success_ratio=self._ratio[slot], rssi=None if rssi == _NO_RSSI else rssi)
+
+    def entries(self) -> Iterator[WindowEntry]:
+        """Yield the entries of the main window, oldest first."""
+        return self._recent(len(self))
+
+    def export(self) -> Dict[str, Any]:
+        """Every stored entry plus the EWMA state, as plain JSON-able data."""
+        return {
+            "entries": [[e.success_ratio, e.rssi] for e in self._recent(self._capacity - 1)],
+            "ewma": {str(h): v for h, v in self._ewma.items()},
+        }
+
+    @classmethod
+    def restore(cls, size: int, horizons: Sequence[int], data: Dict[str, Any]) -> "HealthWindow":
+        """A window of the given dimensions refilled from :meth:`export` output.
+
+        Entries are replayed, so sliding aggregates and the failure streak come
+        out exactly as before; EWMAs of horizons that still exist are carried
+        over instead of being re-seeded by the replay.
+        """
+        window = cls(size, horizons)
+        entries = data.get("entries") or []
+        for ratio, rssi in entries[-(window._capacity - 1):]:
+            window.add(WindowEntry(success_ratio=float(ratio), rssi=None if rssi is None else int(rssi)))
+        if window._count:
+            for h, v in (data.get("ewma") or {}).items():
+                if int(h) in window._ewma:
+                    window._ewma[int(h)] = float(v)
+        return window
 
 
 @dataclass(slots=True)
@@ -51,22 +153,45 @@ class ClassificationResult:
     fail_ratio: float
     consecutive_fail_packets: int
     rssi: int | None
-
-
-def classify(cfg: Config, snapshot: ConnectivitySnapshot, window: HealthWindow) -> ClassificationResult:
-    total = len(snapshot.ping_results)
-    successes = sum(1 for r in snapshot.ping_results if r.success)
-    success_ratio = successes / total if total else 0.0
-    window.add(WindowEntry(success_ratio=success_ratio, rssi=snapshot.link.rssi))
-
-    # Compute aggregated fail ratio over entire window
-    if window._entries:
-        fail_ratio = sum(1 for e in window._entries if e.success_ratio < 1.0) / len(window._entries)
-    else:
-        fail_ratio = 0.0
+    bitrate_mbps: float | None = None
+    horizons: Dict[int, HorizonStats] = field(default_factory=dict)
+    fault: str | None = None  # FaultLevel of this cycle's failure; None if nothing failed or unknown
+
+
+def localize_fault(snapshot: ConnectivitySnapshot) -> str | None:
+    """The :class:`FaultLevel` of ``snapshot``'s failure, or None.
+
+    Only a cycle where no ping target answers (or DNS fails) has a fault.
+    Telling link and LAN from upstream needs the gateway probe; without it
+    such a cycle reports None.
+    """
+    if any(r.success for r in snapshot.ping_results):
+        return FaultLevel.DNS if not snapshot.dns_result.success else None
+    gw = snapshot.gateway
+    if gw is None:
+        return None
+    if gw.operstate not in (None, "up", "unknown"):
+        return FaultLevel.LINK
+    if gw.address is None or gw.gateway is None or (gw.lease_remaining_s is not None and gw.lease_remaining_s <= 0):
+        return FaultLevel.LAN
+    return FaultLevel.UPSTREAM if gw.reachable else FaultLevel.LAN
+
+
+def classify(
+    cfg: Config, snapshot: ConnectivitySnapshot, window: HealthWindow, record: bool = True
+) -> ClassificationResult:
+    """Classify ``snapshot``; with ``record=False`` the window is only read, not extended."""
+    if record:
+        total = len(snapshot.ping_results)
+        successes = sum(1 for r in snapshot.ping_results if r.success)
+        success_ratio = successes / total if total else 0.0
+        window.add(WindowEntry(success_ratio=success_ratio, rssi=snapshot.link.rssi))
+
+    fail_ratio = window.fail_ratio()
 
     consecutive = window.consecutive_non_full_success()
     rssi = snapshot.link.rssi
+    bitrate = snapshot.link.bitrate_mbps
 
     state = HealthState.HEALTHY
     if (fail_ratio >= cfg.thresholds.lost_fail_ratio or
@@ -75,14 +200,27 @@ def classify(cfg: Config, snapshot: ConnectivitySnapshot, window: HealthWindow)
         state = HealthState.LOST
     elif (fail_ratio >= cfg.thresholds.degraded_fail_ratio or
           consecutive >= cfg.thresholds.degraded_consecutive or
-          (rssi is not None and rssi <= cfg.signal.rssi_degraded)):
+          (rssi is not None and rssi <= cfg.signal.rssi_degraded) or
+          (bitrate is not None and bitrate < cfg.signal.min_bitrate_mbps)):
         state = HealthState.DEGRADED
 
-    return ClassificationResult(state=state, fail_ratio=fail_ratio, consecutive_fail_packets=consecutive, rssi=rssi)
+    return ClassificationResult(
+        state=state,
+        fail_ratio=fail_ratio,
+        consecutive_fail_packets=consecutive,
+        rssi=rssi,
+        bitrate_mbps=bitrate,
+        horizons=window.aggregates(),
+        fault=localize_fault(snapshot),
+    )
 
 __all__ = [
+    "FaultLevel",
     "HealthState",
     "HealthWindow",
+    "HorizonStats",
+    "WindowEntry",
     "ClassificationResult",
     "classify",
+    "localize_fault",
 ]
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import struct
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# netlink / generic netlink constants (linux/netlink.h, linux/genetlink.h)
+NETLINK_GENERIC = 16
+NLM_F_REQUEST = 0x1
+NLM_F_ACK = 0x4
+NLM_F_DUMP = 0x300
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+GENL_ID_CTRL = 0x10
+CTRL_CMD_GETFAMILY = 3
+CTRL_ATTR_FAMILY_ID = 1
+CTRL_ATTR_FAMILY_NAME = 2
+
+# nl80211 (linux/nl80211.h)
+NL80211_CMD_GET_INTERFACE = 5
+NL80211_CMD_GET_STATION = 17
+NL80211_CMD_GET_SURVEY = 50
+NL80211_ATTR_IFINDEX = 3
+NL80211_ATTR_MAC = 6
+NL80211_ATTR_STA_INFO = 21
+NL80211_ATTR_WIPHY_FREQ = 38
+NL80211_ATTR_SURVEY_INFO = 84
+NL80211_STA_INFO_SIGNAL = 7
+NL80211_STA_INFO_TX_BITRATE = 8
+NL80211_STA_INFO_TX_RETRIES = 11
+NL80211_STA_INFO_TX_FAILED = 12
+NL80211_STA_INFO_RX_BITRATE = 14
+NL80211_STA_INFO_BEACON_LOSS = 18
+NL80211_RATE_INFO_BITRATE = 1
+NL80211_RATE_INFO_BITRATE32 = 5
+NL80211_SURVEY_INFO_FREQUENCY = 1
+NL80211_SURVEY_INFO_NOISE = 2
+NL80211_SURVEY_INFO_IN_USE = 3
+
+_NLMSGHDR = struct.Struct("=IHHII")
+_GENLMSGHDR = struct.Struct("=BBH")
+_NLATTR = struct.Struct("=HH")
+_NLA_TYPE_MASK = 0x3FFF
+
+
+@dataclass(slots=True)
+class StationInfo:
+    rssi: Optional[int] = None
+    tx_bitrate_mbps: Optional[float] = None
+    rx_bitrate_mbps: Optional[float] = None
+    noise_dbm: Optional[int] = None
+    tx_retries: Optional[int] = None
+    tx_failed: Optional[int] = None
+    beacon_loss: Optional[int] = None
+    bssid: Optional[str] = None
+    freq_mhz: Optional[int] = None
+
+
+def _align(n: int) -> int:
+    return (n + 3) & ~3
+
+
+def nla(attr_type: int, payload: bytes) -> bytes:
+    length = _NLATTR.size + len(payload)
+    return _NLATTR.pack(length, attr_type) + payload + b"\0" * (_align(length) - length)
+
+
+def iter_attrs(buf: bytes, offset: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, bytes]]:
+    end = len(buf) if end is None else end
+    while offset + _NLATTR.size <= end:
+        length, attr_type = _NLATTR.unpack_from(buf, offset)
+        if length < _NLATTR.size:
+            break
+        yield attr_type & _NLA_TYPE_MASK, buf[offset + _NLATTR.size:offset + length]
+        offset += _align(length)
+
+
+def _rate_mbps(payload: bytes) -> Optional[float]:
+    rate: Optional[float] = None
+    for t, v in iter_attrs(payload):
+        if t == NL80211_RATE_INFO_BITRATE32 and len(v) >= 4:
+            return struct.unpack_from("=I", v)[0] / 10.0  # units of 100 kbit/s
+        if t == NL80211_RATE_INFO_BITRATE and len(v) >= 2:
+            rate = struct.unpack_from("=H", v)[0] / 10.0
+    return rate
+
+
+def parse_station(attrs: bytes, info: StationInfo) -> None:
+    for t, v in iter_attrs(attrs):
+        if t == NL80211_ATTR_MAC and len(v) >= 6:
+            info.bssid = ":".join(f"{b:02x}" for b in v[:6])
+        elif t == NL80211_ATTR_STA_INFO:
+            for st, sv in iter_attrs(v):
+                if st == NL80211_STA_INFO_SIGNAL and sv:
+                    info.rssi = struct.unpack_from("=b", sv)[0]
+                elif st == NL80211_STA_INFO_TX_BITRATE:
+                    info.tx_bitrate_mbps = _rate_mbps(sv)
+                elif st == NL80211_STA_INFO_RX_BITRATE:
+                    info.rx_bitrate_mbps = _rate_mbps(sv)
+                elif st == NL80211_STA_INFO_TX_RETRIES and len(sv) >= 4:
+                    info.tx_retries = struct.unpack_from("=I", sv)[0]
+                elif st == NL80211_STA_INFO_TX_FAILED and len(sv) >= 4:
+                    info.tx_failed = struct.unpack_from("=I", sv)[0]
+                elif st == NL80211_STA_INFO_BEACON_LOSS and len(sv) >= 4:
+                    info.beacon_loss = struct.unpack_from("=I", sv)[0]
+
+
+def parse_survey(attrs: bytes, info: StationInfo) -> None:
+    for t, v in iter_attrs(attrs):
+        if t != NL80211_ATTR_SURVEY_INFO:
+            continue
+        fields = dict(iter_attrs(v))
+        if NL80211_SURVEY_INFO_IN_USE in fields and NL80211_SURVEY_INFO_NOISE in fields:
+            info.noise_dbm = struct.unpack_from("=b", fields[NL80211_SURVEY_INFO_NOISE])[0]
+
+
+class Nl80211Reader:
+    """Persistent generic-netlink socket for nl80211 station queries.
+
+    Opening the socket and resolving the family id happens once; each
+    :meth:`read` is three small request/response round trips with no fork.
+    """
+
+    def __init__(self, timeout: float = 0.2) -> None:
+        self._sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_GENERIC)
+        self._sock.settimeout(timeout)
+        self._sock.bind((0, 0))
+        self._seq = 0
+        self.family_id = self._resolve_family("nl80211")
+
+    def close(self) -> None:
+        self._sock.close()
+
+    def _request(self, msg_type: int, flags: int, cmd: int, attrs: bytes) -> List[bytes]:
+        """Send one request and return the attribute payloads of every reply."""
+        self._seq += 1
+        seq = self._seq
+        body = _GENLMSGHDR.pack(cmd, 1, 0) + attrs
+        self._sock.send(_NLMSGHDR.pack(_NLMSGHDR.size + len(body), msg_type, flags | NLM_F_REQUEST, seq, 0) + body)
+        replies: List[bytes] = []
+        dump = flags & NLM_F_DUMP == NLM_F_DUMP
+        while True:
+            data = self._sock.recv(65536)
+            offset = 0
+            while offset + _NLMSGHDR.size <= len(data):
+                length, rtype, _flags, rseq, _pid = _NLMSGHDR.unpack_from(data, offset)
+                if length < _NLMSGHDR.size:
+                    return replies
+                if rseq == seq:
+                    if rtype == NLMSG_DONE:
+                        return replies
+                    if rtype == NLMSG_ERROR:
+                        err = struct.unpack_from("=i", data, offset + _NLMSGHDR.size)[0]
+                        if err:
+                            raise OSError(-err, os.strerror(-err))
+                        return replies
+                    start = offset + _NLMSGHDR.size + _GENLMSGHDR.size
+                    replies.append(data[start:offset + length])
+                    if not dump:
+                        return replies
+                offset += _align(length)
+
+    def _resolve_family(self, name: str) -> int:
+        replies = self._request(
+            GENL_ID_CTRL, 0, CTRL_CMD_GETFAMILY, nla(CTRL_ATTR_FAMILY_NAME, name.encode() + b"\0")
+        )
+        for payload in replies:
+            for t, v in iter_attrs(payload):
+                if t == CTRL_ATTR_FAMILY_ID:
+                    return struct.unpack_from("=H", v)[0]
+        raise OSError(f"generic netlink family {name!r} not found")
+
+    def read(self, interface: str) -> StationInfo:
+        ifindex = nla(NL80211_ATTR_IFINDEX, struct.pack("=I", socket.if_nametoindex(interface)))
+        info = StationInfo()
+        for payload in self._request(self.family_id, NLM_F_DUMP, NL80211_CMD_GET_STATION, ifindex):
+            parse_station(payload, info)
+        for payload in self._request(self.family_id, 0, NL80211_CMD_GET_INTERFACE, ifindex):
+            for t, v in iter_attrs(payload):
+                if t == NL80211_ATTR_WIPHY_FREQ and len(v) >= 4:
+                    info.freq_mhz = struct.unpack_from("=I", v)[0]
+        try:
+            for payload in self._request(self.family_id, NLM_F_DUMP, NL80211_CMD_GET_SURVEY, ifindex):
+                parse_survey(payload, info)
+        except OSError:
+            pass  # not every driver implements survey dumps
+        return info
+
+
+def parse_proc_wireless(text: str, interface: str) -> Optional[StationInfo]:
+    """Parse one interface line of ``/proc/net/wireless``.
+
+    Columns: status, link, level, noise, discarded nwid/crypt/frag/retry/misc,
+    missed beacons. Some drivers report level/noise as unsigned bytes.
+    """
+    for line in text.splitlines():
+        name, sep, rest = line.partition(":")
+        if not sep or name.strip() != interface:
+            continue
+        cols = rest.split()
+        if len(cols) < 10:
+            return None
+
+        def dbm(raw: str) -> Optional[int]:
+            value = int(float(raw.rstrip(".")))
+            if value > 0:
+                value -= 256
+            return None if value <= -256 else value
+
+        try:
+            return StationInfo(
+                rssi=dbm(cols[2]), noise_dbm=dbm(cols[3]), tx_failed=int(cols[7]), beacon_loss=int(cols[9])
+            )
+        except ValueError:
+            return None
+    return None
+
+
+def read_proc_wireless(interface: str, path: str = "/proc/net/wireless") -> Optional[StationInfo]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return parse_proc_wireless(f.read(), interface)
+    except OSError:
+        return None
+
+
+__all__ = [
+    "Nl80211Reader",
+    "StationInfo",
+    "parse_proc_wireless",
+    "read_proc_wireless",
+]
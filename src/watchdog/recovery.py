@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RecoveryControl:
+    """Cancellation flag and progress reporter handed to a running recovery tier.
+
+    Steps call :meth:`step` before each action and give up when it returns
+    False. They only do so where stopping leaves the adapter usable, never
+    between taking a link or hub port down and bringing it back up.
+    """
+
+    def __init__(self, on_step: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> None:
+        self._cancel = threading.Event()
+        self._on_step = on_step
+        self.reason: Optional[str] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def cancel(self, reason: str = "") -> None:
+        self.reason = reason
+        self._cancel.set()
+
+    def step(self, name: str, **fields: Any) -> bool:
+        """Report that step ``name`` is starting; False if the tier should stop instead."""
+        if self._cancel.is_set():
+            return False
+        if self._on_step is not None:
+            try:
+                self._on_step(name, fields)
+            except Exception:  # pragma: no cover - e.g. the event loop already closed
+                pass
+        return True
+
+
+def step(control: Optional[RecoveryControl], name: str, **fields: Any) -> bool:
+    """:meth:`RecoveryControl.step` that tolerates steps run without a control (tests, tools)."""
+    return control is None or control.step(name, **fields)
+
+
+@dataclass(slots=True)
+class RecoveryJob:
+    """A tier running on an interface's recovery thread."""
+
+    tier: str
+    control: RecoveryControl
+    started: float  # monotonic
+    started_ts: float = field(default_factory=time.time)
+    steps: List[str] = field(default_factory=list)
+
+    @property
+    def current_step(self) -> Optional[str]:
+        return self.steps[-1] if self.steps else None
+
+
+__all__ = ["RecoveryControl", "RecoveryJob", "step"]
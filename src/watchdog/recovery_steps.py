@@ -7,56 +7,135 @@ from pathlib import Path
 from typing import Optional
 
 from .config import Config, EscalationTier
-from .command_runner import run_command
-from .usb_reset import reset_usb
+from .command_runner import run_command, run_commands
+from .recovery import RecoveryControl, step
+from .usb_reset import reset_device, reset_usb
+from .usb_topology import USB_INDEX, UsbDevice
+from .wpa_ctrl import WpaCtrl
 
 logger = logging.getLogger(__name__)
 
 
-def refresh_dhcp(cfg: Config) -> bool:
+def wpa_reconnect(cfg: Config, tier: EscalationTier, control: Optional[RecoveryControl] = None) -> bool:
+    """Nudge wpa_supplicant over its control socket and wait for CTRL-EVENT-CONNECTED.
+
+    A disconnected supplicant gets RECONNECT; otherwise ``tier.wpa_commands`` are
+    tried in order (REATTACH keeps the current BSS, REASSOCIATE rescans), each
+    allowed ``connect_timeout_ms`` to reconnect. Much lighter than restarting
+    the service, which throws away the scan cache.
+    """
+    commands = list(tier.wpa_commands or ["REATTACH", "REASSOCIATE"])
+    if cfg.features.dry_run:
+        logger.info("dry_run_wpa", extra={"extra_fields": {"interface": cfg.interface, "commands": commands}})
+        return True
+    timeout = tier.connect_timeout_ms / 1000.0
+    try:
+        with WpaCtrl(cfg.interface, cfg.events.wpa_ctrl_dir) as ctrl:
+            ctrl.attach()
+            if ctrl.status().get("wpa_state") in ("DISCONNECTED", "INACTIVE"):
+                commands.insert(0, "RECONNECT")
+            for command in commands:
+                if not step(control, "wpa_command", cmd=command):
+                    return False
+                started = time.monotonic()
+                ctrl.drain()  # a CONNECTED from before the command must not count as its result
+                reply = ctrl.request(command)
+                if reply != "OK":
+                    logger.warning("wpa_command_failed", extra={"extra_fields": {"cmd": command, "reply": reply[:100]}})
+                    continue
+                if ctrl.wait_event(["CTRL-EVENT-CONNECTED"], timeout) is not None:
+                    logger.info("wpa_reconnected", extra={"extra_fields": {
+                        "cmd": command, "ms": round((time.monotonic() - started) * 1000.0, 1)}})
+                    return True
+                logger.warning("wpa_connect_timeout", extra={"extra_fields": {"cmd": command, "timeout_s": timeout}})
+    except (OSError, TimeoutError) as e:
+        logger.warning("wpa_ctrl_unavailable", extra={"extra_fields": {"interface": cfg.interface, "error": str(e)}})
+    return False
+
+
+def refresh_dhcp(cfg: Config, control: Optional[RecoveryControl] = None) -> bool:
+    if not step(control, "dhcpcd"):
+        return False
     result = run_command(cfg, ["dhcpcd", "-n", cfg.interface])
     return result.returncode == 0
 
 
-def restart_network_services(cfg: Config, tier: EscalationTier) -> bool:
+def restart_network_services(cfg: Config, tier: EscalationTier, control: Optional[RecoveryControl] = None) -> bool:
     services = tier.services or []
+    if tier.parallel and len(services) > 1:
+        if not step(control, "restart_services", services=services):
+            return False
+        results = run_commands(cfg, [["systemctl", "restart", svc] for svc in services],
+                               deadline=tier.deadline_seconds)
+        return all(r.returncode == 0 for r in results)
     ok = True
     for svc in services:
+        if not step(control, "restart_service", service=svc):
+            return False
         result = run_command(cfg, ["systemctl", "restart", svc])
         ok = ok and result.returncode == 0
     return ok
 
 
-def cycle_interface(cfg: Config) -> bool:
+def cycle_interface(cfg: Config, control: Optional[RecoveryControl] = None) -> bool:
+    if not step(control, "link_down"):
+        return False
     dn = run_command(cfg, ["ip", "link", "set", cfg.interface, "down"]).returncode == 0
     time.sleep(1)
+    step(control, "link_up")  # always bring the link back, even when cancelled
     up = run_command(cfg, ["ip", "link", "set", cfg.interface, "up"]).returncode == 0
     return dn and up
 
 
-def reset_usb_device(cfg: Config, tier: EscalationTier) -> bool:
-    if not tier.device_id:
-        return False
-    return reset_usb(cfg, tier.device_id)
+def _interface_usb_device(cfg: Config) -> Optional[UsbDevice]:
+    device = USB_INDEX.for_interface(cfg.interface)
+    if device is None:
+        logger.warning("usb_device_unknown", extra={"extra_fields": {"interface": cfg.interface}})
+    return device
 
 
-def power_cycle_hub(cfg: Config, tier: EscalationTier) -> bool:
-    if not tier.hub_port:
+def reset_usb_device(cfg: Config, tier: EscalationTier, control: Optional[RecoveryControl] = None) -> bool:
+    if tier.device_id:
+        if not step(control, "usb_reset", device=tier.device_id):
+            return False
+        return reset_usb(cfg, tier.device_id)
+    device = _interface_usb_device(cfg)
+    if device is None:
+        return False
+    if not step(control, "usb_reset", device=device.vendor_product, path=device.name):
         return False
+    return reset_device(cfg, device)
+
+
+def power_cycle_hub(cfg: Config, tier: EscalationTier, control: Optional[RecoveryControl] = None) -> bool:
     uhubctl = shutil.which("uhubctl")
     if not uhubctl:
         return False
-    off = run_command(cfg, [uhubctl, "-l", tier.hub_port, "-a", "off"]).returncode == 0
+    if tier.hub_port:
+        target = ["-l", tier.hub_port]  # the whole hub, as configured
+    else:
+        device = _interface_usb_device(cfg)
+        if device is None or device.port is None:
+            return False
+        target = ["-l", device.hub_location, "-p", str(device.port)]  # just the dongle's port
+    port = " ".join(target)
+    if not step(control, "hub_port_off", port=port):
+        return False
+    off = run_command(cfg, [uhubctl, *target, "-a", "off"]).returncode == 0
     time.sleep(2)
-    on = run_command(cfg, [uhubctl, "-l", tier.hub_port, "-a", "on"]).returncode == 0
+    step(control, "hub_port_on", port=port)
+    on = run_command(cfg, [uhubctl, *target, "-a", "on"]).returncode == 0
     return off and on
 
 
-def reboot_system(cfg: Config) -> bool:
+def reboot_system(cfg: Config, control: Optional[RecoveryControl] = None) -> bool:
+    if not step(control, "reboot"):
+        return False  # the link came back while the tier was being prepared
     result = run_command(cfg, ["systemctl", "reboot"], timeout=5)
     return result.returncode == 0
 
 __all__ = [
+    "wpa_reconnect",
     "refresh_dhcp",
     "restart_network_services",
     "cycle_interface",
@@ -0,0 +1,373 @@
+from __future__ import annotations
+
+import json
+import logging
+import math
+import mmap
+import os
+import struct
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Iterator, List, Optional
+
+from .connectivity import ConnectivitySnapshot
+from .metrics import FaultLevel
+
+if TYPE_CHECKING:
+    import csv
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"WWSR"
+VERSION = 2
+MAX_HOSTS = 8
+HOST_NAME_BYTES = 64
+
+# File header: magic, version, max_hosts, record_size, capacity, header_size, write_count.
+_FILE_HDR = struct.Struct("<4sHHIIIQ")
+_WRITE_COUNT_OFFSET = _FILE_HDR.size - 8
+# Record body after the leading seq: ts, state, n_hosts, flags, fail_ratio, rssi, noise,
+# tx/rx bitrate, tx_retries, tx_failed, beacon_loss, freq, bssid, dns_ms,
+# http_ms, http_status, http connect/tls/ttfb, fault, gateway rtt, lease remaining.
+_REC_BODY = struct.Struct("<dBBHfhhffIIIH6sffHfffBff")
+_REC_HOST = struct.Struct("<fffBB")  # latency_ms, loss_pct, jitter_ms, sent, received
+_SEQ = struct.Struct("<Q")
+RECORD_SIZE = _SEQ.size + _REC_BODY.size + MAX_HOSTS * _REC_HOST.size + _SEQ.size
+
+_STATES = {"HEALTHY": 0, "DEGRADED": 1, "LOST": 2}
+_STATE_NAMES = {v: k for k, v in _STATES.items()}
+_NO_I16 = -32768
+_NO_U32 = 0xFFFFFFFF
+_FLAG_DNS_OK = 0x1
+_FLAG_HTTP = 0x2
+_FLAG_HTTP_OK = 0x4
+_FLAG_CLASSIFIED = 0x8
+_FLAG_GATEWAY = 0x10
+_FLAG_GW_ARP = 0x20
+_FLAG_GW_ICMP = 0x40
+_FAULTS = {v: i for i, v in enumerate((FaultLevel.LINK, FaultLevel.LAN, FaultLevel.DNS, FaultLevel.UPSTREAM))}
+_FAULT_NAMES = {i: v for v, i in _FAULTS.items()}
+
+
+def _f(v: Optional[float]) -> float:
+    return math.nan if v is None else float(v)
+
+
+def _opt_f(v: float) -> Optional[float]:
+    return None if math.isnan(v) else round(v, 3)
+
+
+def _u32(v: Optional[int]) -> int:
+    return _NO_U32 if v is None else min(int(v), _NO_U32 - 1)
+
+
+def _i16(v: Optional[int]) -> int:
+    return _NO_I16 if v is None else max(-32767, min(32767, int(v)))
+
+
+def _header_size() -> int:
+    raw = _FILE_HDR.size + MAX_HOSTS * HOST_NAME_BYTES
+    return (raw + 63) & ~63
+
+
+@dataclass(slots=True)
+class HostSample:
+    host: str
+    latency_ms: Optional[float]
+    loss_pct: Optional[float]
+    jitter_ms: Optional[float]
+    sent: int
+    received: int
+
+
+@dataclass(slots=True)
+class SampleRecord:
+    index: int
+    ts: float
+    state: Optional[str]
+    fail_ratio: Optional[float]
+    rssi: Optional[int]
+    noise_dbm: Optional[int]
+    tx_bitrate_mbps: Optional[float]
+    rx_bitrate_mbps: Optional[float]
+    tx_retries: Optional[int]
+    tx_failed: Optional[int]
+    beacon_loss: Optional[int]
+    freq_mhz: Optional[int]
+    bssid: Optional[str]
+    dns_success: bool
+    dns_latency_ms: Optional[float]
+    http_probed: bool
+    http_success: bool
+    http_latency_ms: Optional[float]
+    http_status: Optional[int]
+    http_connect_ms: Optional[float]
+    http_tls_ms: Optional[float]
+    http_ttfb_ms: Optional[float]
+    fault: Optional[str]
+    gateway_probed: bool
+    gateway_arp_ok: bool
+    gateway_icmp_ok: bool
+    gateway_rtt_ms: Optional[float]
+    lease_remaining_s: Optional[float]
+    hosts: List[HostSample] = field(default_factory=list)
+
+
+class SampleRing:
+    """Fixed-size, memory-mapped ring of per-cycle snapshots.
+
+    Each record is fixed-width and framed by its sequence number at both ends;
+    a reader that sees different values caught the record mid-write and skips
+    it, so readers never need a lock. The header's ``write_count`` is updated
+    last. Per-resolver DNS detail is reduced to the cycle's success flag and
+    fastest latency; ping hosts beyond ``MAX_HOSTS`` are not stored.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], capacity: int, hosts: List[str]) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.path = Path(path)
+        self.capacity = capacity
+        self.hosts = list(hosts[:MAX_HOSTS])
+        self.header_size = _header_size()
+        size = self.header_size + capacity * RECORD_SIZE
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            reuse = self._compatible(fd, size)
+            if not reuse:
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+            self._mm = mmap.mmap(fd, size, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        finally:
+            os.close(fd)
+        if reuse:
+            self.write_count = _FILE_HDR.unpack_from(self._mm, 0)[6]
+        else:
+            self.write_count = 0
+            self._write_header()
+
+    def _host_table(self) -> bytes:
+        out = b""
+        for i in range(MAX_HOSTS):
+            name = self.hosts[i].encode()[:HOST_NAME_BYTES] if i < len(self.hosts) else b""
+            out += name.ljust(HOST_NAME_BYTES, b"\0")
+        return out
+
+    def _compatible(self, fd: int, size: int) -> bool:
+        """Keep an existing ring only if layout, capacity and host list all match."""
+        if os.fstat(fd).st_size != size:
+            return False
+        head = os.pread(fd, self.header_size, 0)
+        if len(head) < self.header_size:
+            return False
+        magic, version, max_hosts, rec_size, capacity, hdr_size, _ = _FILE_HDR.unpack_from(head, 0)
+        return (
+            (magic, version, max_hosts, rec_size, capacity, hdr_size)
+            == (MAGIC, VERSION, MAX_HOSTS, RECORD_SIZE, self.capacity, self.header_size)
+            and head[_FILE_HDR.size:_FILE_HDR.size + MAX_HOSTS * HOST_NAME_BYTES] == self._host_table()
+        )
+
+    def _write_header(self) -> None:
+        _FILE_HDR.pack_into(
+            self._mm, 0, MAGIC, VERSION, MAX_HOSTS, RECORD_SIZE, self.capacity, self.header_size, self.write_count
+        )
+        self._mm[_FILE_HDR.size:_FILE_HDR.size + MAX_HOSTS * HOST_NAME_BYTES] = self._host_table()
+
+    def append(self, ts: float, snapshot: ConnectivitySnapshot, state: Optional[str] = None,
+               fail_ratio: Optional[float] = None, fault: Optional[str] = None) -> None:
+        seq = self.write_count + 1
+        off = self.header_size + (self.write_count % self.capacity) * RECORD_SIZE
+        link = snapshot.link
+        http = snapshot.http_result
+        gw = snapshot.gateway
+        flags = (_FLAG_DNS_OK if snapshot.dns_result.success else 0)
+        if http is not None:
+            flags |= _FLAG_HTTP | (_FLAG_HTTP_OK if http.success else 0)
+        if gw is not None:
+            flags |= _FLAG_GATEWAY | (_FLAG_GW_ARP if gw.arp_ok else 0) | (_FLAG_GW_ICMP if gw.icmp_ok else 0)
+        if state is not None:
+            flags |= _FLAG_CLASSIFIED
+        bssid = bytes.fromhex(link.bssid.replace(":", "")) if link.bssid else b"\0" * 6
+        hosts = {p.host: p for p in snapshot.ping_results}
+        mm = self._mm
+        _SEQ.pack_into(mm, off, seq)
+        _REC_BODY.pack_into(
+            mm, off + _SEQ.size,
+            ts, _STATES.get(state or "", 255), len(self.hosts), flags, _f(fail_ratio),
+            _i16(link.rssi), _i16(link.noise_dbm), _f(link.bitrate_mbps), _f(link.rx_bitrate_mbps),
+            _u32(link.tx_retries), _u32(link.tx_failed), _u32(link.beacon_loss), min(link.freq_mhz or 0, 0xFFFF),
+            bssid, _f(snapshot.dns_result.latency_ms),
+            _f(http.latency_ms if http else None), (http.status or 0) if http else 0,
+            _f(http.connect_ms if http else None), _f(http.tls_ms if http else None),
+            _f(http.ttfb_ms if http else None),
+            _FAULTS.get(fault or "", 255), _f(gw.latency_ms if gw else None),
+            _f(gw.lease_remaining_s if gw else None),
+        )
+        host_off = off + _SEQ.size + _REC_BODY.size
+        for i in range(MAX_HOSTS):
+            p = hosts.get(self.hosts[i]) if i < len(self.hosts) else None
+            if p is None:
+                _REC_HOST.pack_into(mm, host_off, math.nan, math.nan, math.nan, 0, 0)
+            else:
+                _REC_HOST.pack_into(
+                    mm, host_off, _f(p.latency_ms), _f(p.loss_pct), _f(p.jitter_ms),
+                    min(p.sent, 255), min(p.received, 255),
+                )
+            host_off += _REC_HOST.size
+        _SEQ.pack_into(mm, host_off, seq)
+        self.write_count = seq
+        struct.pack_into("<Q", mm, _WRITE_COUNT_OFFSET, seq)
+
+    def flush(self) -> None:
+        self._mm.flush()
+
+    def close(self) -> None:
+        try:
+            self._mm.flush()
+        finally:
+            self._mm.close()
+
+
+class SampleReader:
+    """Read-only view of a ring written by :class:`SampleRing`, possibly live."""
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, max_hosts, rec_size, capacity, hdr_size, _ = _FILE_HDR.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION or rec_size != RECORD_SIZE or max_hosts != MAX_HOSTS:
+            self._mm.close()
+            raise ValueError(f"{path}: not a compatible sample ring")
+        self.capacity = capacity
+        self.header_size = hdr_size
+        table = self._mm[_FILE_HDR.size:_FILE_HDR.size + MAX_HOSTS * HOST_NAME_BYTES]
+        self.hosts = [
+            table[i * HOST_NAME_BYTES:(i + 1) * HOST_NAME_BYTES].rstrip(b"\0").decode()
+            for i in range(MAX_HOSTS)
+        ]
+
+    def close(self) -> None:
+        self._mm.close()
+
+    @property
+    def write_count(self) -> int:
+        return struct.unpack_from("<Q", self._mm, _WRITE_COUNT_OFFSET)[0]
+
+    def _decode(self, seq: int) -> Optional[SampleRecord]:
+        off = self.header_size + ((seq - 1) % self.capacity) * RECORD_SIZE
+        view = memoryview(self._mm)[off:off + RECORD_SIZE]
+        try:
+            # Reverse of the writer's order: a slot being overwritten already has its new leading
+            # seq, or still its old trailing one, so any overlap with a write fails one check.
+            end = _SEQ.unpack_from(view, RECORD_SIZE - _SEQ.size)[0]
+            body = _REC_BODY.unpack_from(view, _SEQ.size)
+            host_off = _SEQ.size + _REC_BODY.size
+            host_rows = [_REC_HOST.unpack_from(view, host_off + i * _REC_HOST.size) for i in range(MAX_HOSTS)]
+            begin = _SEQ.unpack_from(view, 0)[0]
+        finally:
+            view.release()
+        if begin != seq or end != seq:
+            return None  # overwritten or being written
+        (ts, state, n_hosts, flags, fail_ratio, rssi, noise, tx, rx, retries, failed, beacon, freq, bssid,
+         dns_ms, http_ms, http_status, h_connect, h_tls, h_ttfb, fault, gw_rtt, lease) = body
+        hosts = [
+            HostSample(
+                host=self.hosts[i], latency_ms=_opt_f(lat), loss_pct=_opt_f(loss), jitter_ms=_opt_f(jit),
+                sent=sent, received=recv,
+            )
+            for i, (lat, loss, jit, sent, recv) in enumerate(host_rows[:n_hosts])
+        ]
+        return SampleRecord(
+            index=seq,
+            ts=ts,
+            state=_STATE_NAMES.get(state),
+            fail_ratio=_opt_f(fail_ratio) if flags & _FLAG_CLASSIFIED else None,
+            rssi=None if rssi == _NO_I16 else rssi,
+            noise_dbm=None if noise == _NO_I16 else noise,
+            tx_bitrate_mbps=_opt_f(tx),
+            rx_bitrate_mbps=_opt_f(rx),
+            tx_retries=None if retries == _NO_U32 else retries,
+            tx_failed=None if failed == _NO_U32 else failed,
+            beacon_loss=None if beacon == _NO_U32 else beacon,
+            freq_mhz=freq or None,
+            bssid=":".join(f"{b:02x}" for b in bssid) if any(bssid) else None,
+            dns_success=bool(flags & _FLAG_DNS_OK),
+            dns_latency_ms=_opt_f(dns_ms),
+            http_probed=bool(flags & _FLAG_HTTP),
+            http_success=bool(flags & _FLAG_HTTP_OK),
+            http_latency_ms=_opt_f(http_ms),
+            http_status=http_status or None,
+            http_connect_ms=_opt_f(h_connect),
+            http_tls_ms=_opt_f(h_tls),
+            http_ttfb_ms=_opt_f(h_ttfb),
+            fault=_FAULT_NAMES.get(fault),
+            gateway_probed=bool(flags & _FLAG_GATEWAY),
+            gateway_arp_ok=bool(flags & _FLAG_GW_ARP),
+            gateway_icmp_ok=bool(flags & _FLAG_GW_ICMP),
+            gateway_rtt_ms=_opt_f(gw_rtt),
+            lease_remaining_s=_opt_f(lease),
+            hosts=hosts,
+        )
+
+    def records(self, last: Optional[int] = None) -> Iterator[SampleRecord]:
+        """Yield stored records oldest first (optionally only the newest ``last``)."""
+        newest = self.write_count
+        count = min(newest, self.capacity)
+        if last is not None:
+            count = min(count, last)
+        for seq in range(newest - count + 1, newest + 1):
+            rec = self._decode(seq)
+            if rec is not None:
+                yield rec
+
+
+def export_json(reader: SampleReader, out: IO[str], last: Optional[int] = None) -> int:
+    n = 0
+    for rec in reader.records(last):
+        out.write(json.dumps(asdict(rec), separators=(",", ":")) + "\n")
+        n += 1
+    return n
+
+
+def export_csv(reader: SampleReader, out: IO[str], last: Optional[int] = None) -> int:
+    """Flat CSV: one row per record, host columns suffixed with the host index."""
+    import csv
+
+    writer: Optional[csv.DictWriter] = None
+    n = 0
+    for rec in reader.records(last):
+        row = asdict(rec)
+        hosts = row.pop("hosts")
+        for i, h in enumerate(hosts):
+            for k, v in h.items():
+                row[f"host{i}_{k}"] = v
+        if writer is None:
+            writer = csv.DictWriter(out, fieldnames=list(row), extrasaction="ignore")
+            writer.writeheader()
+        writer.writerow(row)
+        n += 1
+    return n
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(prog="python -m watchdog.sample_store", description="Export a sample ring")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["json", "csv"], default="json")
+    parser.add_argument("--last", type=int, default=None, help="only the newest N records")
+    args = parser.parse_args(argv)
+    reader = SampleReader(args.path)
+    try:
+        (export_csv if args.format == "csv" else export_json)(reader, sys.stdout, args.last)
+    finally:
+        reader.close()
+    return 0
+
+
+__all__ = ["SampleRing", "SampleReader", "SampleRecord", "HostSample", "export_json", "export_csv"]
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .config import Config, ProbeCadence
+from .connectivity import active_probe_kinds, probe_once
+
+logger = logging.getLogger(__name__)
+
+
+class ProbeScheduler:
+    """Run each probe kind on its own cadence against the monotonic clock.
+
+    Every kind (link, ping, dns, http) gets a task that waits for its next due
+    time, runs the probe under ``timeouts.cycle_ms`` and hands the result to
+    ``on_result``. Due times advance from the previous due time rather than
+    from completion, so cadences do not drift; runs missed while a probe (or
+    the recovery it triggered) overran are skipped, not queued.
+
+    While ``healthy()`` is true and ``adaptive.enabled`` is set, each period
+    grows by its ``backoff_factor`` up to ``max_period_seconds``. :meth:`reset`
+    snaps every period back to its base, e.g. when the link turns unhealthy.
+    """
+
+    def __init__(
+        self,
+        cfg: Config,
+        on_result: Callable[[str, Any], Awaitable[None]],
+        healthy: Callable[[], bool],
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.cfg = cfg
+        self.on_result = on_result
+        self.healthy = healthy
+        self.clock = clock
+        self.kinds: List[str] = self._kinds_for(cfg)
+        self.periods: Dict[str, float] = {k: self._cadence(k).period_seconds for k in self.kinds}
+        self._due: Dict[str, float] = {}
+        self._wake: Dict[str, asyncio.Event] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._stop: Optional[asyncio.Event] = None
+        self._changed = asyncio.Event()
+        self._rng = random.Random()
+
+    @staticmethod
+    def _kinds_for(cfg: Config) -> List[str]:
+        return active_probe_kinds(cfg)
+
+    def _cadence(self, kind: str) -> ProbeCadence:
+        return getattr(self.cfg.cadence, kind)
+
+    def next_period(self, kind: str) -> float:
+        pc = self._cadence(kind)
+        if self.cfg.adaptive.enabled and self.healthy():
+            ceiling = pc.max_period_seconds or pc.period_seconds
+            self.periods[kind] = min(self.periods[kind] * pc.backoff_factor, ceiling)
+        else:
+            self.periods[kind] = pc.period_seconds
+        return self.periods[kind]
+
+    def reset(self, immediate: bool = False) -> None:
+        """Return every kind to its base period; with ``immediate`` run them all now."""
+        now = self.clock()
+        for kind in self.kinds:
+            self.periods[kind] = base = self._cadence(kind).period_seconds
+            if kind in self._due:
+                self._due[kind] = now if immediate else min(self._due[kind], now + base)
+                self._wake[kind].set()
+
+    def reconfigure(self, cfg: Config) -> None:
+        """Switch to ``cfg``'s cadences: start or stop kinds as needed and reschedule the rest."""
+        self.cfg = cfg
+        kinds = self._kinds_for(cfg)
+        for kind in set(self.kinds) - set(kinds):
+            task = self._tasks.pop(kind, None)
+            if task is not None:
+                task.cancel()
+            self._due.pop(kind, None)
+            self._wake.pop(kind, None)
+            self.periods.pop(kind, None)
+        self.kinds = kinds
+        for kind in kinds:
+            self.periods.setdefault(kind, self._cadence(kind).period_seconds)
+            if self._stop is not None and kind not in self._tasks:
+                self._start(kind, self.clock())
+        self.reset()
+        self._changed.set()
+
+    def _start(self, kind: str, due: float) -> None:
+        assert self._stop is not None
+        self._due[kind] = due
+        self._wake[kind] = asyncio.Event()
+        self._tasks[kind] = asyncio.create_task(self._run_kind(kind, self._stop),
+                                                name=f"probe-{self.cfg.interface}-{kind}")
+
+    def _jittered(self, kind: str, period: float) -> float:
+        j = self._cadence(kind).jitter
+        return period * (1 + self._rng.uniform(-j, j)) if j else period
+
+    async def _sleep_until_due(self, kind: str, stop: asyncio.Event) -> None:
+        wake = self._wake[kind]
+        while not stop.is_set():
+            delay = self._due[kind] - self.clock()
+            if delay <= 0:
+                return
+            waiters = [asyncio.ensure_future(stop.wait()), asyncio.ensure_future(wake.wait())]
+            try:
+                await asyncio.wait(waiters, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for w in waiters:
+                    w.cancel()
+            wake.clear()
+
+    async def _run_kind(self, kind: str, stop: asyncio.Event) -> None:
+        while True:
+            await self._sleep_until_due(kind, stop)
+            if stop.is_set():
+                return
+            result = await probe_once(self.cfg, kind)
+            try:
+                await self.on_result(kind, result)
+            except Exception as e:  # pragma: no cover
+                logger.exception("probe_result_error", extra={"extra_fields": {"kind": kind, "error": str(e)}})
+            due = self._due[kind] + self._jittered(kind, self.next_period(kind))
+            self._due[kind] = max(due, self.clock())
+
+    async def run(self, stop: asyncio.Event, start_immediately: bool = True) -> None:
+        """Run until ``stop`` is set; without ``start_immediately`` the first runs wait one period."""
+        self._stop = stop
+        now = self.clock()
+        for k in self.kinds:
+            self._start(k, now if start_immediately else now + self._jittered(k, self.periods[k]))
+        stopping = asyncio.ensure_future(stop.wait())
+        try:
+            while not stop.is_set():
+                self._changed.clear()
+                changed = asyncio.ensure_future(self._changed.wait())
+                try:
+                    done, _ = await asyncio.wait([stopping, changed, *self._tasks.values()],
+                                                 return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    changed.cancel()
+                for t in done:
+                    if t in self._tasks.values() and not t.cancelled() and t.exception() is not None:
+                        raise t.exception()  # a probe task died; let the monitor fail loudly
+        finally:
+            stopping.cancel()
+            for t in self._tasks.values():
+                t.cancel()
+            self._tasks.clear()
+            self._stop = None
+
+
+__all__ = ["ProbeScheduler"]
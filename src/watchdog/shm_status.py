@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Optional
+
+MAGIC = b"WWST"
+VERSION = 1
+# magic, version, seq (odd while a write is in progress)
+_HEADER = struct.Struct("<4sHxxI")
+# ts, last_state_change_ts, cycles, state, fail_ratio, consecutive, rssi, bitrate, interface, invoked_tier
+_BODY = struct.Struct("<ddQBfHhf16s32s")
+SEGMENT_SIZE = _HEADER.size + _BODY.size
+_SEQ_OFFSET = 8
+
+_STATES = {"HEALTHY": 0, "DEGRADED": 1, "LOST": 2}
+_STATE_NAMES = {v: k for k, v in _STATES.items()}
+_NO_RSSI = -32768
+
+
+@dataclass(slots=True)
+class StatusRecord:
+    ts: float
+    last_state_change_ts: float
+    cycles: int
+    state: Optional[str]
+    fail_ratio: float
+    consecutive_fail_packets: int
+    rssi: Optional[int]
+    bitrate_mbps: Optional[float]
+    interface: str
+    invoked_tier: Optional[str]
+
+
+class StatusSegment:
+    """Writer side of a fixed-layout status record in shared memory.
+
+    Uses a seqlock: the sequence number is odd while the body is being
+    rewritten, so readers never take a lock and never block the writer.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size != SEGMENT_SIZE:
+                os.ftruncate(fd, SEGMENT_SIZE)
+            self._mm = mmap.mmap(fd, SEGMENT_SIZE, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        finally:
+            os.close(fd)
+        magic, version, seq = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            seq = 0
+        self._seq = seq & ~1
+        _HEADER.pack_into(self._mm, 0, MAGIC, VERSION, self._seq)
+
+    def publish(self, rec: StatusRecord) -> None:
+        self._seq += 1
+        struct.pack_into("<I", self._mm, _SEQ_OFFSET, self._seq & 0xFFFFFFFF)
+        _BODY.pack_into(
+            self._mm, _HEADER.size,
+            rec.ts, rec.last_state_change_ts, rec.cycles, _STATES.get(rec.state or "", 255), rec.fail_ratio,
+            min(rec.consecutive_fail_packets, 0xFFFF), _NO_RSSI if rec.rssi is None else rec.rssi,
+            float("nan") if rec.bitrate_mbps is None else rec.bitrate_mbps,
+            rec.interface.encode()[:16], (rec.invoked_tier or "").encode()[:32],
+        )
+        self._seq += 1
+        struct.pack_into("<I", self._mm, _SEQ_OFFSET, self._seq & 0xFFFFFFFF)
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+def read_status_segment(path: str | os.PathLike[str], retries: int = 100) -> Optional[StatusRecord]:
+    """Lock-free read of a status segment; None if absent or never stable."""
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), SEGMENT_SIZE, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        for _ in range(retries):
+            magic, version, seq1 = _HEADER.unpack_from(mm, 0)
+            if magic != MAGIC or version != VERSION:
+                return None
+            if seq1 & 1:
+                time.sleep(0)
+                continue
+            body = _BODY.unpack_from(mm, _HEADER.size)
+            if struct.unpack_from("<I", mm, _SEQ_OFFSET)[0] != seq1:
+                continue
+            ts, changed, cycles, state, fail_ratio, consecutive, rssi, bitrate, iface, tier = body
+            return StatusRecord(
+                ts=ts,
+                last_state_change_ts=changed,
+                cycles=cycles,
+                state=_STATE_NAMES.get(state),
+                fail_ratio=fail_ratio,
+                consecutive_fail_packets=consecutive,
+                rssi=None if rssi == _NO_RSSI else rssi,
+                bitrate_mbps=None if bitrate != bitrate else bitrate,
+                interface=iface.rstrip(b"\0").decode(),
+                invoked_tier=tier.rstrip(b"\0").decode() or None,
+            )
+        return None
+    finally:
+        mm.close()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    path = args[0] if args else "/dev/shm/wifi-watchdog/status.bin"
+    rec = read_status_segment(path)
+    if rec is None:
+        print(f"no status at {path}", file=sys.stderr)
+        return 1
+    print(json.dumps(asdict(rec)))
+    return 0
+
+
+__all__ = ["StatusSegment", "StatusRecord", "read_status_segment"]
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
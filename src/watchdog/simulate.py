@@ -0,0 +1,435 @@
+"""Offline replay of the decision logic on a virtual clock.
+
+Feeds synthetic or recorded snapshot streams through :func:`classify`,
+:class:`EscalationManager` and :func:`update_adaptive_interval` with recovery
+steps stubbed out, so threshold, adaptive and ladder settings can be compared
+over months of simulated time in seconds::
+
+    python -m watchdog.simulate config/watchdog.yml --days 30 --fixed-by cycle_interface \\
+        --grid thresholds.lost_consecutive=3,6 --grid escalation.healthy_reset_consecutive=2,5
+    python -m watchdog.simulate config/watchdog.yml --replay /var/lib/wifi-watchdog/samples.ring
+
+Each grid point prints one JSON line with its overrides and report.
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import itertools
+import json
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import yaml
+
+from .config import Config, EscalationTier, validate_config
+from .connectivity import ConnectivitySnapshot, DnsResult, LinkMetrics, PingResult
+from .escalation import EscalationManager
+from .metrics import HealthState, HealthWindow, classify
+from .recovery import RecoveryControl
+from .supervisor import update_adaptive_interval
+
+# Virtual clocks start here rather than at 0 so "never invoked" tier state
+# (last_invoked == 0) behaves as it does on a real system.
+EPOCH = 1_700_000_000.0
+
+
+@dataclass(slots=True)
+class Scenario:
+    """Synthetic link behaviour.
+
+    Outages arrive with exponentially distributed gaps and durations; during an
+    outage each ping fails with ``outage_loss``, otherwise with ``base_loss``.
+    With ``fixed_by`` set, invoking that tier (or any later one) ends the
+    current outage; a reboot always does.
+    """
+
+    days: float = 7.0
+    base_loss: float = 0.01
+    outage_every_seconds: float = 6 * 3600
+    outage_seconds: float = 300.0
+    outage_loss: float = 1.0
+    rssi: Optional[int] = -60
+    bitrate_mbps: Optional[float] = 72.2
+    fixed_by: Optional[str] = None
+    reboot_seconds: float = 90.0
+    seed: int = 0
+
+
+@dataclass(slots=True)
+class _Outage:
+    start: float
+    end: float
+    detected_at: Optional[float] = None
+    first_tier_at: Optional[float] = None
+
+
+@dataclass(slots=True)
+class SimulationReport:
+    cycles: int = 0
+    virtual_seconds: float = 0.0
+    wall_seconds: float = 0.0
+    cycles_per_second: float = 0.0
+    states: Dict[str, int] = field(default_factory=lambda: {s: 0 for s in (
+        HealthState.HEALTHY, HealthState.DEGRADED, HealthState.LOST)})
+    state_changes: int = 0
+    tier_invocations: Dict[str, int] = field(default_factory=dict)
+    false_invocations: int = 0  # tiers invoked while the link was actually fine
+    reboots: int = 0
+    outages: int = 0
+    outages_detected: int = 0
+    outages_missed: int = 0
+    outages_repaired: int = 0  # ended by a recovery tier rather than on their own
+    detection_delay_s: Dict[str, float] = field(default_factory=dict)
+    first_tier_delay_s: Dict[str, float] = field(default_factory=dict)
+    state_mismatches: Optional[int] = None  # replay only: cycles classified differently than recorded
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    ordered = sorted(values)
+    return {
+        "mean": round(statistics.fmean(ordered), 2),
+        "p50": round(ordered[len(ordered) // 2], 2),
+        "p95": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 2),
+        "max": round(ordered[-1], 2),
+    }
+
+
+class _SimEscalation(EscalationManager):
+    """Escalation ladder with recovery stubbed and reboot state kept in memory."""
+
+    def __init__(self, cfg: Config, clock: Callable[[], float], machine: "_Machine") -> None:
+        self._machine = machine
+        super().__init__(cfg, clock)
+
+    def _load_reboot_state(self) -> None:
+        if self._machine.reboot_day == self._reboot_day:
+            self._reboots_today = self._machine.reboots_today
+
+    def _persist_reboot_state(self) -> None:
+        self._machine.reboot_day, self._machine.reboots_today = self._reboot_day, self._reboots_today
+
+    def record_invocation(self, tier: str, success: bool) -> None:
+        pass
+
+    def _uptime_seconds(self) -> Optional[float]:
+        return self._clock() - self._machine.boot_ts
+
+    def _invoke_tier(self, tier: EscalationTier, control: Optional[RecoveryControl] = None) -> bool:
+        if tier.name != "reboot":
+            return True
+        if not self._allow_reboot():
+            return False
+        self._reboots_today += 1
+        self._persist_reboot_state()
+        self._machine.rebooting = True
+        return True
+
+
+class _Machine:
+    """Per-boot daemon state, rebuilt after a simulated reboot like the real process."""
+
+    def __init__(self, cfg: Config) -> None:
+        self.cfg = cfg
+        self.now = EPOCH
+        self.boot_ts = EPOCH - 3600.0  # assume the device has been up a while
+        self.reboot_day: Optional[str] = None
+        self.reboots_today = 0
+        self.rebooting = False
+        self.boot()
+
+    def clock(self) -> float:
+        return self.now
+
+    def boot(self) -> None:
+        cfg = self.cfg
+        self.window = HealthWindow(cfg.history_size, cfg.history_horizons)
+        self.escalator = _SimEscalation(cfg, self.clock, self)
+        self.interval = cfg.check_interval_seconds
+        self.consecutive_healthy = 0
+        self.rebooting = False
+
+    def step(self, snapshot: ConnectivitySnapshot) -> Tuple[str, Optional[str]]:
+        cfg = self.cfg
+        cls = classify(cfg, snapshot, self.window)
+        self.escalator.record_health(cls)
+        tier = self.escalator.maybe_escalate(cls)
+        if cfg.adaptive.enabled:
+            self.interval, self.consecutive_healthy, _, _ = update_adaptive_interval(
+                cfg, cls.state, self.interval, self.consecutive_healthy
+            )
+        return cls.state, tier
+
+    def verification_hold(self, up_after: Optional[float], converging: bool) -> None:
+        """Hold the ladder the way the daemon's background verification would after a tier.
+
+        ``up_after`` is how many seconds after the tier the link answers again
+        (None: not within the window); ``converging`` means some replies arrive
+        meanwhile. Verification itself is not simulated round by round.
+        """
+        v = self.cfg.verification
+        if not v.enabled:
+            return
+        if up_after is not None:
+            recovered_after = up_after + (v.required_successes - 1) * v.interval_ms / 1000.0
+            if recovered_after <= v.window_seconds:
+                self.escalator.hold(recovered_after + v.holdoff_seconds)
+                return
+        self.escalator.hold(v.window_seconds + (v.holdoff_seconds if converging else 0.0))
+
+
+def _snapshots(cfg: Config, rssi: Optional[int], bitrate: Optional[float]) -> List[ConnectivitySnapshot]:
+    """Prebuilt snapshots indexed by failing-host bitmask, to keep the hot loop allocation-free."""
+    hosts = cfg.hosts.ping
+    link = LinkMetrics(rssi=rssi, bitrate_mbps=bitrate)
+    dns = DnsResult(hostname=cfg.hosts.dns_lookup, success=True, latency_ms=1.0)
+    out = []
+    for mask in range(1 << len(hosts)):
+        pings = [PingResult(host=h, success=not (mask >> i) & 1, latency_ms=1.0) for i, h in enumerate(hosts)]
+        out.append(ConnectivitySnapshot(ping_results=pings, dns_result=dns, http_result=None, link=link))
+    return out
+
+
+def simulate(cfg: Config, scenario: Scenario) -> SimulationReport:
+    """Run ``scenario`` against ``cfg`` and report what the daemon would have done."""
+    rng = random.Random(scenario.seed)
+    report = SimulationReport()
+    machine = _Machine(cfg)
+    end = EPOCH + scenario.days * 86400.0
+    snaps = _snapshots(cfg, scenario.rssi, scenario.bitrate_mbps)
+    n_hosts = len(cfg.hosts.ping)
+    tier_order = {t.name: i for i, t in enumerate(cfg.escalation.tiers)}
+    fix_index = tier_order.get(scenario.fixed_by) if scenario.fixed_by else None
+
+    def next_outage(after: float) -> _Outage:
+        start = after + rng.expovariate(1.0 / scenario.outage_every_seconds)
+        return _Outage(start, start + rng.expovariate(1.0 / scenario.outage_seconds))
+
+    def close(o: _Outage) -> None:
+        report.outages += 1
+        if o.detected_at is None:
+            report.outages_missed += 1
+        else:
+            report.outages_detected += 1
+            detection.append(o.detected_at - o.start)
+        if o.first_tier_at is not None:
+            first_tier.append(o.first_tier_at - o.start)
+
+    detection: List[float] = []
+    first_tier: List[float] = []
+    outage = next_outage(EPOCH)
+    prev_state: Optional[str] = None
+    started = time.perf_counter()
+    cycles = 0
+    while machine.now < end:
+        now = machine.now
+        while now >= outage.end:
+            close(outage)
+            outage = next_outage(outage.end)
+        down = now >= outage.start
+        loss = scenario.outage_loss if down else scenario.base_loss
+        mask = 0
+        if loss:
+            for i in range(n_hosts):
+                if rng.random() < loss:
+                    mask |= 1 << i
+        state, tier = machine.step(snaps[mask])
+        cycles += 1
+        report.states[state] += 1
+        if state != prev_state:
+            if prev_state is not None:
+                report.state_changes += 1
+            prev_state = state
+        if down and outage.detected_at is None and state != HealthState.HEALTHY:
+            outage.detected_at = now
+        if tier is not None:
+            report.tier_invocations[tier] = report.tier_invocations.get(tier, 0) + 1
+            if not down:
+                report.false_invocations += 1
+            elif outage.first_tier_at is None:
+                outage.first_tier_at = now
+            repaired = machine.rebooting or (fix_index is not None and tier_order[tier] >= fix_index)
+            if down and repaired:
+                report.outages_repaired += 1
+                outage.end = now
+            if not machine.rebooting:
+                machine.verification_hold(max(outage.end - now, 0.0) if down else 0.0,
+                                          down and 0.0 < scenario.outage_loss < 1.0)
+        if machine.rebooting:
+            report.reboots += 1
+            machine.now += scenario.reboot_seconds
+            machine.boot_ts = machine.now
+            machine.boot()
+        machine.now += machine.interval
+    if outage.start < end:
+        close(outage)
+    wall = time.perf_counter() - started
+    report.cycles = cycles
+    report.virtual_seconds = round(machine.now - EPOCH, 1)
+    report.wall_seconds = round(wall, 3)
+    report.cycles_per_second = round(cycles / wall, 1) if wall else 0.0
+    report.detection_delay_s = _summary(detection)
+    report.first_tier_delay_s = _summary(first_tier)
+    return report
+
+
+def _recorded(path: str) -> Iterator[Tuple[float, Optional[str], ConnectivitySnapshot]]:
+    from .sample_store import SampleReader
+
+    reader = SampleReader(path)
+    try:
+        for rec in reader.records():
+            pings = [PingResult(host=h.host, success=h.received > 0, latency_ms=h.latency_ms) for h in rec.hosts]
+            snap = ConnectivitySnapshot(
+                ping_results=pings,
+                dns_result=DnsResult(hostname="", success=rec.dns_success, latency_ms=rec.dns_latency_ms),
+                http_result=None,
+                link=LinkMetrics(rssi=rec.rssi, bitrate_mbps=rec.tx_bitrate_mbps),
+            )
+            yield rec.ts, rec.state, snap
+    finally:
+        reader.close()
+
+
+def replay(cfg: Config, path: str) -> SimulationReport:
+    """Re-run a recorded sample ring through ``cfg`` at its original timestamps.
+
+    There is no ground truth for recorded data, so outage statistics stay
+    empty; ``state_mismatches`` counts cycles ``cfg`` classifies differently
+    from the daemon that recorded them. For the same reason a tier's
+    verification is taken to fail: the ladder is held for the window only.
+    """
+    report = SimulationReport(state_mismatches=0)
+    machine = _Machine(cfg)
+    first_ts: Optional[float] = None
+    prev_state: Optional[str] = None
+    started = time.perf_counter()
+    for ts, recorded_state, snap in _recorded(path):
+        if first_ts is None:
+            first_ts = ts
+            machine.boot_ts = ts - 3600.0
+        machine.now = ts
+        state, tier = machine.step(snap)
+        report.cycles += 1
+        report.states[state] += 1
+        if prev_state is not None and state != prev_state:
+            report.state_changes += 1
+        prev_state = state
+        if recorded_state is not None and recorded_state != state:
+            report.state_mismatches += 1
+        if tier is not None:
+            report.tier_invocations[tier] = report.tier_invocations.get(tier, 0) + 1
+            if not machine.rebooting:
+                machine.verification_hold(None, False)
+        if machine.rebooting:
+            report.reboots += 1
+            machine.boot()
+    wall = time.perf_counter() - started
+    report.virtual_seconds = round(machine.now - first_ts, 1) if first_ts is not None else 0.0
+    report.wall_seconds = round(wall, 3)
+    report.cycles_per_second = round(report.cycles / wall, 1) if wall else 0.0
+    return report
+
+
+def _set_path(d: Dict[str, Any], dotted: str, value: Any) -> None:
+    """Set ``a.b.0.c`` style keys; integer parts index into lists."""
+    parts = dotted.split(".")
+    node: Any = d
+    for part in parts[:-1]:
+        if isinstance(node, list):
+            node = node[int(part)]
+        else:
+            node = node.setdefault(part, {})
+    last = parts[-1]
+    if isinstance(node, list):
+        node[int(last)] = value
+    else:
+        node[last] = value
+
+
+def parse_grid(specs: List[str]) -> Dict[str, List[Any]]:
+    """``["a.b=1,2", "c=x"]`` -> ``{"a.b": [1, 2], "c": ["x"]}`` (values parsed as YAML)."""
+    grid: Dict[str, List[Any]] = {}
+    for spec in specs:
+        key, sep, values = spec.partition("=")
+        if not sep or not key:
+            raise ValueError(f"grid entry must be key=v1,v2,...: {spec!r}")
+        grid[key.strip()] = [yaml.safe_load(v) for v in values.split(",")]
+    return grid
+
+
+def grid_points(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    keys = list(grid)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(grid[k] for k in keys))] or [{}]
+
+
+def _run_point(base: Dict[str, Any], overrides: Dict[str, Any], scenario: Scenario,
+               replay_path: Optional[str]) -> Dict[str, Any]:
+    data = copy.deepcopy(base)
+    for key, value in overrides.items():
+        _set_path(data, key, value)
+    try:
+        cfg = Config.from_dict(data)
+        validate_config(cfg)
+    except (TypeError, ValueError, IndexError, KeyError) as e:
+        return {"overrides": overrides, "error": str(e)}
+    report = replay(cfg, replay_path) if replay_path else simulate(cfg, scenario)
+    return {"overrides": overrides, "report": asdict(report)}
+
+
+def sweep(base: Dict[str, Any], grid: Dict[str, List[Any]], scenario: Scenario,
+          replay_path: Optional[str] = None, jobs: int = 1) -> Iterator[Dict[str, Any]]:
+    """Yield one result per grid point, in grid order."""
+    points = grid_points(grid)
+    if jobs <= 1 or len(points) == 1:
+        for p in points:
+            yield _run_point(base, p, scenario, replay_path)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        n = len(points)
+        yield from pool.map(_run_point, [base] * n, points, [scenario] * n, [replay_path] * n)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    d = Scenario()
+    parser = argparse.ArgumentParser(prog="python -m watchdog.simulate", description="Replay the watchdog offline")
+    parser.add_argument("config", help="base watchdog.yml")
+    parser.add_argument("--replay", metavar="SAMPLE_RING", help="replay a recorded sample ring instead of synthesizing")
+    parser.add_argument("--days", type=float, default=d.days)
+    parser.add_argument("--base-loss", type=float, default=d.base_loss)
+    parser.add_argument("--outage-every", type=float, default=d.outage_every_seconds, help="mean seconds between outages")
+    parser.add_argument("--outage-seconds", type=float, default=d.outage_seconds, help="mean outage length")
+    parser.add_argument("--outage-loss", type=float, default=d.outage_loss)
+    parser.add_argument("--rssi", type=int, default=d.rssi)
+    parser.add_argument("--fixed-by", default=None, help="tier whose invocation (or any later tier's) ends an outage")
+    parser.add_argument("--seed", type=int, default=d.seed)
+    parser.add_argument("--grid", action="append", default=[], metavar="KEY=V1,V2",
+                        help="config key to sweep (dotted path, list indices allowed); repeatable")
+    parser.add_argument("--jobs", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    with open(args.config, "r", encoding="utf-8") as f:
+        base = yaml.safe_load(f) or {}
+    base.pop("interfaces", None)
+    scenario = Scenario(
+        days=args.days, base_loss=args.base_loss, outage_every_seconds=args.outage_every,
+        outage_seconds=args.outage_seconds, outage_loss=args.outage_loss, rssi=args.rssi,
+        fixed_by=args.fixed_by, seed=args.seed,
+    )
+    failed = False
+    for result in sweep(base, parse_grid(args.grid), scenario, args.replay, args.jobs):
+        failed = failed or "error" in result
+        print(json.dumps(result), flush=True)
+    return 1 if failed else 0
+
+
+__all__ = ["Scenario", "SimulationReport", "grid_points", "parse_grid", "replay", "simulate", "sweep"]
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(main())
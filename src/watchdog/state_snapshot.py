@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+BOOT_ID_PATH = "/proc/sys/kernel/random/boot_id"
+
+
+def snapshot_path(cfg: Config) -> Path:
+    """One file per interface: monitors of a multi-interface config share ``state_dir``."""
+    return Path(cfg.paths.state_dir) / f"state.{cfg.interface}.json"
+
+
+def boot_id(path: str = BOOT_ID_PATH) -> Optional[str]:
+    """Kernel boot ID; differs after every reboot. None where unavailable."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def write_snapshot(path: Path, data: Dict[str, Any]) -> None:
+    """Write ``data`` with the current version atomically and durably (temp file, fsync, rename).
+
+    The last snapshot before a reboot tier must survive the reboot, hence the fsync.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": SNAPSHOT_VERSION, **data}, f, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def read_snapshot(path: Path) -> Optional[Dict[str, Any]]:
+    """The snapshot at ``path``, or None if missing, unreadable or of another version."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("state_snapshot_unreadable", extra={"extra_fields": {"path": str(path), "error": str(e)}})
+        return None
+    if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+        logger.info("state_snapshot_ignored", extra={"extra_fields": {
+            "path": str(path), "reason": "version", "version": data.get("version") if isinstance(data, dict) else None}})
+        return None
+    return data
+
+
+__all__ = ["SNAPSHOT_VERSION", "boot_id", "read_snapshot", "snapshot_path", "write_snapshot"]
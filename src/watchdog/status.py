@@ -2,72 +2,216 @@ from __future__ import annotations
 
 import json
 import logging
+import os
 import time
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Set, Tuple
 
 from .config import Config
+from .history import HistoryWriter
+from .shm_status import StatusRecord, StatusSegment
 
-_tier_counters: Dict[str, int] = {}
-_last_state: Optional[str] = None
-_last_state_change_ts: float = 0.0
+# Keyed by interface so one process can publish metrics for several monitors.
+_tier_counters: Dict[str, Dict[str, int]] = {}
+_recoveries: Dict[str, Dict[str, Dict[str, Any]]] = {}  # iface -> tier -> verification summary
+_last_state: Dict[str, str] = {}
+_last_state_change_ts: Dict[str, float] = {}
+_history_writers: Dict[str, HistoryWriter] = {}
+# Routine per-cycle records are batched; anything else is flushed straight away.
+_ROUTINE_EVENTS = frozenset({"cycle"})
+# Gateway fields that move every cycle; the file still carries them, but they alone never force a rewrite.
+_VOLATILE_GATEWAY = frozenset({"latency_ms", "lease_remaining_s"})
+# RSSI jitters by a few dB between cycles on a steady link; smaller moves than this do not count as a change.
+RSSI_CHANGE_DB = 5
+_cycles: Dict[str, int] = {}
+_segments: Dict[str, StatusSegment] = {}
+_last_written: Dict[str, Tuple[Any, float]] = {}  # path -> (content signature, monotonic ts)
+_created_dirs: Set[str] = set()
 from .metrics import ClassificationResult
 
 logger = logging.getLogger(__name__)
 
 
+def _atomic_write_text(path: Path, text: str) -> None:
+    """Replace ``path`` via temp file + rename so readers never see partial content."""
+    parent = str(path.parent)
+    if parent not in _created_dirs:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _created_dirs.add(parent)
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _changed(path: str, signature: Any, heartbeat: float) -> bool:
+    """True if ``signature`` differs from the last write or the heartbeat is due."""
+    prev = _last_written.get(path)
+    now = time.monotonic()
+    if prev is not None and prev[0] == signature and now - prev[1] < heartbeat:
+        return False
+    _last_written[path] = (signature, now)
+    return True
+
+
+def _settled_rssi(rssi: Optional[int], previous: Optional[int]) -> Optional[int]:
+    """``previous`` while ``rssi`` stays within ``RSSI_CHANGE_DB`` of it, else ``rssi``."""
+    if rssi is not None and previous is not None and abs(rssi - previous) < RSSI_CHANGE_DB:
+        return previous
+    return rssi
+
+
+def _note_state(iface: str, state: str) -> None:
+    if _last_state.get(iface) != state:
+        _last_state[iface] = state
+        _last_state_change_ts[iface] = time.time()
+
+
+def publish_status_shm(cfg: Config, classification: ClassificationResult, invoked_tier: Optional[str]) -> None:
+    """Update the shared-memory status record; cheap enough for every cycle."""
+    path = cfg.paths.status_shm
+    if not path:
+        return
+    iface = cfg.interface
+    try:
+        seg = _segments.get(path)
+        if seg is None:
+            seg = _segments[path] = StatusSegment(path)
+        seg.publish(StatusRecord(
+            ts=time.time(),
+            last_state_change_ts=_last_state_change_ts.get(iface, 0.0),
+            cycles=_cycles.get(iface, 0),
+            state=classification.state,
+            fail_ratio=classification.fail_ratio,
+            consecutive_fail_packets=classification.consecutive_fail_packets,
+            rssi=classification.rssi,
+            bitrate_mbps=classification.bitrate_mbps,
+            interface=iface,
+            invoked_tier=invoked_tier,
+        ))
+    except Exception as e:
+        logger.warning("write_status_shm_failed", extra={"extra_fields": {"error": str(e), "path": path}})
+
+
 def write_status(cfg: Config, classification: ClassificationResult, extra: Dict[str, Any]) -> None:
+    """Publish status to shared memory, and to ``paths.status_json`` on change.
+
+    The JSON file is rewritten (atomically) only when its content changed or
+    ``features.status_heartbeat_seconds`` passed, sparing flash from a rewrite
+    every cycle. RSSI moves under ``RSSI_CHANGE_DB``, gateway RTT and lease time
+    left are refreshed only with other changes or the heartbeat.
+    """
+    iface = cfg.interface
+    _cycles[iface] = _cycles.get(iface, 0) + 1
+    _note_state(iface, classification.state)
+    publish_status_shm(cfg, classification, extra.get("invoked_tier"))
     data = {
         "timestamp": time.time(),
+        "interface": cfg.interface,
         "state": classification.state,
         "fail_ratio": classification.fail_ratio,
         "consecutive_fail_packets": classification.consecutive_fail_packets,
         "rssi": classification.rssi,
+        "fault": classification.fault,
     }
     data.update(extra)
+    recovery = _recoveries.get(iface)
+    if recovery:
+        data["recovery"] = recovery
     path = Path(cfg.paths.status_json)
+    stable = extra
+    if isinstance(extra.get("gateway"), dict):
+        stable = {**extra, "gateway": {k: v for k, v in extra["gateway"].items() if k not in _VOLATILE_GATEWAY}}
+    prev = _last_written.get(str(path))
+    signature = (
+        classification.state,
+        round(classification.fail_ratio, 3),
+        classification.consecutive_fail_packets,
+        _settled_rssi(classification.rssi, prev[0][3] if prev else None),
+        classification.fault,
+        json.dumps(stable, sort_keys=True, default=str),
+        json.dumps(recovery, sort_keys=True) if recovery else None,
+    )
+    if not _changed(str(path), signature, cfg.features.status_heartbeat_seconds):
+        return
+    # Later jitter is measured from the RSSI actually written.
+    _last_written[str(path)] = (signature[:3] + (classification.rssi,) + signature[4:], _last_written[str(path)][1])
     try:
-        path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        _atomic_write_text(path, json.dumps(data, separators=(",", ":")))
     except Exception as e:
         logger.warning("write_status_failed", extra={"extra_fields": {"error": str(e), "path": str(path)}})
 
 
-def append_action_history(cfg: Config, record: Dict[str, Any]) -> None:
-    path = Path(cfg.paths.action_history)
+def append_action_history(cfg: Config, record: Dict[str, Any], important: Optional[bool] = None) -> None:
+    """Queue one JSON line for ``paths.action_history`` (see :class:`HistoryWriter`)."""
+    path = cfg.paths.action_history
+    if important is None:
+        important = record.get("event") not in _ROUTINE_EVENTS
     try:
-        path.parent.mkdir(parents=True, exist_ok=True)
-        line = json.dumps({"ts": time.time(), **record}, separators=(",", ":"))
-        with path.open("a", encoding="utf-8") as f:
-            f.write(line + "\n")
+        writer = _history_writers.get(path)
+        if writer is None:
+            writer = _history_writers[path] = HistoryWriter(path, cfg.history)
+        writer.append({"ts": time.time(), **record}, important=important)
     except Exception as e:  # pragma: no cover
         logger.warning("history_write_failed", extra={"extra_fields": {"error": str(e)}})
 
 
+def close_action_history() -> None:
+    """Flush and close every open history file (call on shutdown)."""
+    for path, writer in list(_history_writers.items()):
+        try:
+            writer.close()
+        except Exception as e:  # pragma: no cover
+            logger.warning("history_close_failed", extra={"extra_fields": {"path": path, "error": str(e)}})
+    _history_writers.clear()
+
+
 def write_prometheus(cfg: Config, classification: ClassificationResult) -> None:
     prom_path = cfg.features.prometheus_textfile
     if not prom_path:
         return
-    global _last_state, _last_state_change_ts
-    if _last_state != classification.state:
-        _last_state = classification.state
-        _last_state_change_ts = time.time()
+    iface = cfg.interface
+    _note_state(iface, classification.state)
 
+    label = f'interface="{iface}"'
     lines = [
-        f"wifi_watchdog_state 1" if classification.state == 'HEALTHY' else "wifi_watchdog_state 0",
-        f"wifi_watchdog_fail_ratio {classification.fail_ratio}",
-        f"wifi_watchdog_last_state_change_ts {_last_state_change_ts}",
+        f"wifi_watchdog_state{{{label}}} {1 if classification.state == 'HEALTHY' else 0}",
+        f"wifi_watchdog_fail_ratio{{{label}}} {classification.fail_ratio}",
+        f"wifi_watchdog_last_state_change_ts{{{label}}} {_last_state_change_ts[iface]}",
     ]
-    for tier, count in _tier_counters.items():
-        lines.append(f"wifi_watchdog_tier_invocations{{tier=\"{tier}\"}} {count}")
+    for tier, count in list(_tier_counters.get(iface, {}).items()):
+        lines.append(f"wifi_watchdog_tier_invocations{{{label},tier=\"{tier}\"}} {count}")
+    for tier, rec in list(_recoveries.get(iface, {}).items()):
+        lines.append(f"wifi_watchdog_tier_recoveries{{{label},tier=\"{tier}\"}} {rec['recovered']}")
+        if rec["last_time_to_recover_s"] is not None:
+            lines.append(
+                f"wifi_watchdog_time_to_recover_seconds{{{label},tier=\"{tier}\"}} {rec['last_time_to_recover_s']}"
+            )
+    if not _changed(prom_path, tuple(lines), cfg.features.status_heartbeat_seconds):
+        return
     try:
-        p = Path(prom_path)
-        p.parent.mkdir(parents=True, exist_ok=True)
-        p.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        _atomic_write_text(Path(prom_path), "\n".join(lines) + "\n")
     except Exception as e:
         logger.warning("write_prometheus_failed", extra={"extra_fields": {"error": str(e)}})
 
-def inc_tier_counter(tier: str) -> None:
-    _tier_counters[tier] = _tier_counters.get(tier, 0) + 1
+def inc_tier_counter(tier: str, interface: str = "") -> None:
+    counters = _tier_counters.setdefault(interface, {})
+    counters[tier] = counters.get(tier, 0) + 1
+
+
+def record_recovery(tier: str, recovered: bool, time_to_recover_s: Optional[float], interface: str = "") -> None:
+    """Fold one post-tier verification into the per-tier summary shown in status outputs."""
+    rec = _recoveries.setdefault(interface, {}).setdefault(
+        tier, {"verified": 0, "recovered": 0, "last_time_to_recover_s": None, "mean_time_to_recover_s": None}
+    )
+    rec["verified"] += 1
+    if recovered and time_to_recover_s is not None:
+        mean = rec["mean_time_to_recover_s"]
+        rec["mean_time_to_recover_s"] = round(
+            time_to_recover_s if mean is None else mean + (time_to_recover_s - mean) / (rec["recovered"] + 1), 3
+        )
+        rec["recovered"] += 1
+        rec["last_time_to_recover_s"] = round(time_to_recover_s, 3)
 
-__all__ = ["write_status", "write_prometheus", "append_action_history", "inc_tier_counter"]
+__all__ = ["write_status", "publish_status_shm", "write_prometheus", "append_action_history", "close_action_history", "inc_tier_counter",
+           "record_recovery"]
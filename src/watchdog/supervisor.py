@@ -0,0 +1,702 @@
+from __future__ import annotations
+
+import asyncio
+import dataclasses as dc
+import logging
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from .config import Config, EscalationTier, diff_config, interface_configs, sample_ring_path
+from .connectivity import ConnectivitySnapshot, gather_snapshot_async, probe_once
+from .escalation import EscalationManager
+from .metrics import ClassificationResult, HealthState, HealthWindow, classify
+from .recovery import RecoveryControl, RecoveryJob
+from .sample_store import SampleRing
+from .scheduler import ProbeScheduler
+from .state_snapshot import boot_id, read_snapshot, snapshot_path, write_snapshot
+from .status import append_action_history, close_action_history, record_recovery, write_prometheus, write_status
+from .verify import verify_recovery
+
+if TYPE_CHECKING:
+    from .events import LinkEvent, RtnetlinkListener, WpaEventListener
+    from .exporter import MetricsRegistry, MetricsServer
+
+logger = logging.getLogger(__name__)
+
+
+def update_adaptive_interval(cfg: Config, state: str, current_interval: int, consecutive_healthy: int):
+    backoff_event = None
+    reset_event = None
+    if state == "HEALTHY":
+        consecutive_healthy += 1
+        if consecutive_healthy >= cfg.adaptive.healthy_cycles_for_backoff:
+            new_interval = min(int(current_interval * cfg.adaptive.backoff_factor), cfg.adaptive.max_interval_seconds)
+            if new_interval != current_interval:
+                backoff_event = {"old": current_interval, "new": new_interval}
+            current_interval = new_interval
+    else:
+        if current_interval != cfg.check_interval_seconds:
+            reset_event = {"old": current_interval, "reset_to": cfg.check_interval_seconds}
+        current_interval = cfg.check_interval_seconds
+        consecutive_healthy = 0
+    return current_interval, consecutive_healthy, backoff_event, reset_event
+
+
+def sd_notify(message: str) -> None:
+    """Send a systemd sd_notify style message if NOTIFY_SOCKET is present.
+
+    message examples: "READY=1", "WATCHDOG=1", "STATUS=...".
+    Safe to call even when not managed by systemd (silently no-ops).
+    """
+    notify_sock = os.getenv("NOTIFY_SOCKET")
+    if not notify_sock:
+        return
+    try:  # pragma: no cover - environment dependent
+        import socket as _sock
+        addr = notify_sock
+        if addr.startswith('@'):  # abstract namespace
+            addr = '\0' + addr[1:]
+        af_unix = getattr(_sock, "AF_UNIX", None)
+        if af_unix is None:
+            return
+        s = _sock.socket(af_unix, _sock.SOCK_DGRAM)
+        s.settimeout(0.05)
+        s.connect(addr)
+        s.sendall(message.encode("utf-8"))
+        s.close()
+    except Exception:
+        pass
+
+
+# Settings bound at startup to open files, sockets, listeners or the shape of the run loop.
+RESTART_ONLY = ("paths", "history", "events", "features.metrics_listen", "features.sample_ring_records",
+                "features.watch_config", "cadence.enabled")
+
+
+def _needs_restart(setting: str) -> bool:
+    return any(setting == p or setting.startswith(p + ".") for p in RESTART_ONLY)
+
+
+def _keep_restart_only(new: Config, old: Config) -> Config:
+    """``new`` with every restart-only setting still at its running value."""
+    return dc.replace(
+        new,
+        paths=old.paths,
+        history=old.history,
+        events=old.events,
+        features=dc.replace(new.features, metrics_listen=old.features.metrics_listen,
+                            sample_ring_records=old.features.sample_ring_records,
+                            watch_config=old.features.watch_config),
+        cadence=dc.replace(new.cadence, enabled=old.cadence.enabled),
+    )
+
+
+def _link_answering(snapshot: ConnectivitySnapshot) -> bool:
+    """Every ping target replied in this round: the link is back, whatever the window says."""
+    return bool(snapshot.ping_results) and all(r.success for r in snapshot.ping_results)
+
+
+class InterfaceMonitor:
+    """Health loop for one interface: its own window, ladder and status outputs.
+
+    Probes run on the shared event loop; recovery actions run on a private
+    single-thread executor, one tier at a time, while this interface keeps
+    probing. A tier still running when every ping target answers again is
+    told to stop at its next safe point. With ``cadence.enabled`` each probe kind
+    runs on its own schedule and every ping round is classified together with
+    the latest link, DNS and HTTP results. With ``snapshot.enabled`` the window,
+    ladder and adaptive interval are saved periodically and restored at start.
+    """
+
+    def __init__(self, cfg: Config) -> None:
+        self.cfg = cfg
+        self.window = HealthWindow(cfg.history_size, cfg.history_horizons)
+        self.escalator = EscalationManager(cfg)
+        self.current_interval = cfg.check_interval_seconds
+        self.consecutive_healthy = 0
+        self.last_cycle_monotonic = time.monotonic()
+        self.last_classification: Optional[ClassificationResult] = None
+        self.latest: Optional[ConnectivitySnapshot] = None
+        self.scheduler: Optional[ProbeScheduler] = None
+        self._events: List[LinkEvent] = []
+        self._event_wake = asyncio.Event()
+        self._last_cycle_start = 0.0
+        self._incident_started: Optional[float] = None  # monotonic time the current outage was first seen
+        self._verification: Optional[asyncio.Task] = None
+        self._job: Optional[RecoveryJob] = None  # at most one tier runs at a time
+        self._recovery = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"recovery-{cfg.interface}")
+        registry = self._registry()
+        if registry is not None:
+            registry.register(cfg)
+        self._boot_id = boot_id()
+        self._snapshot_saved = time.monotonic()
+        if cfg.snapshot.enabled:
+            self._restore_snapshot()
+        self.samples: Optional[SampleRing] = None
+        if cfg.features.sample_ring_records:
+            try:
+                self.samples = SampleRing(sample_ring_path(cfg), cfg.features.sample_ring_records, cfg.hosts.ping)
+            except (OSError, ValueError) as e:
+                logger.warning("sample_ring_unavailable", extra={"extra_fields": {"error": str(e)}})
+
+    def apply_config(self, cfg: Config) -> Tuple[List[str], List[str]]:
+        """Switch to ``cfg`` in place; returns (applied, needs_restart) setting names.
+
+        The health window is resized keeping its samples, the escalator keeps
+        its ladder position and tier history, and probe cadences are
+        rescheduled. Restart-only settings keep their running values.
+        """
+        changed = diff_config(self.cfg, cfg)
+        pending = [c for c in changed if _needs_restart(c)]
+        applied = [c for c in changed if not _needs_restart(c)]
+        if not applied:
+            return applied, pending
+        old, cfg = self.cfg, _keep_restart_only(cfg, self.cfg)
+        self.cfg = cfg
+        if (cfg.history_size, cfg.history_horizons) != (old.history_size, old.history_horizons):
+            self.window = self.window.resized(cfg.history_size, cfg.history_horizons)
+        self.escalator.reconfigure(cfg)
+        if any(c == "check_interval_seconds" or c.startswith("adaptive.") for c in applied):
+            self.current_interval = cfg.check_interval_seconds  # back off again from the new base
+        if self.scheduler is not None:
+            self.scheduler.reconfigure(cfg)
+        registry = self._registry()
+        if registry is not None:
+            registry.register(cfg)
+        return applied, pending
+
+    def _registry(self) -> Optional[MetricsRegistry]:
+        """The /metrics registry, or None (exporter left unimported) without ``features.metrics_listen``."""
+        if not self.cfg.features.metrics_listen:
+            return None
+        from .exporter import REGISTRY
+
+        return REGISTRY
+
+    def _restore_snapshot(self) -> None:
+        """Resume from the last snapshot so classification and the ladder need no warm-up.
+
+        The last reboot time is a wall-clock time and always restored (unless
+        in the future), so reboot spacing holds across reboots. Everything
+        else needs the same boot: a reboot is the top of the ladder, and
+        samples from before it say nothing about the link after it. Tier
+        timestamps are then restored too; the ladder position needs a snapshot
+        younger than ``snapshot.max_age_seconds``, and so do the window and
+        the adaptive interval.
+        """
+        cfg = self.cfg
+        data = read_snapshot(snapshot_path(cfg))
+        if data is None:
+            return
+        age = time.time() - float(data.get("written_ts") or 0)
+        fresh = 0 <= age <= cfg.snapshot.max_age_seconds
+        same_boot = data.get("boot_id") == self._boot_id
+        self.escalator.restore_state(data.get("escalation") or {}, ladder=fresh and same_boot, tier_times=same_boot)
+        if fresh and same_boot:
+            self.window = HealthWindow.restore(cfg.history_size, cfg.history_horizons, data.get("window") or {})
+            adaptive = data.get("adaptive") or {}
+            ceiling = max(cfg.adaptive.max_interval_seconds, cfg.check_interval_seconds)
+            interval = int(adaptive.get("interval") or cfg.check_interval_seconds)
+            self.current_interval = min(max(interval, cfg.check_interval_seconds), ceiling)
+            self.consecutive_healthy = int(adaptive.get("consecutive_healthy") or 0)
+        logger.info("state_restored", extra={"extra_fields": {
+            "interface": cfg.interface, "age_s": round(age, 1), "fresh": fresh, "same_boot": same_boot,
+            "window_entries": len(self.window), "ladder_tier": self.escalator.export_state()["ladder_tier"],
+            "interval": self.current_interval}})
+
+    def _snapshot_data(self) -> Dict[str, Any]:
+        return {
+            "written_ts": time.time(),
+            "boot_id": self._boot_id,
+            "interface": self.cfg.interface,
+            "window": self.window.export(),
+            "escalation": self.escalator.export_state(),
+            "adaptive": {"interval": self.current_interval, "consecutive_healthy": self.consecutive_healthy},
+        }
+
+    def save_snapshot(self, data: Optional[Dict[str, Any]] = None) -> None:
+        """Write the warm-start snapshot (``data``, else the current state) now; failures are logged, never raised."""
+        cfg = self.cfg
+        self._snapshot_saved = time.monotonic()
+        data = data or self._snapshot_data()
+        try:
+            write_snapshot(snapshot_path(cfg), data)
+        except OSError as e:
+            logger.warning("state_snapshot_failed", extra={"extra_fields": {"interface": cfg.interface, "error": str(e)}})
+
+    async def stop_verification(self) -> None:
+        """Cancel a running verification and wait until it has unwound."""
+        task, self._verification = self._verification, None
+        if task is None or task.done():
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    def close(self) -> None:
+        if self._job is not None:
+            self._job.control.cancel("shutdown")
+        task, self._verification = self._verification, None
+        # Normally run() already stopped it; a task whose loop has closed cannot be cancelled any more.
+        if task is not None and not task.done() and not task.get_loop().is_closed():
+            task.cancel()
+        if self.cfg.snapshot.enabled:
+            self.save_snapshot()
+        self._recovery.shutdown(wait=False, cancel_futures=True)
+        if self.samples is not None:
+            self.samples.close()
+            self.samples = None
+
+    async def run_cycle(self, snapshot: Optional[ConnectivitySnapshot] = None) -> Optional[ClassificationResult]:
+        """Classify ``snapshot`` (probing everything first when not given) and act on it."""
+        cfg = self.cfg
+        classification = None
+        started = self._last_cycle_start = time.monotonic()
+        try:
+            if snapshot is None:
+                snapshot = self.latest = await gather_snapshot_async(cfg)
+            classification = classify(cfg, snapshot, self.window)
+            if self.samples is not None:
+                self.samples.append(time.time(), snapshot, classification.state, classification.fail_ratio,
+                                    classification.fault)
+            if classification.state == HealthState.HEALTHY:
+                self._incident_started = None
+            elif self._incident_started is None:
+                self._incident_started = started
+            self.escalator.record_health(classification)
+            invoked_tier = None
+            job = self._job
+            if job is None:
+                tier = self.escalator.next_tier(classification)
+                if tier is not None:
+                    invoked_tier = tier.name
+                    job = self._start_recovery(tier)
+            elif _link_answering(snapshot) and not job.control.cancelled:
+                logger.info("tier_abort", extra={"extra_fields": {
+                    "interface": cfg.interface, "tier": job.tier, "step": job.current_step}})
+                job.control.cancel("link_recovered")
+            registry = self._registry()
+            if registry is not None:
+                registry.observe_cycle(cfg.interface, snapshot, classification, time.monotonic() - started)
+
+            logger.info(
+                "health_cycle",
+                extra={
+                    "extra_fields": {
+                        "interface": cfg.interface,
+                        "state": classification.state,
+                        "fail_ratio": round(classification.fail_ratio, 3),
+                        "consecutive_fails": classification.consecutive_fail_packets,
+                        "rssi": classification.rssi,
+                        "invoked_tier": invoked_tier,
+                        "fault": classification.fault,
+                    }
+                },
+            )
+            extra: Dict[str, Any] = {"invoked_tier": invoked_tier}
+            if snapshot.gateway is not None:
+                gw = snapshot.gateway
+                extra["gateway"] = {"address": gw.gateway, "reachable": gw.reachable, "arp": gw.arp_ok,
+                                    "icmp": gw.icmp_ok, "latency_ms": gw.latency_ms, "local_address": gw.address,
+                                    "lease_remaining_s": None if gw.lease_remaining_s is None
+                                    else round(gw.lease_remaining_s)}
+            if not snapshot.dns_result.interface_scoped:
+                # Answered by the system resolver, which may have used another route.
+                extra["dns_interface_scoped"] = False
+            if job is not None:
+                extra["recovering"] = {"tier": job.tier, "step": job.current_step, "since": job.started_ts}
+            write_status(cfg, classification, extra)
+            write_prometheus(cfg, classification)
+            append_action_history(
+                cfg,
+                {
+                    "event": "cycle",
+                    "interface": cfg.interface,
+                    "state": classification.state,
+                    "fail_ratio": round(classification.fail_ratio, 3),
+                    "invoked_tier": invoked_tier,
+                    "fault": classification.fault,
+                },
+            )
+        except Exception as e:  # pragma: no cover
+            logger.exception("cycle_error", extra={"extra_fields": {"interface": cfg.interface, "error": str(e)}})
+        self.last_cycle_monotonic = time.monotonic()
+        self.last_classification = classification
+        self._adapt(classification)
+        if cfg.snapshot.enabled and time.monotonic() - self._snapshot_saved >= cfg.snapshot.interval_seconds:
+            self.save_snapshot()
+        return classification
+
+    def _start_recovery(self, tier: EscalationTier) -> RecoveryJob:
+        """Run ``tier`` on the recovery thread; probing and status carry on meanwhile."""
+        loop = asyncio.get_running_loop()
+        job: RecoveryJob
+
+        def on_step(name: str, fields: Dict[str, Any]) -> None:  # recovery thread
+            loop.call_soon_threadsafe(self._on_recovery_step, job, name, fields)
+
+        job = self._job = RecoveryJob(tier.name, RecoveryControl(on_step), time.monotonic())
+        logger.info("tier_start", extra={"extra_fields": {"interface": self.cfg.interface, "tier": tier.name}})
+        self.escalator.before_reboot = None
+        if self.cfg.snapshot.enabled:
+            if tier.name == "reboot":
+                # Written by the recovery thread once the reboot is allowed, so it carries
+                # last_reboot_ts; the window and interval are taken here, on the loop.
+                pending = self._snapshot_data()
+                self.escalator.before_reboot = lambda: self.save_snapshot(
+                    {**pending, "written_ts": time.time(), "escalation": self.escalator.export_state()})
+            else:
+                self.save_snapshot()  # keep the advanced ladder
+        future = loop.run_in_executor(self._recovery, self.escalator.run_tier, tier, job.control)
+        future.add_done_callback(lambda f: self._finish_recovery(job, f))
+        return job
+
+    def _on_recovery_step(self, job: RecoveryJob, name: str, fields: Dict[str, Any]) -> None:
+        job.steps.append(name)
+        logger.info("tier_step", extra={"extra_fields": {
+            "interface": self.cfg.interface, "tier": job.tier, "step": name,
+            "elapsed_s": round(time.monotonic() - job.started, 3), **fields}})
+
+    def _finish_recovery(self, job: RecoveryJob, future: asyncio.Future) -> None:
+        if self._job is job:
+            self._job = None
+        if future.cancelled():
+            return  # shut down before the tier started
+        cfg = self.cfg
+        error = future.exception()
+        if error is not None:
+            logger.warning("tier_error", extra={"extra_fields": {
+                "interface": cfg.interface, "tier": job.tier, "error": str(error)}})
+        aborted = job.control.cancelled
+        success = error is None and bool(future.result())
+        # Recorded here rather than on the recovery thread: history, counters and metrics are loop-only.
+        self.escalator.record_invocation(job.tier, success)
+        record = {
+            "event": "tier_aborted" if aborted else "tier_done",
+            "interface": cfg.interface,
+            "tier": job.tier,
+            "success": success,
+            "duration_s": round(time.monotonic() - job.started, 3),
+            "steps": job.steps,
+        }
+        if aborted:
+            record["reason"] = job.control.reason
+        logger.info(record["event"], extra={"extra_fields": record})
+        append_action_history(cfg, record)
+        if cfg.verification.enabled:
+            self._start_verification(job.tier)
+
+    def _start_verification(self, tier: str) -> None:
+        if self._verification is not None:
+            self._verification.cancel()  # superseded by the newer tier
+        # Hold the ladder for the whole window so the next cycle cannot fire another tier mid-check.
+        self.escalator.hold(self.cfg.verification.window_seconds + self.cfg.timeouts.cycle_ms / 1000.0)
+        self._verification = asyncio.create_task(
+            self._verify(tier, self._incident_started or time.monotonic()), name=f"verify-{self.cfg.interface}"
+        )
+
+    async def _verify(self, tier: str, incident_started: float) -> None:
+        """Check whether ``tier`` fixed the link and record how long recovery took."""
+        cfg = self.cfg
+        tier_done = time.monotonic()
+        try:
+            result = await verify_recovery(cfg)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:  # pragma: no cover
+            logger.warning("verification_failed", extra={"extra_fields": {"interface": cfg.interface, "error": str(e)}})
+            self.escalator.hold(0)
+            return
+        ttr = None
+        if result.recovered and result.recovered_after_s is not None:
+            ttr = round(tier_done + result.recovered_after_s - incident_started, 3)
+        # Recovered or converging: give the health window time to catch up before escalating again.
+        self.escalator.hold(cfg.verification.holdoff_seconds if result.recovered or result.converging else 0)
+        record = {
+            "event": "tier_verify",
+            "interface": cfg.interface,
+            "tier": tier,
+            "recovered": result.recovered,
+            "converging": result.converging,
+            "rounds": result.rounds,
+            "good_rounds": result.good_rounds,
+            "targets": result.targets,
+            "tier_to_recover_s": result.recovered_after_s,
+            "time_to_recover_s": ttr,
+        }
+        logger.info("tier_verified", extra={"extra_fields": record})
+        record_recovery(tier, result.recovered, ttr, cfg.interface)
+        registry = self._registry()
+        if ttr is not None and registry is not None:
+            registry.record_recovery(cfg.interface, tier, ttr)
+        append_action_history(cfg, record)
+
+    def _adapt(self, classification: Optional[ClassificationResult]) -> None:
+        cfg = self.cfg
+        if cfg.adaptive.enabled and classification is not None:
+            self.current_interval, self.consecutive_healthy, backoff_event, reset_event = update_adaptive_interval(
+                cfg, classification.state, self.current_interval, self.consecutive_healthy
+            )
+            if backoff_event:
+                logger.info("interval_backoff", extra={"extra_fields": {"interface": cfg.interface, **backoff_event}})
+            if reset_event:
+                logger.info("interval_reset", extra={"extra_fields": {"interface": cfg.interface, **reset_event}})
+        else:
+            self.current_interval = cfg.check_interval_seconds
+
+    def _healthy_for_backoff(self) -> bool:
+        return self.consecutive_healthy >= self.cfg.adaptive.healthy_cycles_for_backoff
+
+    async def on_probe_result(self, kind: str, result) -> None:
+        """Fold one scheduled probe result into the latest snapshot."""
+        latest = self.latest
+        if latest is None:  # pragma: no cover - run() seeds it before scheduling
+            return
+        if kind == "ping":
+            if not any(r.success for r in result) and self._gateway_stale(latest.gateway):
+                # Fault localization needs a gateway verdict from this outage, not one from
+                # up to a backed-off gateway period ago: probe it now rather than misplace the fault.
+                latest.gateway = await probe_once(self.cfg, "gateway")
+            self.latest = latest = ConnectivitySnapshot(
+                ping_results=result, dns_result=latest.dns_result, http_result=latest.http_result, link=latest.link,
+                gateway=latest.gateway,
+            )
+            previous = self.last_classification
+            classification = await self.run_cycle(latest)
+            if self.scheduler is not None and classification is not None and (
+                classification.state != HealthState.HEALTHY
+                and (previous is None or previous.state == HealthState.HEALTHY)
+            ):
+                self.scheduler.reset()
+        elif kind == "link":
+            latest.link = result
+            self._reclassify_link(latest)
+        elif kind == "dns":
+            latest.dns_result = result
+        elif kind == "http":
+            latest.http_result = result
+        elif kind == "gateway":
+            latest.gateway = result
+
+    def _gateway_stale(self, gateway) -> bool:
+        """True if a gateway probe is enabled and ``gateway`` is missing or older than one ping period."""
+        cfg = self.cfg
+        if not cfg.gateway.enabled:
+            return False
+        if gateway is None:
+            return True
+        period = self.scheduler.periods.get("ping") if self.scheduler is not None else None
+        period = (period or cfg.cadence.ping.period_seconds) * (1 + cfg.cadence.ping.jitter)
+        return gateway.age() > period
+
+    def _reclassify_link(self, snapshot: ConnectivitySnapshot) -> None:
+        """Re-evaluate signal thresholds between ping rounds without touching the window."""
+        previous = self.last_classification
+        if previous is None:
+            return
+        classification = classify(self.cfg, snapshot, self.window, record=False)
+        if classification.state == previous.state:
+            return
+        logger.info(
+            "link_state_change",
+            extra={"extra_fields": {"interface": self.cfg.interface, "from": previous.state,
+                                    "to": classification.state, "rssi": classification.rssi}},
+        )
+        self.last_classification = classification
+        write_status(self.cfg, classification, {"invoked_tier": None})
+        if classification.state != HealthState.HEALTHY and self.scheduler is not None:
+            self.scheduler.reset(immediate=True)
+
+    def notify_event(self, event: LinkEvent) -> None:
+        """Queue a link event; the run loop probes right away instead of waiting out the interval."""
+        logger.info(
+            "link_event",
+            extra={"extra_fields": {"interface": event.interface, "source": event.source, "kind": event.kind,
+                                    "detail": event.detail}},
+        )
+        self._events.append(event)
+        self._event_wake.set()
+
+    async def _wait(self, stop: asyncio.Event, timeout: Optional[float]) -> bool:
+        """Sleep up to ``timeout``; True if a link event (not stop or the timeout) ended it."""
+        if not self._event_wake.is_set():
+            waiters = [asyncio.ensure_future(stop.wait()), asyncio.ensure_future(self._event_wake.wait())]
+            try:
+                await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for w in waiters:
+                    w.cancel()
+        return self._event_wake.is_set() and not stop.is_set()
+
+    async def _absorb_events(self, stop: asyncio.Event) -> None:
+        """Debounce a burst of events, honour the minimum gap, then reset the cadence."""
+        ev = self.cfg.events
+        settle = max(ev.debounce_ms / 1000.0, ev.min_gap_seconds - (time.monotonic() - self._last_cycle_start))
+        if settle > 0:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=settle)
+            except asyncio.TimeoutError:
+                pass
+        self._event_wake.clear()
+        kinds = sorted({e.kind for e in self._events})
+        self._events.clear()
+        if self.current_interval != self.cfg.check_interval_seconds:
+            logger.info("interval_reset", extra={"extra_fields": {
+                "interface": self.cfg.interface, "old": self.current_interval,
+                "reset_to": self.cfg.check_interval_seconds, "events": kinds}})
+        self.current_interval = self.cfg.check_interval_seconds
+        self.consecutive_healthy = 0
+        if self.scheduler is not None:
+            self.scheduler.reset(immediate=True)
+
+    async def _event_loop(self, stop: asyncio.Event) -> None:
+        while not stop.is_set():
+            if await self._wait(stop, None):
+                await self._absorb_events(stop)
+
+    async def run(self, stop: asyncio.Event) -> None:
+        try:
+            await self._run(stop)
+        finally:
+            await self.stop_verification()  # while the loop still runs, before close()
+
+    async def _run(self, stop: asyncio.Event) -> None:
+        if self.cfg.cadence.enabled:
+            await self.run_cycle()
+            self.scheduler = ProbeScheduler(self.cfg, self.on_probe_result, self._healthy_for_backoff)
+            events = asyncio.create_task(self._event_loop(stop), name=f"events-{self.cfg.interface}")
+            try:
+                await self.scheduler.run(stop, start_immediately=False)
+            finally:
+                events.cancel()
+            return
+        while not stop.is_set():
+            start = time.monotonic()
+            await self.run_cycle()
+            elapsed = time.monotonic() - start
+            interval = self.current_interval
+            jitter = random.uniform(-0.1 * interval, 0.1 * interval)
+            delay = max(0.5, interval - elapsed + jitter)
+            if await self._wait(stop, delay):
+                await self._absorb_events(stop)
+
+
+class Supervisor:
+    """Run one :class:`InterfaceMonitor` per config on a single event loop."""
+
+    def __init__(self, cfgs: List[Config]) -> None:
+        if not cfgs:
+            raise ValueError("Supervisor needs at least one interface config")
+        self.monitors = [InterfaceMonitor(c) for c in cfgs]
+        self._by_interface = {m.cfg.interface: m for m in self.monitors}
+        self.stop = asyncio.Event()
+
+    def reload(self, cfg: Config) -> Dict[str, List[str]]:
+        """Apply an already validated top-level config to the running monitors.
+
+        Returns the applied and the restart-only settings that changed, per interface.
+        Interfaces added to or removed from the config also wait for a restart.
+        """
+        new = {c.interface: c for c in interface_configs(cfg)}
+        result: Dict[str, List[str]] = {"applied": [], "needs_restart": []}
+        if set(new) != set(self._by_interface):
+            result["needs_restart"].append("interfaces")
+        for name, monitor in self._by_interface.items():
+            if name not in new:
+                continue
+            applied, pending = monitor.apply_config(new[name])
+            prefix = f"{name}:" if len(self.monitors) > 1 else ""
+            result["applied"] += [prefix + c for c in applied]
+            result["needs_restart"] += [prefix + c for c in pending]
+        return result
+
+    def _liveness_budget(self, monitor: InterfaceMonitor) -> float:
+        c = monitor.cfg
+        if c.cadence.enabled:
+            ping = c.cadence.ping
+            return 2 * max(ping.period_seconds, ping.max_period_seconds) + c.timeouts.cycle_ms / 1000.0
+        return 2 * max(c.adaptive.max_interval_seconds, c.check_interval_seconds) + c.timeouts.cycle_ms / 1000.0
+
+    async def _watchdog_kicker(self) -> None:
+        """Kick the systemd watchdog only while every monitor keeps cycling."""
+        period = max(1.0, min(m.cfg.check_interval_seconds for m in self.monitors) / 2)
+        while not self.stop.is_set():
+            now = time.monotonic()
+            stalled = [m.cfg.interface for m in self.monitors if now - m.last_cycle_monotonic > self._liveness_budget(m)]
+            if stalled:
+                logger.warning("monitor_stalled", extra={"extra_fields": {"interfaces": stalled}})
+            else:
+                sd_notify("WATCHDOG=1")
+            try:
+                await asyncio.wait_for(self.stop.wait(), timeout=period)
+            except asyncio.TimeoutError:
+                pass
+
+    def _dispatch(self, event: LinkEvent) -> None:
+        monitor = self._by_interface.get(event.interface)
+        if monitor is not None and monitor.cfg.events.rtnetlink:
+            monitor.notify_event(event)
+
+    def _start_event_sources(self) -> Tuple[Optional[RtnetlinkListener], List[WpaEventListener]]:
+        if not any(m.cfg.events.rtnetlink or m.cfg.events.wpa_supplicant for m in self.monitors):
+            return None, []
+        from .events import RtnetlinkListener, WpaEventListener
+
+        rtnl = None
+        if any(m.cfg.events.rtnetlink for m in self.monitors):
+            rtnl = RtnetlinkListener(self._dispatch)
+            try:
+                rtnl.start()
+            except OSError as e:
+                logger.warning("rtnetlink_unavailable", extra={"extra_fields": {"error": str(e)}})
+                rtnl = None
+        wpa = [
+            WpaEventListener(m.cfg.interface, m.cfg.events.wpa_ctrl_dir, m.notify_event,
+                             ping_seconds=m.cfg.events.wpa_ping_seconds,
+                             pong_timeout=m.cfg.events.wpa_pong_timeout_ms / 1000.0)
+            for m in self.monitors if m.cfg.events.wpa_supplicant
+        ]
+        return rtnl, wpa
+
+    async def run(self) -> None:
+        for m in self.monitors:
+            Path(m.cfg.paths.state_dir).mkdir(parents=True, exist_ok=True)
+        # Send READY=1 to systemd if Type=notify is used (always safe; ignored when not under systemd).
+        sd_notify("READY=1")
+        listen = self.monitors[0].cfg.features.metrics_listen
+        server: Optional[MetricsServer] = None
+        if listen:
+            from .exporter import MetricsServer
+
+            server = MetricsServer(listen)
+            try:
+                await server.start()
+            except OSError as e:
+                logger.warning("metrics_listen_failed", extra={"extra_fields": {"listen": listen, "error": str(e)}})
+                server = None
+        tasks = [asyncio.create_task(m.run(self.stop), name=f"monitor-{m.cfg.interface}") for m in self.monitors]
+        rtnl, wpa = self._start_event_sources()
+        tasks.extend(asyncio.create_task(w.run(self.stop), name=f"wpa-events-{w.interface}") for w in wpa)
+        if any(m.cfg.features.systemd_watchdog for m in self.monitors):
+            tasks.append(asyncio.create_task(self._watchdog_kicker(), name="watchdog-kicker"))
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            if rtnl is not None:
+                rtnl.close()
+            for w in wpa:
+                w.close()
+            if server is not None:
+                await server.close()
+            for m in self.monitors:
+                m.close()
+            close_action_history()
+
+
+__all__ = ["InterfaceMonitor", "Supervisor", "sd_notify", "update_adaptive_interval"]
@@ -4,63 +4,48 @@ import logging
 import shutil
 import time
 from pathlib import Path
-from typing import Optional
 
 from .command_runner import run_command
 from .config import Config
+from .usb_topology import USB_INDEX, UsbDevice
 
 logger = logging.getLogger(__name__)
 
 
-def strategy_usbreset(cfg: Config, vendor_prod: str) -> bool:
+def strategy_usbreset(cfg: Config, device: UsbDevice) -> bool:
     tool = shutil.which("usbreset")
     if not tool:
         return False
-    ls_out = run_command(cfg, ["lsusb"]).stdout
-    path = None
-    for line in ls_out.splitlines():
-        if vendor_prod in line.lower():
-            parts = line.split()
-            if len(parts) >= 6:
-                bus = parts[1]
-                dev = parts[3].rstrip(':')
-                path = f"/dev/bus/usb/{bus}/{dev}"
-                break
-    if not path:
-        return False
-    rc = run_command(cfg, [tool, path]).returncode
+    rc = run_command(cfg, [tool, device.dev_path]).returncode
     return rc == 0
 
 
-def strategy_unbind_rebind(vendor_prod: str) -> bool:
-    try:
-        vid, pid = vendor_prod.split(":", 1)
-    except ValueError:
+def strategy_unbind_rebind(device: UsbDevice) -> bool:
+    unbind = Path("/sys/bus/usb/drivers/usb/unbind")
+    bind = Path("/sys/bus/usb/drivers/usb/bind")
+    if not (unbind.exists() and bind.exists()):
         return False
-    sysfs_devices = Path("/sys/bus/usb/devices")
-    for child in sysfs_devices.iterdir():
-        prod_id_file = child / "idProduct"
-        vend_id_file = child / "idVendor"
-        if prod_id_file.exists() and vend_id_file.exists():
-            try:
-                if prod_id_file.read_text().strip().lower() == pid and vend_id_file.read_text().strip().lower() == vid:
-                    unbind = Path("/sys/bus/usb/drivers/usb/unbind")
-                    bind = Path("/sys/bus/usb/drivers/usb/bind")
-                    dev = child.name
-                    if unbind.exists() and bind.exists():
-                        unbind.write_text(dev)
-                        time.sleep(1)
-                        bind.write_text(dev)
-                        return True
-            except Exception as e:  # pragma: no cover
-                logger.warning("usb_unbind_error", extra={"extra_fields": {"error": str(e)}})
+    try:
+        unbind.write_text(device.name)
+        time.sleep(1)
+        bind.write_text(device.name)
+        return True
+    except Exception as e:  # pragma: no cover
+        logger.warning("usb_unbind_error", extra={"extra_fields": {"error": str(e)}})
     return False
 
 
-def reset_usb(cfg: Config, vendor_prod: str) -> bool:
-    vendor_prod = vendor_prod.lower()
-    if strategy_usbreset(cfg, vendor_prod):
+def reset_device(cfg: Config, device: UsbDevice) -> bool:
+    if strategy_usbreset(cfg, device):
         return True
-    return strategy_unbind_rebind(vendor_prod)
+    return strategy_unbind_rebind(device)
+
+
+def reset_usb(cfg: Config, vendor_prod: str) -> bool:
+    devices = USB_INDEX.lookup(vendor_prod)
+    if not devices:
+        logger.warning("usb_device_not_found", extra={"extra_fields": {"device_id": vendor_prod}})
+        return False
+    return reset_device(cfg, devices[0])
 
-__all__ = ["reset_usb"]
\ No newline at end of file
+__all__ = ["reset_device", "reset_usb"]
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SYSFS_USB_DEVICES = "/sys/bus/usb/devices"
+SYSFS_NET = "/sys/class/net"
+NETLINK_KOBJECT_UEVENT = 15
+_KERNEL_UEVENTS = 1  # multicast group of raw kernel uevents (udev rebroadcasts on 2)
+
+
+@dataclass(slots=True)
+class UsbDevice:
+    name: str  # sysfs name, e.g. 1-1.3
+    vendor_product: str  # e.g. 0bda:b812
+    busnum: int
+    devnum: int
+    parent: str  # sysfs name of the hub it hangs off, e.g. 1-1 or usb1
+    port: Optional[int]  # port on ``parent``; None for root hubs
+
+    @property
+    def dev_path(self) -> str:
+        return f"/dev/bus/usb/{self.busnum:03d}/{self.devnum:03d}"
+
+    @property
+    def hub_location(self) -> str:
+        """``parent`` as uhubctl's ``-l`` expects it (root hub ``usb1`` is ``1``)."""
+        return self.parent[3:] if self.parent.startswith("usb") else self.parent
+
+
+def _read(path: Path) -> Optional[str]:
+    try:
+        return path.read_text().strip().lower()
+    except OSError:
+        return None
+
+
+def _parent_and_port(name: str) -> tuple[str, Optional[int]]:
+    if name.startswith("usb"):
+        return name, None
+    bus, _, ports = name.partition("-")
+    head, _, last = ports.rpartition(".")
+    parent = f"{bus}-{head}" if head else f"usb{bus}"
+    return parent, int(last) if last.isdigit() else None
+
+
+def scan_usb_devices(root: str = SYSFS_USB_DEVICES) -> List[UsbDevice]:
+    """Read every USB device (not interface) under ``root``; six small sysfs reads each."""
+    devices = []
+    try:
+        entries = sorted(os.listdir(root))
+    except OSError:
+        return devices
+    for name in entries:
+        if ":" in name:
+            continue  # an interface of a device, e.g. 1-1.3:1.0
+        base = Path(root) / name
+        vid, pid = _read(base / "idVendor"), _read(base / "idProduct")
+        busnum, devnum = _read(base / "busnum"), _read(base / "devnum")
+        if not (vid and pid and busnum and devnum):
+            continue
+        parent, port = _parent_and_port(name)
+        try:
+            devices.append(UsbDevice(name, f"{vid}:{pid}", int(busnum), int(devnum), parent, port))
+        except ValueError:
+            continue
+    return devices
+
+
+class UsbIndex:
+    """In-memory map of USB devices, rebuilt only after the kernel reports a USB change.
+
+    A non-blocking kobject-uevent netlink socket is drained on every lookup; a
+    ``SUBSYSTEM=usb`` message marks the index stale. Without the socket (no
+    permission, not Linux) every lookup rescans sysfs, as the old code did.
+    Lookups come from the per-interface recovery threads, hence the lock.
+    """
+
+    def __init__(self, root: str = SYSFS_USB_DEVICES, net_root: str = SYSFS_NET, listen: bool = True) -> None:
+        self.root = root
+        self.net_root = net_root
+        self._listen = listen
+        self._sock: Optional[socket.socket] = None
+        self._stale = True
+        self._by_name: Dict[str, UsbDevice] = {}
+        self._by_id: Dict[str, List[UsbDevice]] = {}
+        self._lock = threading.Lock()
+        self.scans = 0
+
+    def _open(self) -> None:
+        self._listen = False  # one attempt
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+        except (OSError, AttributeError) as e:
+            logger.info("uevent_unavailable", extra={"extra_fields": {"error": str(e)}})
+            return
+        try:
+            sock.bind((0, _KERNEL_UEVENTS))
+            sock.setblocking(False)
+        except OSError as e:
+            sock.close()
+            logger.info("uevent_unavailable", extra={"extra_fields": {"error": str(e)}})
+            return
+        self._sock = sock
+
+    def _drain(self) -> None:
+        while self._sock is not None:
+            try:
+                message = self._sock.recv(16384)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:  # ENOBUFS: events were lost, so assume the worst
+                self._stale = True
+                return
+            if b"\0SUBSYSTEM=usb\0" in message:
+                self._stale = True
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._stale = True
+
+    def _refresh(self) -> None:
+        if self._listen:
+            self._open()  # before the scan, so no change can slip in between
+        self._drain()
+        if not self._stale and self._sock is not None:
+            return
+        devices = scan_usb_devices(self.root)
+        self._by_name = {d.name: d for d in devices}
+        self._by_id = {}
+        for d in devices:
+            self._by_id.setdefault(d.vendor_product, []).append(d)
+        self._stale = False
+        self.scans += 1
+
+    def lookup(self, vendor_product: str) -> List[UsbDevice]:
+        """Devices with ``vendor_product`` (``vvvv:pppp``), in sysfs name order."""
+        with self._lock:
+            self._refresh()
+            return list(self._by_id.get(vendor_product.lower(), ()))
+
+    def get(self, name: str) -> Optional[UsbDevice]:
+        with self._lock:
+            self._refresh()
+            return self._by_name.get(name)
+
+    def for_interface(self, interface: str) -> Optional[UsbDevice]:
+        """The USB device behind a network interface, or None if it is not USB-attached."""
+        try:
+            # .../1-1.3/1-1.3:1.0 -> the device is the interface's name without the :config.iface suffix
+            target = os.path.basename(os.path.realpath(os.path.join(self.net_root, interface, "device")))
+        except OSError:
+            return None
+        if ":" not in target:
+            return None
+        return self.get(target.split(":", 1)[0])
+
+    def close(self) -> None:
+        with self._lock:
+            if self._sock is not None:
+                self._sock.close()
+                self._sock = None
+
+
+USB_INDEX = UsbIndex()
+
+__all__ = ["UsbDevice", "UsbIndex", "USB_INDEX", "scan_usb_devices"]
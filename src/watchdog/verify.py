@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from .config import Config, IcmpSettings
+from .connectivity import ping_hosts_async, read_default_gateway
+
+
+@dataclass(slots=True)
+class VerificationResult:
+    recovered: bool
+    converging: bool  # some targets answered, but not for required_successes rounds in a row
+    rounds: int
+    good_rounds: int
+    recovered_after_s: Optional[float]  # tier end -> first round of the final good streak
+    targets: List[str] = field(default_factory=list)
+
+
+def verification_targets(cfg: Config) -> List[str]:
+    """The interface's default gateway (LAN side) plus one reference host (upstream)."""
+    targets = []
+    gateway = read_default_gateway(cfg.interface)
+    if gateway:
+        targets.append(gateway)
+    reference = cfg.verification.reference or (cfg.hosts.ping[0] if cfg.hosts.ping else None)
+    if reference and reference not in targets:
+        targets.append(reference)
+    return targets
+
+
+async def verify_recovery(cfg: Config, clock=time.monotonic) -> VerificationResult:
+    """Probe the gateway and reference target at a high rate for a bounded window.
+
+    Stops early once every target has answered ``required_successes`` rounds
+    in a row. One echo per target per round keeps the burst cheap. Targets are
+    resolved again every round: a tier such as refresh_dhcp can bring back a
+    different (or, until the lease arrives, no) default gateway.
+    """
+    v = cfg.verification
+    targets: List[str] = []
+    icmp = IcmpSettings(backend=cfg.icmp.backend, count=1, interval_ms=0, bind_interface=cfg.icmp.bind_interface)
+    start = clock()
+    deadline = start + v.window_seconds
+    rounds = good = streak = 0
+    streak_start: Optional[float] = None
+    any_reply = False
+    while clock() < deadline:
+        round_start = clock()
+        current = verification_targets(cfg)
+        if current != targets:
+            targets, streak = current, 0  # a streak only counts against one set of targets
+        if not targets:
+            await asyncio.sleep(v.interval_ms / 1000.0)  # no gateway yet and no reference host
+            continue
+        results = await ping_hosts_async(targets, v.probe_timeout_ms, icmp, cfg.interface)
+        rounds += 1
+        replies = sum(1 for r in results if r.success)
+        any_reply = any_reply or replies > 0
+        if replies == len(targets):
+            good += 1
+            if streak == 0:
+                streak_start = round_start
+            streak += 1
+            if streak >= v.required_successes:
+                return VerificationResult(True, False, rounds, good, round(streak_start - start, 3), targets)
+        else:
+            streak = 0
+        pause = round_start + v.interval_ms / 1000.0 - clock()
+        if pause > 0:
+            await asyncio.sleep(pause)
+    return VerificationResult(False, any_reply, rounds, good, None, targets)
+
+
+__all__ = ["VerificationResult", "verification_targets", "verify_recovery"]
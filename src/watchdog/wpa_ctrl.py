@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import itertools
+import os
+import socket
+import tempfile
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional, Tuple
+
+DEFAULT_CTRL_DIR = "/var/run/wpa_supplicant"
+_counter = itertools.count()
+
+
+def parse_event(message: str) -> Tuple[Optional[int], str]:
+    """Split an unsolicited ``<level>TEXT`` message into (level, text)."""
+    if message.startswith("<"):
+        end = message.find(">")
+        if end > 0 and message[1:end].isdigit():
+            return int(message[1:end]), message[end + 1:]
+    return None, message
+
+
+class WpaCtrl:
+    """Client for the wpa_supplicant control interface (a unix datagram socket).
+
+    Each client binds its own socket so replies and, after :meth:`attach`,
+    unsolicited ``<level>CTRL-EVENT-...`` messages come back to it.
+    """
+
+    def __init__(self, interface: str, ctrl_dir: str = DEFAULT_CTRL_DIR, timeout: float = 2.0) -> None:
+        self.path = os.path.join(ctrl_dir, interface)
+        self.timeout = timeout
+        self.local_path = os.path.join(
+            tempfile.gettempdir(), f"wifi-watchdog-wpa-{os.getpid()}-{next(_counter)}"
+        )
+        self._sock: Optional[socket.socket] = None
+        self._pending: Deque[str] = deque(maxlen=64)  # events that arrived while awaiting a reply
+
+    def open(self) -> "WpaCtrl":
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            if os.path.exists(self.local_path):
+                os.unlink(self.local_path)
+            sock.bind(self.local_path)
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            self._unlink()
+            raise
+        self._sock = sock
+        return self
+
+    def __enter__(self) -> "WpaCtrl":
+        return self.open() if self._sock is None else self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def fileno(self) -> int:
+        if self._sock is None:
+            raise OSError("control socket not open")
+        return self._sock.fileno()
+
+    def _unlink(self) -> None:
+        try:
+            os.unlink(self.local_path)
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        self._unlink()
+
+    def send(self, command: str) -> None:
+        """Send ``command`` without waiting; its reply arrives through :meth:`recv_event`."""
+        if self._sock is None:
+            raise OSError("control socket not open")
+        self._sock.send(command.encode())
+
+    def request(self, command: str, timeout: Optional[float] = None) -> str:
+        """Send ``command`` and return its reply; interleaved events are kept for :meth:`recv_event`."""
+        sock = self._sock
+        if sock is None:
+            raise OSError("control socket not open")
+        sock.send(command.encode())
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"wpa_supplicant did not answer {command.split()[0]}")
+            sock.settimeout(remaining)
+            reply = sock.recv(8192).decode(errors="replace")
+            if parse_event(reply)[0] is None:
+                return reply.rstrip("\n")
+            self._pending.append(reply.rstrip("\n"))
+
+    def drain(self) -> int:
+        """Discard every event received so far, queued or still in the socket; returns how many.
+
+        Call it right before a command whose outcome is awaited with
+        :meth:`wait_event`, so only events that follow the command count.
+        """
+        dropped = len(self._pending)
+        self._pending.clear()
+        sock = self._sock
+        if sock is None:
+            return dropped
+        sock.setblocking(False)
+        try:
+            while True:
+                sock.recv(8192)
+                dropped += 1
+        except (BlockingIOError, InterruptedError):
+            pass
+        finally:
+            sock.settimeout(self.timeout)
+        return dropped
+
+    def attach(self) -> None:
+        if self.request("ATTACH") != "OK":
+            raise OSError("wpa_supplicant refused ATTACH")
+
+    def status(self) -> Dict[str, str]:
+        """``STATUS`` as a dict (``wpa_state``, ``bssid``, ``ssid``, ...)."""
+        out = {}
+        for line in self.request("STATUS").splitlines():
+            key, sep, value = line.partition("=")
+            if sep:
+                out[key] = value
+        return out
+
+    def recv_event(self, timeout: float = 0.0) -> Optional[str]:
+        """Next unsolicited message (after :meth:`attach`), waiting up to ``timeout``; None if none."""
+        if self._pending:
+            return self._pending.popleft()
+        if self._sock is None:
+            return None
+        try:
+            self._sock.settimeout(timeout)
+            return self._sock.recv(8192).decode(errors="replace").rstrip("\n")
+        except (BlockingIOError, InterruptedError, TimeoutError):
+            return None
+
+    def wait_event(self, names: Iterable[str], timeout: float) -> Optional[str]:
+        """Block until an event whose name is in ``names`` arrives; return its text, or None at the deadline."""
+        wanted = set(names)
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 and not self._pending:
+                return None
+            message = self.recv_event(max(remaining, 0.0))
+            if message is None:
+                continue
+            text = parse_event(message)[1]
+            if text.partition(" ")[0] in wanted:
+                return text
+
+
+__all__ = ["DEFAULT_CTRL_DIR", "WpaCtrl", "parse_event"]
@@ -1,4 +1,5 @@
 import json
+import time
 from pathlib import Path
 
 from watchdog.config import Config
@@ -39,4 +40,64 @@ def test_action_history_write(tmp_path, monkeypatch):
     lines = hist_file.read_text().strip().splitlines()
     assert len(lines) == 2
     rec = json.loads(lines[0])
-    assert rec["event"] == "test"
\ No newline at end of file
+    assert rec["event"] == "test"
+
+def test_history_batches_cycles_and_rotates(tmp_path):
+    from watchdog.config import HistorySettings
+    from watchdog.history import HistoryWriter
+
+    path = tmp_path / "history.log"
+    writer = HistoryWriter(path, HistorySettings(flush_records=3, flush_interval_seconds=3600, max_bytes=200, keep=2))
+    writer.append({"event": "cycle", "n": 1})
+    writer.append({"event": "cycle", "n": 2})
+    assert not path.exists() or path.read_text() == ""  # still buffered
+    writer.append({"event": "tier_invoke", "tier": "refresh_dhcp"}, important=True)
+    assert len(path.read_text().splitlines()) == 3
+    for n in range(40):
+        writer.append({"event": "cycle", "n": n})
+    writer.close()
+    assert (tmp_path / "history.log.1.gz").exists()
+    assert (tmp_path / "history.log.2.gz").exists()
+    assert not (tmp_path / "history.log.3.gz").exists()
+
+
+def test_history_age_counts_from_the_first_record_not_the_mtime(tmp_path):
+    from watchdog.config import HistorySettings
+    from watchdog.history import HistoryWriter
+
+    path = tmp_path / "history.log"
+    path.write_text(json.dumps({"ts": time.time() - 7200, "event": "cycle"}) + "\n")  # mtime is now
+    writer = HistoryWriter(path, HistorySettings(flush_records=1, max_bytes=0, max_age_seconds=3600, compress=False))
+    writer.append({"ts": time.time(), "event": "cycle"})
+    assert (tmp_path / "history.log.1").exists() and not path.exists()
+    writer.append({"ts": time.time(), "event": "cycle"})
+    writer.close()
+    assert len(path.read_text().splitlines()) == 1  # a fresh file: not rotated again
+
+
+def test_history_gzip_runs_off_the_calling_thread(tmp_path, monkeypatch):
+    import threading
+
+    from watchdog.config import HistorySettings
+    from watchdog.history import HistoryWriter
+
+    release = threading.Event()
+    compressing = []
+    original = HistoryWriter._compress
+
+    def slow_compress(self, src, target):
+        compressing.append(threading.current_thread().name)
+        release.wait(5)
+        original(self, src, target)
+
+    monkeypatch.setattr(HistoryWriter, "_compress", slow_compress)
+    path = tmp_path / "history.log"
+    writer = HistoryWriter(path, HistorySettings(flush_records=1, max_bytes=10))
+    start = time.monotonic()
+    writer.append({"event": "cycle", "n": 1})  # over max_bytes: rotates
+    assert time.monotonic() - start < 1.0
+    assert (tmp_path / "history.log.1").exists()
+    release.set()
+    writer.close()
+    assert compressing == ["history-gzip"]
+    assert (tmp_path / "history.log.1.gz").exists() and not (tmp_path / "history.log.1").exists()
@@ -0,0 +1,32 @@
+import json
+from pathlib import Path
+
+from watchdog import bench
+
+
+def test_bench_writes_json_and_flags_regressions(tmp_path, capsys):
+    out = tmp_path / "bench.json"
+    argv = ["--cycles", "5", "--loss", "0.5", "--history-size", "500", "--iterations", "200",
+            "--startup-runs", "1", "--output", str(out)]
+    assert bench.main(argv) == 0
+    results = json.loads(out.read_text())
+    assert results["cycle"]["cycles"] == 5
+    assert results["cycle"]["spawns_per_cycle"] == 0  # dry-run recovery never forks
+    assert results["classify"]["ops_per_sec"] > 0
+    assert results["peak_rss_kb"] > 0
+    cold, cached = results["startup"]["cold"], results["startup"]["cached"]
+    assert cold["yaml_imported"] and not cached["yaml_imported"]  # a cache hit never imports or runs the parser
+    assert cold["time_to_first_cycle_ms"] > cold["imports_ms"] + cold["first_cycle_ms"]
+
+    slower = json.loads(out.read_text())
+    slower["cycle"]["p95_ms"] = results["cycle"]["p95_ms"] * 2
+    assert bench.compare(slower, results, 0.2) == [
+        f"cycle.p95_ms: {results['cycle']['p95_ms']} -> {slower['cycle']['p95_ms']} (+100.0%)"
+    ]
+    assert bench.compare(results, results, 0.2) == []
+
+
+def test_default_config_import_leaves_optional_subsystems_unloaded():
+    config = Path(__file__).resolve().parent.parent / "config" / "watchdog.yml"
+    report = bench.import_profile(str(config))
+    assert report["deferred_imported"] == []
@@ -0,0 +1,35 @@
+import time
+
+from watchdog.command_runner import run_command, run_commands
+from watchdog.config import Config
+
+CFG = Config.from_dict({"features": {"dry_run": False}})
+
+
+def test_commands_run_concurrently_with_per_command_results():
+    t0 = time.monotonic()
+    results = run_commands(CFG, [["sh", "-c", "sleep 0.3; echo one"],
+                                 ["sh", "-c", "sleep 0.3; echo two >&2; exit 3"],
+                                 ["/nonexistent/tool"]])
+    elapsed = time.monotonic() - t0
+    assert elapsed < 0.55  # the slowest command, not the sum
+    one, two, missing = results
+    assert (one.returncode, one.stdout) == (0, "one\n")
+    assert (two.returncode, two.stderr) == (3, "two\n")
+    assert 0.25 < one.duration_s < 0.5
+    assert missing.returncode == 127
+
+
+def test_output_is_capped_and_timeout_kills_the_process_group():
+    chatty = run_command(CFG, ["sh", "-c", "head -c 1000000 /dev/zero"])
+    assert chatty.returncode == 0 and chatty.truncated and len(chatty.stdout) == 64 * 1024
+    t0 = time.monotonic()
+    hung, = run_commands(CFG, [["sh", "-c", "sleep 30 & sleep 30"]], timeout=10, deadline=0.3)
+    assert time.monotonic() - t0 < 1.0  # the backgrounded sleep holding stdout was killed too
+    assert hung.timed_out and hung.returncode == 124
+
+
+def test_dry_run_executes_nothing():
+    cfg = Config.from_dict({"features": {"dry_run": True}})
+    results = run_commands(cfg, [["false"], ["/nonexistent/tool"]])
+    assert [r.returncode for r in results] == [0, 0]
@@ -1,4 +1,4 @@
-from watchdog.config import load_config, Config
+from watchdog.config import load_config, config_cache_file, Config
 
 
 def test_load_defaults(tmp_path):
@@ -9,3 +9,26 @@ def test_load_defaults(tmp_path):
     assert cfg.interface == "wlan0"
     assert cfg.thresholds.degraded_fail_ratio == 0.3
     assert len(cfg.escalation.tiers) == 1
+    assert cfg.escalation.tiers[0].parallel is False  # service restarts stay ordered unless opted in
+
+
+def test_config_cache_skips_yaml_until_the_file_changes(tmp_path, monkeypatch):
+    import yaml
+
+    cfg_file = tmp_path / "cfg.yml"
+    cfg_file.write_text("interfaces: [wlan0, wlan1]\nescalation:\n  tiers:\n    - name: refresh_dhcp\n")
+    cache = tmp_path / "cache"
+    first = load_config(cfg_file, cache)
+    assert config_cache_file(cfg_file, cache).exists()
+
+    def no_yaml(*a, **k):
+        raise AssertionError("YAML parsed despite a valid cache")
+
+    monkeypatch.setattr(yaml, "safe_load", no_yaml)
+    cached = load_config(cfg_file, cache)
+    assert cached == first and cached is not first
+    assert [c.interface for c in cached.interfaces] == ["wlan0", "wlan1"]
+
+    monkeypatch.undo()
+    cfg_file.write_text("interface: wlan2\nescalation:\n  tiers:\n    - name: refresh_dhcp\n")
+    assert load_config(cfg_file, cache).interface == "wlan2"
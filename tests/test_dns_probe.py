@@ -0,0 +1,52 @@
+import asyncio
+import struct
+
+from watchdog.dns_probe import build_query, parse_response, probe_resolvers, read_resolv_conf
+
+
+class _Responder(asyncio.DatagramProtocol):
+    def __init__(self, rcode=0, answers=1, silent=False):
+        self.rcode, self.answers, self.silent = rcode, answers, silent
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if self.silent:
+            return
+        qid, _flags = struct.unpack_from("!HH", data)
+        flags = 0x8000 | 0x0100 | 0x0080 | self.rcode
+        self.transport.sendto(struct.pack("!HHHHHH", qid, flags, 1, self.answers, 0, 0) + data[12:], addr)
+
+
+def test_query_roundtrip():
+    q = build_query("example.com", 0x4242)
+    assert q[12:] == b"\x07example\x03com\x00\x00\x01\x00\x01"
+    reply = struct.pack("!HHHHHH", 0x4242, 0x8183, 1, 0, 0, 0) + q[12:]
+    assert parse_response(reply, 0x4242) == (3, 0, False)
+
+
+def test_resolvers_report_individually(tmp_path):
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        ok_t, _ = await loop.create_datagram_endpoint(lambda: _Responder(), local_addr=("127.0.0.1", 0))
+        nx_t, _ = await loop.create_datagram_endpoint(lambda: _Responder(rcode=3, answers=0), local_addr=("127.0.0.2", 0))
+        dead_t, _ = await loop.create_datagram_endpoint(lambda: _Responder(silent=True), local_addr=("127.0.0.3", 0))
+        try:
+            results = []
+            for t in (ok_t, nx_t, dead_t):
+                host, port = t.get_extra_info("sockname")
+                results += await probe_resolvers("example.com", [host], timeout_ms=200, port=port)
+            return results
+        finally:
+            for t in (ok_t, nx_t, dead_t):
+                t.close()
+
+    ok, nx, dead = asyncio.run(scenario())
+    assert ok.success and ok.rcode == "NOERROR" and ok.latency_ms is not None
+    assert not nx.success and nx.rcode == "NXDOMAIN"
+    assert not dead.success and dead.error == "timeout"
+
+    conf = tmp_path / "resolv.conf"
+    conf.write_text("# comment\nnameserver 10.0.0.1\nsearch lan\nnameserver fe80::1%wlan0\n")
+    assert read_resolv_conf(str(conf)) == ["10.0.0.1", "fe80::1%wlan0"]
@@ -0,0 +1,202 @@
+import asyncio
+import socket
+import struct
+import time
+
+from watchdog import supervisor
+from watchdog.config import Config
+from watchdog.connectivity import ConnectivitySnapshot, DnsResult, LinkMetrics, PingResult
+from watchdog.events import (IFF_LOWER_UP, IFF_RUNNING, IFF_UP, RTM_NEWLINK, LinkEvent, RtnetlinkListener,
+                             WpaEventListener, parse_rtnetlink)
+from watchdog.nl80211 import nla
+
+
+def _newlink(index, flags, name):
+    body = struct.pack("=BxHiII", 0, 1, index, flags, 0xFFFFFFFF) + nla(3, name.encode() + b"\0")
+    return struct.pack("=IHHII", 16 + len(body), RTM_NEWLINK, 0, 0, 0) + body
+
+
+def test_rtnetlink_reports_only_carrier_changes():
+    carrier = {}
+    up = IFF_UP | IFF_RUNNING | IFF_LOWER_UP
+    assert parse_rtnetlink(_newlink(7, up, "wlan0"), carrier) == []  # unseen but up: nothing to re-probe
+    assert parse_rtnetlink(_newlink(7, up, "wlan0"), carrier) == []  # e.g. a wireless-extension event
+    batch = _newlink(7, IFF_UP, "wlan0") + _newlink(7, up, "wlan0")
+    assert [(e.interface, e.kind) for e in parse_rtnetlink(batch, carrier)] == [
+        ("wlan0", "carrier_down"), ("wlan0", "carrier_up")]
+    # An unseen interface whose first notification is a carrier loss is reported, not swallowed.
+    assert [e.kind for e in parse_rtnetlink(_newlink(8, IFF_UP, "wlan1"), carrier)] == ["carrier_down"]
+    assert parse_rtnetlink(_newlink(8, IFF_UP, "wlan1"), carrier) == []
+
+
+def test_rtnetlink_listener_seeds_carrier_from_a_link_dump():
+    listener = RtnetlinkListener(lambda event: None)
+    listener._seed_carrier()
+    lo = socket.if_nametoindex("lo")
+    assert listener._carrier[lo] & IFF_UP  # known before any notification arrives
+
+
+def test_wpa_listener_forwards_disconnect(tmp_path):
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    server.bind(str(tmp_path / "wlan0"))
+    server.setblocking(False)
+    seen = []
+
+    async def fake_wpa_supplicant(stop):
+        loop = asyncio.get_running_loop()
+        data, client = await loop.sock_recvfrom(server, 4096)
+        assert data == b"ATTACH"
+        server.sendto(b"OK\n", client)
+        server.sendto(b"<3>CTRL-EVENT-SCAN-RESULTS ", client)
+        server.sendto(b"<3>CTRL-EVENT-DISCONNECTED bssid=aa:bb:cc:dd:ee:ff reason=4", client)
+        while not seen:
+            await asyncio.sleep(0.01)
+        stop.set()
+
+    async def scenario():
+        stop = asyncio.Event()
+        listener = WpaEventListener("wlan0", str(tmp_path), seen.append, retry_seconds=0.05)
+        await asyncio.wait_for(asyncio.gather(listener.run(stop), fake_wpa_supplicant(stop)), 5)
+
+    asyncio.run(scenario())
+    server.close()
+    assert [(e.kind, e.detail) for e in seen] == [
+        ("CTRL-EVENT-DISCONNECTED", "bssid=aa:bb:cc:dd:ee:ff reason=4")]
+
+
+def test_wpa_listener_reattaches_when_the_supplicant_stops_answering(tmp_path):
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    server.bind(str(tmp_path / "wlan0"))
+    server.setblocking(False)
+    received = []
+
+    async def fake_wpa_supplicant(stop):
+        loop = asyncio.get_running_loop()
+        while received.count("ATTACH") < 2:
+            data, client = await loop.sock_recvfrom(server, 4096)
+            received.append(data.decode())
+            if data == b"ATTACH":
+                server.sendto(b"OK\n", client)
+            elif received.count("PING") == 1:
+                server.sendto(b"PONG\n", client)
+            # later PINGs go unanswered: the process is gone without a TERMINATING event
+        stop.set()
+
+    async def scenario():
+        stop = asyncio.Event()
+        listener = WpaEventListener("wlan0", str(tmp_path), lambda event: None, retry_seconds=0.05,
+                                    ping_seconds=0.05, pong_timeout=0.1)
+        await asyncio.wait_for(asyncio.gather(listener.run(stop), fake_wpa_supplicant(stop)), 5)
+
+    asyncio.run(scenario())
+    server.close()
+    assert received == ["ATTACH", "PING", "PING", "ATTACH"]
+
+
+def test_event_triggers_immediate_cycle_and_resets_interval(tmp_path, monkeypatch):
+    cfg = Config.from_dict({
+        "interface": "wlan5",
+        "check_interval_seconds": 60,
+        "paths": {"status_json": str(tmp_path / "status.json"), "state_dir": str(tmp_path),
+                  "status_shm": None, "action_history": str(tmp_path / "history.log")},
+        "features": {"sample_ring_records": 0},
+        "events": {"debounce_ms": 20, "min_gap_seconds": 0},
+    })
+
+    async def fake_snapshot(c):
+        return ConnectivitySnapshot(
+            ping_results=[PingResult(host="h", success=True, latency_ms=1.0)],
+            dns_result=DnsResult(hostname="example.com", success=True, latency_ms=1.0),
+            http_result=None, link=LinkMetrics(rssi=-50, bitrate_mbps=72.2),
+        )
+
+    monkeypatch.setattr(supervisor, "gather_snapshot_async", fake_snapshot)
+    monitor = supervisor.InterfaceMonitor(cfg)
+    monitor.current_interval = 120  # as if backed off after a long healthy stretch
+    starts = []
+    original = monitor.run_cycle
+
+    async def counting(snapshot=None):
+        starts.append(time.monotonic())
+        return await original(snapshot)
+
+    monitor.run_cycle = counting
+
+    async def scenario():
+        stop = asyncio.Event()
+        task = asyncio.create_task(monitor.run(stop))
+        await asyncio.sleep(0.05)
+        monitor.current_interval = 120
+        monitor.notify_event(LinkEvent("wlan5", "wpa_supplicant", "CTRL-EVENT-DISCONNECTED"))
+        await asyncio.sleep(0.2)
+        stop.set()
+        await task
+
+    asyncio.run(scenario())
+    monitor.close()
+    assert len(starts) == 2
+    assert starts[1] - starts[0] < 0.3
+    assert monitor.current_interval == 60 and monitor.consecutive_healthy == 1
+
+
+def test_wpa_reconnect_tier_waits_for_connected(tmp_path):
+    import threading
+
+    from watchdog.config import EscalationTier
+    from watchdog.recovery_steps import wpa_reconnect
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    server.bind(str(tmp_path / "wlan0"))
+    server.settimeout(5)
+    received = []
+
+    def fake_wpa_supplicant():
+        while True:
+            data, client = server.recvfrom(4096)
+            cmd = data.decode()
+            received.append(cmd)
+            if cmd == "STATUS":
+                # Left over from before the tier: must not pass for REATTACH's result.
+                server.sendto(b"<3>CTRL-EVENT-CONNECTED - Connection to aa:bb:cc:dd:ee:ff completed", client)
+                server.sendto(b"bssid=aa:bb:cc:dd:ee:ff\nwpa_state=COMPLETED\n", client)
+            elif cmd == "REATTACH":
+                server.sendto(b"OK\n", client)  # but never reconnects
+            elif cmd == "REASSOCIATE":
+                server.sendto(b"<3>CTRL-EVENT-SCAN-STARTED ", client)
+                server.sendto(b"OK\n", client)
+                server.sendto(b"<3>CTRL-EVENT-CONNECTED - Connection to aa:bb:cc:dd:ee:ff completed", client)
+                return
+            else:
+                server.sendto(b"OK\n", client)
+
+    t = threading.Thread(target=fake_wpa_supplicant, daemon=True)
+    t.start()
+    cfg = Config.from_dict({"interface": "wlan0", "events": {"wpa_ctrl_dir": str(tmp_path)}})
+    tier = EscalationTier(name="wpa_reconnect", connect_timeout_ms=200)
+    t0 = time.monotonic()
+    assert wpa_reconnect(cfg, tier) is True
+    assert time.monotonic() - t0 < 1.0
+    t.join(1)
+    server.close()
+    assert received == ["ATTACH", "STATUS", "REATTACH", "REASSOCIATE"]
+    assert wpa_reconnect(cfg, tier) is False  # supplicant gone
+
+
+def test_wpa_ctrl_drain_discards_queued_and_buffered_events(tmp_path):
+    from watchdog.wpa_ctrl import WpaCtrl
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    server.bind(str(tmp_path / "wlan0"))
+    server.settimeout(5)
+    with WpaCtrl("wlan0", str(tmp_path), timeout=1.0) as ctrl:
+        client = ctrl.local_path
+        server.sendto(b"<3>CTRL-EVENT-CONNECTED - old", client)
+        server.sendto(b"PONG\n", client)
+        assert ctrl.request("PING") == "PONG"  # the event before it is queued
+        server.sendto(b"<3>CTRL-EVENT-DISCONNECTED - old", client)  # still in the socket
+        time.sleep(0.05)
+        assert ctrl.drain() == 2
+        assert ctrl.recv_event() is None
+        server.sendto(b"<3>CTRL-EVENT-CONNECTED - new", client)
+        assert ctrl.wait_event(["CTRL-EVENT-CONNECTED"], 1.0) == "CTRL-EVENT-CONNECTED - new"
+    server.close()
@@ -0,0 +1,51 @@
+import asyncio
+
+from watchdog.connectivity import ConnectivitySnapshot, DnsResult, HttpResult, LinkMetrics, PingResult
+from watchdog.exporter import Histogram, MetricsRegistry, MetricsServer
+from watchdog.metrics import ClassificationResult, HealthState
+
+
+def test_histogram_buckets_are_cumulative():
+    h = Histogram((1, 10))
+    for v in (0.5, 5, 5, 50):
+        h.observe(v)
+    out = []
+    h.render("x", [("interface", "wlan0")], out)
+    assert out[:3] == [
+        'x_bucket{interface="wlan0",le="1"} 1',
+        'x_bucket{interface="wlan0",le="10"} 3',
+        'x_bucket{interface="wlan0",le="+Inf"} 4',
+    ]
+    assert out[-1] == 'x_count{interface="wlan0"} 4'
+
+
+def test_metrics_endpoint_serves_scrape():
+    registry = MetricsRegistry()
+    snap = ConnectivitySnapshot(
+        ping_results=[PingResult("1.1.1.1", True, 12.0, sent=3, received=2, loss_pct=33.3)],
+        dns_result=DnsResult("example.com", True, 20.0),
+        http_result=HttpResult("http://x/", True, 80.0, status=204, ttfb_ms=40.0),
+        link=LinkMetrics(rssi=-61, bitrate_mbps=144.4),
+    )
+    cls = ClassificationResult(state=HealthState.HEALTHY, fail_ratio=0.0, consecutive_fail_packets=0, rssi=-61)
+    registry.observe_cycle("wlan0", snap, cls, 0.3)
+    registry.record_tier("wlan0", "refresh_dhcp", True)
+
+    async def scrape():
+        server = MetricsServer("127.0.0.1:0", registry)
+        await server.start()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            writer.write(b"GET /metrics HTTP/1.1\r\nHost: x\r\n\r\n")
+            data = await reader.read()
+            writer.close()
+            return data.decode()
+        finally:
+            await server.close()
+
+    body = asyncio.run(scrape())
+    assert body.startswith("HTTP/1.1 200 OK")
+    assert 'wifi_watchdog_ping_rtt_ms_bucket{interface="wlan0",host="1.1.1.1",le="20"} 1' in body
+    assert 'wifi_watchdog_rssi_dbm{interface="wlan0"} -61' in body
+    assert 'wifi_watchdog_cycle_duration_seconds_count{interface="wlan0"} 1' in body
+    assert 'wifi_watchdog_tier_successes_total{interface="wlan0",tier="refresh_dhcp"} 1' in body
@@ -0,0 +1,102 @@
+import asyncio
+import os
+import struct
+import time
+
+from watchdog import supervisor
+from watchdog.config import Config
+from watchdog.connectivity import ConnectivitySnapshot, DnsResult, LinkMetrics, PingResult
+from watchdog.gateway_probe import (
+    GatewayResult, arp_request, parse_arp_reply, read_lease_remaining, read_neighbor,
+)
+from watchdog.metrics import FaultLevel, localize_fault
+
+
+def snap(pings_ok, dns_ok=True, gateway=None):
+    return ConnectivitySnapshot(
+        ping_results=[PingResult(host="1.1.1.1", success=pings_ok, latency_ms=None)],
+        dns_result=DnsResult(hostname="example.com", success=dns_ok, latency_ms=None),
+        http_result=None, link=LinkMetrics(rssi=-50, bitrate_mbps=72.2), gateway=gateway,
+    )
+
+
+def gw(**overrides):
+    fields = dict(gateway="192.168.1.1", operstate="up", address="192.168.1.50", lease_remaining_s=3000.0,
+                  arp_ok=True, icmp_ok=False)
+    fields.update(overrides)
+    return GatewayResult(**fields)
+
+
+def test_fault_is_localized_to_the_nearest_broken_layer():
+    assert localize_fault(snap(True)) is None
+    assert localize_fault(snap(True, dns_ok=False)) == FaultLevel.DNS
+    assert localize_fault(snap(False)) is None  # no gateway probe: unknown
+    assert localize_fault(snap(False, gateway=gw())) == FaultLevel.UPSTREAM  # ARP alone proves the LAN
+    assert localize_fault(snap(False, gateway=gw(arp_ok=False))) == FaultLevel.LAN
+    assert localize_fault(snap(False, gateway=gw(lease_remaining_s=-5.0))) == FaultLevel.LAN
+    assert localize_fault(snap(False, gateway=gw(address=None))) == FaultLevel.LAN
+    assert localize_fault(snap(False, gateway=gw(gateway=None))) == FaultLevel.LAN
+    assert localize_fault(snap(False, gateway=gw(operstate="dormant"))) == FaultLevel.LINK
+
+
+def test_arp_reply_and_neighbour_table(tmp_path):
+    request = arp_request(bytes.fromhex("b827eb000001"), "192.168.1.50", "192.168.1.1")
+    reply = struct.pack("!HHBBH", 1, 0x0800, 6, 4, 2) + bytes.fromhex("aabbccddeeff") + bytes([192, 168, 1, 1]) \
+        + request[8:14] + request[14:18]
+    assert parse_arp_reply(reply, "192.168.1.1") == "aa:bb:cc:dd:ee:ff"
+    assert parse_arp_reply(request, "192.168.1.1") is None  # our own request, looped back
+    assert parse_arp_reply(reply, "192.168.1.2") is None
+
+    arp = tmp_path / "arp"
+    arp.write_text(
+        "IP address       HW type     Flags       HW address            Mask     Device\n"
+        "192.168.1.1      0x1         0x2         aa:bb:cc:dd:ee:ff     *        wlan0\n"
+        "192.168.2.1      0x1         0x0         00:00:00:00:00:00     *        wlan1\n"
+    )
+    assert read_neighbor("192.168.1.1", "wlan0", str(arp)) == "aa:bb:cc:dd:ee:ff"
+    assert read_neighbor("192.168.2.1", "wlan1", str(arp)) is None  # incomplete: ARP failed
+    assert read_neighbor("192.168.1.1", "wlan1", str(arp)) is None
+
+
+def test_lease_remaining_from_dhcpcd_and_dhclient(tmp_path):
+    lease = tmp_path / "wlan0.lease"
+    options = bytes([53, 1, 5, 51, 4]) + struct.pack("!I", 3600) + bytes([255])
+    lease.write_bytes(bytes(236) + b"\x63\x82\x53\x63" + options)
+    os.utime(lease, (1_000_000, 1_000_000))
+    assert read_lease_remaining("wlan0", str(lease), now=1_001_000) == 2600
+    assert read_lease_remaining("wlan0", str(lease), now=1_004_000) == -400
+
+    leases = tmp_path / "dhclient.wlan0.leases"
+    leases.write_text("lease {\n  expire 4 2026/10/15 18:00:00;\n}\nlease {\n  expire 5 2026/10/16 18:00:00;\n}\n")
+    assert read_lease_remaining("wlan0", str(leases), now=1792173600 - 60) == 60  # 2026-10-16 18:00:00 UTC
+    assert read_lease_remaining("wlan0", str(tmp_path / "missing.lease")) is None
+
+
+def test_failing_ping_round_reprobes_a_stale_gateway(tmp_path, monkeypatch):
+    cfg = Config.from_dict({
+        "interface": "wlan5",
+        "paths": {"status_json": str(tmp_path / "status.json"), "state_dir": str(tmp_path),
+                  "status_shm": None, "action_history": str(tmp_path / "history.log")},
+        "features": {"sample_ring_records": 0},
+        "escalation": {"tiers": []},
+        "cadence": {"enabled": True, "ping": {"period_seconds": 5, "jitter": 0}},
+    })
+    probed = []
+
+    async def fake_probe(c, kind):
+        probed.append(kind)
+        return gw(arp_ok=False)  # the gateway went away since the last scheduled probe
+
+    monkeypatch.setattr(supervisor, "probe_once", fake_probe)
+    monitor = supervisor.InterfaceMonitor(cfg)
+    monitor.latest = snap(True, gateway=gw(ts=time.monotonic() - 30))
+    lost = [PingResult(host="1.1.1.1", success=False, latency_ms=None)]
+    asyncio.run(monitor.on_probe_result("ping", lost))
+    assert probed == ["gateway"]
+    assert monitor.last_classification.fault == FaultLevel.LAN  # not UPSTREAM from the 30 s old result
+
+    monitor.latest.gateway = gw()  # fresh: used as is
+    asyncio.run(monitor.on_probe_result("ping", lost))
+    assert probed == ["gateway"]
+    assert monitor.last_classification.fault == FaultLevel.UPSTREAM
+    monitor.close()
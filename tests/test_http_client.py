@@ -0,0 +1,84 @@
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from watchdog import connectivity
+from watchdog.connectivity import http_probe
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = set()
+
+    def do_HEAD(self):
+        _Handler.connections.add(self.client_address)
+        self.send_response(204 if self.path == "/healthz" else 503)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def test_keepalive_reuses_connection_and_reports_phases():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        first = http_probe(base + "/healthz", 1000)
+        second = http_probe(base + "/healthz", 1000)
+        bad = http_probe(base + "/other", 1000)
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert first.success and first.status == 204 and not first.reused
+    assert first.connect_ms is not None and first.ttfb_ms is not None
+    assert second.success and second.reused and second.connect_ms is None
+    assert len(_Handler.connections) == 2  # one per distinct URL client
+    assert not bad.success and bad.status == 503 and bad.latency_ms is None
+
+
+def test_connection_refused_still_records_phases():
+    res = http_probe("http://127.0.0.1:9/", 500)
+    assert not res.success
+    assert res.error is not None
+    assert res.dns_ms is not None
+
+
+def test_clients_are_per_interface_and_bound_to_it():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/healthz"
+    try:
+        via_lo = http_probe(url, 1000, "lo")
+        via_missing = http_probe(url, 1000, "nosuch0")
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert via_lo.success and not via_lo.reused
+    assert not via_missing.success and "nosuch0" in via_missing.error  # no silent fallback to another route
+    client = connectivity._http_clients[("lo", url)]
+    assert client._sock.getsockopt(socket.SOL_SOCKET, socket.SO_BINDTODEVICE, 16).rstrip(b"\0") == b"lo"
+    assert connectivity._http_clients[("nosuch0", url)] is not client
+
+
+def test_hung_resolver_fails_the_probe_at_the_deadline(monkeypatch):
+    release = threading.Event()
+    real = socket.getaddrinfo
+
+    def hung(host, *args, **kwargs):
+        if host == "hung.example":
+            release.wait(5)
+        return real("127.0.0.1", *args, **kwargs)
+
+    monkeypatch.setattr(socket, "getaddrinfo", hung)
+    try:
+        t0 = time.monotonic()
+        first = http_probe("http://hung.example:9/", 200)
+        assert time.monotonic() - t0 < 0.5
+        assert not first.success and "deadline" in first.error
+        second = http_probe("http://hung.example:9/", 200)
+        assert second.error != "busy"  # the client was released when the deadline passed
+    finally:
+        release.set()
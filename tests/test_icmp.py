@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from watchdog.icmp import IcmpProber, build_echo_request, checksum, parse_echo_reply
+
+
+def test_echo_request_checksum_verifies():
+    pkt = build_echo_request(0x1234, 7)
+    assert checksum(pkt) == 0
+    reply = bytes([0]) + pkt[1:]  # flip type to echo reply
+    assert parse_echo_reply(reply, raw=False) == (0x1234, 7)
+    assert parse_echo_reply(pkt, raw=False) is None  # our own request is ignored
+
+
+def test_parse_strips_ipv4_header_on_raw():
+    icmp = bytes([0]) + build_echo_request(1, 2)[1:]
+    ip_header = bytes([0x45]) + bytes(19)
+    assert parse_echo_reply(ip_header + icmp, raw=True) == (1, 2)
+
+
+def test_loopback_burst_reports_rtt_and_loss():
+    try:
+        prober = IcmpProber("auto")
+    except PermissionError:
+        pytest.skip("ICMP sockets not permitted here")
+    try:
+        stats = asyncio.run(prober.probe(["127.0.0.1", "nonexistent.invalid"], count=3, interval_ms=5, timeout_ms=300))
+    finally:
+        prober.close()
+    lo = stats["127.0.0.1"]
+    assert lo.sent == 3 and lo.received == 3
+    assert lo.loss_pct == 0.0 and lo.avg_rtt_ms is not None and lo.jitter_ms is not None
+    assert stats["nonexistent.invalid"].loss_pct == 100.0
+
+
+def test_failed_prober_open_is_retried_after_a_delay(monkeypatch):
+    from watchdog import connectivity
+
+    now = [1000.0]
+    attempts = []
+
+    class FlakyProber:
+        def __init__(self, backend, interface):
+            attempts.append(now[0])
+            if len(attempts) == 1:
+                raise PermissionError("cannot bind ICMP socket to wlan9: No such device")
+
+    monkeypatch.setattr(connectivity, "IcmpProber", FlakyProber)
+    monkeypatch.setattr(connectivity.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(connectivity, "_icmp_probers", {})
+    monkeypatch.setattr(connectivity, "_icmp_retry_at", {})
+    assert connectivity._get_icmp_prober("auto", "wlan9") is None
+    now[0] += connectivity.ICMP_RETRY_SECONDS / 2
+    assert connectivity._get_icmp_prober("auto", "wlan9") is None  # not retried yet: subprocess ping meanwhile
+    now[0] += connectivity.ICMP_RETRY_SECONDS
+    prober = connectivity._get_icmp_prober("auto", "wlan9")
+    assert isinstance(prober, FlakyProber) and connectivity._get_icmp_prober("auto", "wlan9") is prober
+    assert attempts == [1000.0, 1000.0 + 1.5 * connectivity.ICMP_RETRY_SECONDS]
@@ -0,0 +1,95 @@
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from watchdog import connectivity
+from watchdog.config import Config
+from watchdog.connectivity import ConnectivitySnapshot, DnsResult, LinkMetrics, PingResult
+from watchdog.metrics import HealthState, HealthWindow, classify
+from watchdog.nl80211 import (
+    NL80211_ATTR_MAC,
+    NL80211_ATTR_STA_INFO,
+    NL80211_RATE_INFO_BITRATE32,
+    NL80211_STA_INFO_BEACON_LOSS,
+    NL80211_STA_INFO_RX_BITRATE,
+    NL80211_STA_INFO_SIGNAL,
+    NL80211_STA_INFO_TX_BITRATE,
+    NL80211_STA_INFO_TX_RETRIES,
+    StationInfo,
+    nla,
+    parse_proc_wireless,
+    parse_station,
+)
+
+
+def test_parse_station_dump():
+    sta_info = (
+        nla(NL80211_STA_INFO_SIGNAL, struct.pack("=b", -61))
+        + nla(NL80211_STA_INFO_TX_BITRATE, nla(NL80211_RATE_INFO_BITRATE32, struct.pack("=I", 722)))
+        + nla(NL80211_STA_INFO_RX_BITRATE, nla(NL80211_RATE_INFO_BITRATE32, struct.pack("=I", 1300)))
+        + nla(NL80211_STA_INFO_TX_RETRIES, struct.pack("=I", 42))
+        + nla(NL80211_STA_INFO_BEACON_LOSS, struct.pack("=I", 3))
+    )
+    msg = nla(NL80211_ATTR_MAC, bytes.fromhex("aabbccddeeff")) + nla(NL80211_ATTR_STA_INFO | 0x8000, sta_info)
+    info = StationInfo()
+    parse_station(msg, info)
+    assert info.rssi == -61
+    assert info.tx_bitrate_mbps == 72.2
+    assert info.rx_bitrate_mbps == 130.0
+    assert info.tx_retries == 42
+    assert info.beacon_loss == 3
+    assert info.bssid == "aa:bb:cc:dd:ee:ff"
+
+
+def test_parse_proc_net_wireless():
+    text = (
+        "Inter-| sta-|   Quality        |   Discarded packets               | Missed | WE\n"
+        " face | tus | link level noise |  nwid  crypt   frag  retry   misc | beacon | 22\n"
+        " wlan0: 0000   54.  -56.  -256        0      0      0     15      0        2\n"
+    )
+    info = parse_proc_wireless(text, "wlan0")
+    assert info is not None
+    assert (info.rssi, info.noise_dbm, info.tx_failed, info.beacon_loss) == (-56, None, 15, 2)
+    assert parse_proc_wireless(text, "wlan1") is None
+
+
+def test_low_bitrate_degrades():
+    cfg = Config.from_dict({"signal": {"min_bitrate_mbps": 6}})
+    snap = ConnectivitySnapshot(
+        ping_results=[PingResult(host="a", success=True, latency_ms=1.0)],
+        dns_result=DnsResult(hostname="example.com", success=True, latency_ms=1.0),
+        http_result=None,
+        link=LinkMetrics(rssi=-50, bitrate_mbps=1.0),
+    )
+    assert classify(cfg, snap, HealthWindow(size=5)).state == HealthState.DEGRADED
+
+
+def test_nl80211_readers_are_per_interface_and_never_shared_concurrently(monkeypatch):
+    busy = set()
+    overlaps = []
+
+    class FakeReader:
+        def __init__(self):
+            self.interfaces = set()
+
+        def read(self, interface):
+            self.interfaces.add(interface)
+            if self in busy:
+                overlaps.append(interface)
+            busy.add(self)
+            time.sleep(0.01)
+            busy.discard(self)
+            return StationInfo(rssi=-50)
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(connectivity, "Nl80211Reader", FakeReader)
+    monkeypatch.setattr(connectivity, "_nl_readers", {})
+    monkeypatch.setattr(connectivity, "_nl_locks", {})
+    monkeypatch.setattr(connectivity, "_nl_unavailable", False)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(connectivity.read_link_stats, ["wlan0", "wlan1"] * 8))
+    assert all(r.rssi == -50 and r.source == "nl80211" for r in results)
+    assert overlaps == []
+    assert {i: r.interfaces for i, r in connectivity._nl_readers.items()} == {"wlan0": {"wlan0"}, "wlan1": {"wlan1"}}
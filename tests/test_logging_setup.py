@@ -0,0 +1,94 @@
+import logging
+import queue
+import socket
+import struct
+
+from watchdog.logging_setup import DedupHandler, JournalHandler, _DroppingQueueHandler
+
+
+class _Collect(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def _cycle(state="HEALTHY", rssi=-50, iface="wlan0"):
+    fields = {"interface": iface, "state": state, "fail_ratio": 0.0, "consecutive_fails": 0,
+              "rssi": rssi, "invoked_tier": None}
+    return logging.makeLogRecord({"msg": "health_cycle", "levelno": logging.INFO, "levelname": "INFO",
+                                  "extra_fields": fields})
+
+
+def test_repeated_health_cycles_collapse_into_summaries():
+    now = [0.0]
+    out = _Collect()
+    dedup = DedupHandler(out, interval=100, clock=lambda: now[0])
+    for i in range(10):
+        now[0] = i * 15.0
+        dedup.handle(_cycle(rssi=-50 - i % 3))
+    dedup.handle(_cycle(iface="wlan1"))  # other interfaces have their own runs
+    now[0] = 150.0
+    dedup.handle(_cycle(state="LOST"))
+
+    msgs = [(r.msg, r.extra_fields.get("repeated")) for r in out.records]
+    assert msgs == [
+        ("health_cycle", None),
+        ("health_cycle_summary", 7),  # t=15..105, then the period elapsed
+        ("health_cycle", None),  # wlan1
+        ("health_cycle_summary", 2),  # t=120..135, flushed by the state change
+        ("health_cycle", None),
+    ]
+    summary = out.records[3].extra_fields
+    assert (summary["rssi_min"], summary["rssi_max"], summary["state"]) == (-52, -50, "HEALTHY")
+
+
+def test_full_queue_drops_and_reports_count():
+    q = queue.Queue(2)
+    handler = _DroppingQueueHandler(q)
+    for i in range(5):
+        handler.handle(logging.makeLogRecord({"msg": f"r{i}"}))
+    assert handler.dropped == 3
+    q.get_nowait(), q.get_nowait()
+    handler.handle(logging.makeLogRecord({"msg": "r5"}))
+    note, record = q.get_nowait(), q.get_nowait()
+    assert (note.msg, note.extra_fields, record.msg) == ("log_records_dropped", {"count": 3}, "r5")
+
+
+def test_drop_note_waits_until_the_record_fits_too():
+    q = queue.Queue(2)
+    handler = _DroppingQueueHandler(q)
+    for i in range(3):
+        handler.handle(logging.makeLogRecord({"msg": f"r{i}"}))
+    q.get_nowait()  # one free slot: room for the note but not the record
+    handler.handle(logging.makeLogRecord({"msg": "r3"}))
+    assert handler.dropped == 2 and q.qsize() == 1
+    q.get_nowait()
+    handler.handle(logging.makeLogRecord({"msg": "r4"}))
+    note, record = q.get_nowait(), q.get_nowait()
+    assert (note.extra_fields, record.msg, handler.dropped) == ({"count": 2}, "r4", 0)
+
+
+def test_journal_handler_sends_extra_fields(tmp_path):
+    path = str(tmp_path / "journal.sock")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    server.bind(path)
+    handler = JournalHandler(path)
+    try:
+        handler.handle(logging.makeLogRecord({
+            "msg": "tier_done", "levelno": logging.WARNING, "name": "watchdog.supervisor",
+            "extra_fields": {"tier": "cycle_interface", "success": True, "steps": ["down", "up"],
+                             "error": "line1\nline2"},
+        }))
+        data = server.recv(65536)
+    finally:
+        handler.close()
+        server.close()
+    assert b"PRIORITY=4\n" in data
+    assert b"SYSLOG_IDENTIFIER=wifi-watchdog\n" in data
+    assert b"EVENT=tier_done\n" in data
+    assert b"TIER=cycle_interface\n" in data
+    assert b'STEPS=["down","up"]\n' in data
+    assert b"ERROR\n" + struct.pack("<Q", 11) + b"line1\nline2\n" in data
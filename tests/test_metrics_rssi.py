@@ -15,3 +15,28 @@ def test_rssi_lost_overrides_success():
     snap = make_snapshot(successes=5, total=5, rssi=cfg.signal.rssi_lost)
     result = classify(cfg, snap, window)
     assert result.state in {HealthState.LOST, HealthState.DEGRADED}
+
+
+def test_window_ring_aggregates_match_naive_scan():
+    import random
+
+    from watchdog.metrics import WindowEntry
+
+    rng = random.Random(7)
+    window = HealthWindow(size=20, horizons=[5, 60])
+    history = []
+    for _ in range(500):
+        ratio = rng.choice([1.0, 1.0, 1.0, 0.5, 0.0])
+        window.add(WindowEntry(success_ratio=ratio, rssi=-60))
+        history.append(ratio < 1.0)
+        for n in (5, 20, 60):
+            recent = history[-n:]
+            assert window.fail_ratio_recent(n) == sum(recent) / len(recent)
+    streak = 0
+    for failed in reversed(history[-20:]):
+        if not failed:
+            break
+        streak += 1
+    assert window.consecutive_non_full_success() == streak
+    assert len(list(window.entries())) == 20
+    assert set(window.aggregates()) == {5, 20, 60}
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import time
+
+from watchdog import connectivity
+from watchdog.config import Config
+from watchdog.connectivity import DnsResult, HttpResult, LinkMetrics, PingResult, gather_snapshot
+
+
+def test_probes_run_concurrently_under_deadline(monkeypatch):
+    cfg = Config.from_dict({
+        "hosts": {"ping": ["a", "b", "c"], "dns_lookup": "example.com", "http_probe": "http://example.invalid/"},
+        "timeouts": {"cycle_ms": 500},
+    })
+
+    async def slow_pings(hosts, timeout_ms, icmp, interface=None):
+        await asyncio.sleep(0.2)
+        return [PingResult(host=h, success=True, latency_ms=1.0) for h in hosts]
+
+    async def link(interface, backend):
+        return LinkMetrics(rssi=-50, bitrate_mbps=72.2)
+
+    async def dns(hostname, timeout_ms, servers, interface=None):
+        return DnsResult(hostname=hostname, success=True, latency_ms=1.0)
+
+    def hung_http(url, timeout_ms, interface=None):
+        time.sleep(2)
+        return HttpResult(url=url, success=True, latency_ms=1.0, status=200)
+
+    monkeypatch.setattr(connectivity, "ping_hosts_async", slow_pings)
+    monkeypatch.setattr(connectivity, "_link_metrics_async", link)
+    monkeypatch.setattr(connectivity, "dns_lookup_async", dns)
+    monkeypatch.setattr(connectivity, "http_probe", hung_http)
+
+    start = time.perf_counter()
+    snap = gather_snapshot(cfg)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 1.0  # not 0.2 + 2
+    assert [p.success for p in snap.ping_results] == [True, True, True]
+    assert snap.dns_result.success is True
+    assert snap.http_result is not None and snap.http_result.success is False  # missed the deadline
+    assert snap.link.rssi == -50
+
+
+def test_hung_probes_on_one_interface_do_not_delay_another(monkeypatch):
+    release = threading.Event()
+
+    def http(url, timeout_ms, interface=None):
+        release.wait(5)
+        return HttpResult(url=url, success=False, latency_ms=None, status=None)
+
+    monkeypatch.setattr(connectivity, "http_probe", http)
+    monkeypatch.setattr(connectivity, "read_link_stats", lambda interface, backend: LinkMetrics(rssi=-50, bitrate_mbps=72.2))
+    degraded = Config.from_dict({"interface": "wlan-slow", "hosts": {"http_probe": "http://example.invalid/"},
+                                 "timeouts": {"cycle_ms": 1000}})
+    healthy = Config.from_dict({"interface": "wlan-ok", "link": {"backend": "nl80211"}, "timeouts": {"cycle_ms": 1000}})
+
+    async def scenario():
+        hung = [asyncio.ensure_future(connectivity.probe_once(degraded, "http")) for _ in range(4)]
+        await asyncio.sleep(0.05)
+        start = time.perf_counter()
+        link = await connectivity.probe_once(healthy, "link")
+        elapsed = time.perf_counter() - start
+        release.set()
+        await asyncio.gather(*hung)
+        return link, elapsed
+
+    try:
+        link, elapsed = asyncio.run(scenario())
+    finally:
+        release.set()
+    assert link.rssi == -50
+    assert elapsed < 0.5
+
+
+def test_system_resolver_fallback_is_not_interface_scoped(monkeypatch):
+    monkeypatch.setattr(connectivity, "read_resolv_conf", lambda: [])
+    monkeypatch.setattr(connectivity, "_system_resolve", lambda hostname: None)
+    result = connectivity.dns_lookup("example.com", 500, interface="wlan0")
+    assert result.success and not result.interface_scoped
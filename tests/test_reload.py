@@ -0,0 +1,131 @@
+import asyncio
+import os
+
+import yaml
+
+from watchdog import main
+from watchdog.config import Config, load_config
+from watchdog.config_watch import ConfigWatcher
+from watchdog.connectivity import ConnectivitySnapshot, DnsResult, LinkMetrics, PingResult
+from watchdog.metrics import HealthWindow, WindowEntry
+from watchdog.supervisor import InterfaceMonitor, Supervisor, interface_configs
+
+
+def config_dict(tmp_path, **overrides):
+    data = {
+        "interface": "wlan4",
+        "history_size": 4,
+        "paths": {"status_json": str(tmp_path / "status.json"), "state_dir": str(tmp_path),
+                  "status_shm": None, "action_history": str(tmp_path / "history.log")},
+        "features": {"sample_ring_records": 0},
+        "escalation": {"tiers": [{"name": "refresh_dhcp"}, {"name": "cycle_interface"}, {"name": "reboot"}]},
+    }
+    data.update(overrides)
+    return data
+
+
+def write_config(path, tmp_path, **overrides):
+    path.write_text(yaml.safe_dump(config_dict(tmp_path, **overrides)))
+
+
+def test_window_resize_keeps_newest_samples():
+    window = HealthWindow(4, [8])
+    for i in range(10):
+        window.add(WindowEntry(success_ratio=0.0 if i >= 7 else 1.0, rssi=-50 - i))
+    grown = window.resized(6)
+    assert [e.rssi for e in grown.entries()] == [-54, -55, -56, -57, -58, -59]
+    assert grown.fail_ratio() == 0.5 and grown.consecutive_non_full_success() == 3
+    shrunk = window.resized(2)
+    assert [e.rssi for e in shrunk.entries()] == [-58, -59] and shrunk.fail_ratio() == 1.0
+
+
+def test_sighup_reload_keeps_runtime_state_and_rejects_invalid_config(tmp_path):
+    path = tmp_path / "watchdog.yml"
+    write_config(path, tmp_path)
+    sup = Supervisor(interface_configs(load_config(path)))
+    monitor = sup.monitors[0]
+    for _ in range(4):
+        monitor.window.add(WindowEntry(success_ratio=0.0, rssi=-60))
+    esc = monitor.escalator
+    esc._current_index = 1  # cycle_interface is next
+    esc._tier_states["refresh_dhcp"].last_invoked = 1234.0
+    esc._last_reboot_ts = 999.0
+
+    write_config(path, tmp_path, history_size=8, thresholds={"degraded_fail_ratio": 0.3},
+                 paths={"status_json": str(tmp_path / "elsewhere.json"), "state_dir": str(tmp_path)},
+                 escalation={"tiers": [{"name": "wpa_reconnect"}, {"name": "refresh_dhcp"},
+                                       {"name": "cycle_interface"}, {"name": "reboot"}]})
+    result = main.reload_config(sup, str(path))
+    assert "history_size" in result["applied"] and "thresholds.degraded_fail_ratio" in result["applied"]
+    assert "escalation.tiers" in result["applied"]
+    assert "paths.status_json" in result["needs_restart"]
+    assert monitor.cfg.paths.status_json == str(tmp_path / "status.json")  # still the running file
+    assert monitor.cfg.thresholds.degraded_fail_ratio == 0.3
+    assert monitor.window.size == 8 and len(monitor.window) == 4 and monitor.window.fail_ratio() == 1.0
+    assert esc._tiers[esc._current_index].name == "cycle_interface"
+    assert esc._tier_states["refresh_dhcp"].last_invoked == 1234.0 and esc._last_reboot_ts == 999.0
+
+    path.write_text(path.read_text().replace("degraded_fail_ratio: 0.3", "degraded_fail_ratio: 0.95"))
+    assert main.reload_config(sup, str(path)) is None  # degraded >= lost: rejected
+    assert monitor.cfg.thresholds.degraded_fail_ratio == 0.3
+    for m in sup.monitors:
+        m.close()
+
+
+def test_reload_starts_newly_configured_probe_kinds(tmp_path, monkeypatch):
+    cadence = {"enabled": True, "link": {"period_seconds": 10}, "ping": {"period_seconds": 0.05, "jitter": 0},
+               "dns": {"period_seconds": 10}, "http": {"period_seconds": 0.05, "jitter": 0}}
+    calls = {"link": 0, "ping": 0, "dns": 0, "http": 0}
+
+    async def fake_probe(c, kind):
+        calls[kind] += 1
+        if kind == "ping":
+            return [PingResult(host="h", success=True, latency_ms=1.0)]
+        if kind == "link":
+            return LinkMetrics(rssi=-50, bitrate_mbps=72.2)
+        return DnsResult(hostname="example.com", success=True, latency_ms=1.0) if kind == "dns" else None
+
+    async def fake_snapshot(c):
+        return ConnectivitySnapshot(ping_results=await fake_probe(c, "ping"), dns_result=await fake_probe(c, "dns"),
+                                    http_result=None, link=await fake_probe(c, "link"))
+
+    monkeypatch.setattr("watchdog.scheduler.probe_once", fake_probe)
+    monkeypatch.setattr("watchdog.supervisor.gather_snapshot_async", fake_snapshot)
+    monitor = InterfaceMonitor(Config.from_dict(config_dict(tmp_path, cadence=cadence)))
+
+    async def scenario():
+        stop = asyncio.Event()
+        task = asyncio.create_task(monitor.run(stop))
+        await asyncio.sleep(0.12)
+        assert calls["http"] == 0
+        applied, pending = monitor.apply_config(Config.from_dict(config_dict(
+            tmp_path, cadence=cadence, hosts={"http_probe": "http://example.com/"})))
+        assert applied == ["hosts.http_probe"] and pending == []
+        await asyncio.sleep(0.12)
+        stop.set()
+        await task
+
+    asyncio.run(scenario())
+    monitor.close()
+    assert calls["http"] >= 2 and calls["ping"] >= 4
+
+
+def test_config_watcher_fires_once_per_rewrite(tmp_path):
+    path = tmp_path / "watchdog.yml"
+    path.write_text("a: 1\n")
+    fired = []
+
+    async def scenario():
+        watcher = ConfigWatcher(str(path), lambda: fired.append(1), debounce=0.05)
+        watcher.start()
+        try:
+            tmp = tmp_path / "watchdog.yml.tmp"
+            tmp.write_text("a: 2\n")
+            os.replace(tmp, path)  # how editors and config management save
+            (tmp_path / "other.yml").write_text("ignored\n")
+            await asyncio.sleep(0.2)
+        finally:
+            watcher.close()
+
+    asyncio.run(scenario())
+    assert fired == [1]
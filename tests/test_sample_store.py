@@ -0,0 +1,100 @@
+import io
+import json
+
+from watchdog.connectivity import ConnectivitySnapshot, DnsResult, HttpResult, LinkMetrics, PingResult
+from watchdog.gateway_probe import GatewayResult
+from watchdog.sample_store import SampleReader, SampleRing, export_csv, export_json
+
+
+def make_snapshot(i):
+    return ConnectivitySnapshot(
+        ping_results=[
+            PingResult(host="1.1.1.1", success=True, latency_ms=10.0 + i, sent=3, received=3, loss_pct=0.0, jitter_ms=0.5),
+            PingResult(host="8.8.8.8", success=False, latency_ms=None, sent=3, received=0, loss_pct=100.0),
+        ],
+        dns_result=DnsResult(hostname="example.com", success=True, latency_ms=4.0),
+        http_result=HttpResult(url="https://example.com", success=True, latency_ms=30.0, status=204, ttfb_ms=12.0),
+        link=LinkMetrics(rssi=-55, bitrate_mbps=72.2, bssid="aa:bb:cc:dd:ee:ff", freq_mhz=2437),
+    )
+
+
+def test_ring_wraps_and_reopens(tmp_path):
+    path = tmp_path / "samples.ring"
+    ring = SampleRing(path, capacity=4, hosts=["1.1.1.1", "8.8.8.8"])
+    for i in range(6):
+        ring.append(1000.0 + i, make_snapshot(i), "HEALTHY", 0.25)
+    ring.close()
+
+    reader = SampleReader(path)
+    recs = list(reader.records())
+    assert [r.index for r in recs] == [3, 4, 5, 6]
+    last = recs[-1]
+    assert last.ts == 1005.0 and last.state == "HEALTHY" and last.rssi == -55
+    assert last.bssid == "aa:bb:cc:dd:ee:ff" and last.http_status == 204 and last.http_ttfb_ms == 12.0
+    assert last.hosts[0].latency_ms == 15.0 and last.hosts[1].loss_pct == 100.0
+    assert last.hosts[1].latency_ms is None
+    reader.close()
+
+    # Same layout and host list: appending continues where it left off.
+    ring = SampleRing(path, capacity=4, hosts=["1.1.1.1", "8.8.8.8"])
+    assert ring.write_count == 6
+    ring.append(2000.0, make_snapshot(0))
+    ring.close()
+    reader = SampleReader(path)
+    out = io.StringIO()
+    assert export_json(reader, out, last=1) == 1
+    assert json.loads(out.getvalue())["index"] == 7
+    out = io.StringIO()
+    assert export_csv(reader, out) == 4
+    assert out.getvalue().splitlines()[0].startswith("index,ts,state")
+    reader.close()
+
+
+def test_ring_keeps_fault_and_gateway_like_status_json(tmp_path):
+    ring = SampleRing(tmp_path / "samples.ring", capacity=4, hosts=["1.1.1.1"])
+    snap = make_snapshot(0)
+    ring.append(1000.0, snap, "HEALTHY", 0.0)
+    snap.gateway = GatewayResult(gateway="192.168.1.1", operstate="up", address="192.168.1.50",
+                                 lease_remaining_s=1200.0, arp_ok=True, icmp_ok=False, latency_ms=None)
+    ring.append(1001.0, snap, "LOST", 1.0, "upstream")
+    ring.close()
+    reader = SampleReader(tmp_path / "samples.ring")
+    before, after = list(reader.records())
+    reader.close()
+    assert (before.fault, before.gateway_probed, before.lease_remaining_s) == (None, False, None)
+    assert (after.fault, after.gateway_probed, after.gateway_arp_ok, after.gateway_icmp_ok) == ("upstream", True, True, False)
+    assert after.gateway_rtt_ms is None and after.lease_remaining_s == 1200.0
+
+
+def test_reader_rejects_slot_overwritten_mid_read(tmp_path, monkeypatch):
+    from watchdog import sample_store
+
+    hosts = ["1.1.1.1", "8.8.8.8"]
+    ring = SampleRing(tmp_path / "samples.ring", capacity=2, hosts=hosts)
+    for i in range(2):
+        ring.append(1000.0 + i, make_snapshot(i), "HEALTHY", 0.0)
+    # The wrap-around write of record 3 into record 1's slot, stopped after its leading seq and body.
+    ahead = SampleRing(tmp_path / "ahead.ring", capacity=2, hosts=hosts)
+    for i in range(3):
+        ahead.append(1000.0 + i, make_snapshot(i), "LOST", 1.0)
+    start = ring.header_size
+    partial = bytes(ahead._mm[start:start + sample_store._SEQ.size + sample_store._REC_BODY.size])
+
+    real = sample_store._REC_BODY
+
+    class WriterStartsDuringRead:
+        size = real.size
+        pack_into = real.pack_into
+
+        def unpack_from(self, buf, offset=0):
+            ring._mm[start:start + len(partial)] = partial  # the writer runs between the reader's seq reads
+            return real.unpack_from(buf, offset)
+
+    reader = SampleReader(tmp_path / "samples.ring")
+    monkeypatch.setattr(sample_store, "_REC_BODY", WriterStartsDuringRead())
+    assert reader._decode(1) is None  # torn: new body under the old trailing seq
+    monkeypatch.setattr(sample_store, "_REC_BODY", real)
+    assert reader._decode(2).ts == 1001.0
+    reader.close()
+    ring.close()
+    ahead.close()
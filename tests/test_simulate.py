@@ -0,0 +1,45 @@
+from watchdog.config import Config
+from watchdog.simulate import Scenario, parse_grid, simulate, sweep
+
+BASE = {
+    "check_interval_seconds": 10,
+    "escalation": {"tiers": [
+        {"name": "refresh_dhcp", "min_interval_seconds": 60},
+        {"name": "cycle_interface", "min_interval_seconds": 60},
+        {"name": "reboot", "min_interval_seconds": 600},
+    ]},
+}
+
+
+def test_outages_detected_and_repaired_on_virtual_clock():
+    scenario = Scenario(days=2, base_loss=0.0, outage_every_seconds=3600, outage_seconds=900,
+                        fixed_by="cycle_interface", seed=3)
+    report = simulate(Config.from_dict({**BASE, "adaptive": {"enabled": False}}), scenario)
+    assert report.virtual_seconds >= 2 * 86400
+    assert report.outages > 10
+    assert report.outages_detected + report.outages_missed == report.outages
+    assert report.outages_repaired > 0
+    assert report.false_invocations < sum(report.tier_invocations.values())
+    assert report.reboots == 0  # cycle_interface always fixes it first
+    assert report.detection_delay_s["max"] <= 3 * BASE["check_interval_seconds"]  # degraded_consecutive cycles
+
+
+def test_sweep_reports_each_grid_point_and_rejects_invalid_ones():
+    grid = parse_grid(["thresholds.lost_consecutive=2,6", "escalation.tiers.0.enabled=false"])
+    assert grid == {"thresholds.lost_consecutive": [2, 6], "escalation.tiers.0.enabled": [False]}
+    results = list(sweep(BASE, grid, Scenario(days=0.5, seed=1)))
+    assert [r["overrides"]["thresholds.lost_consecutive"] for r in results] == [2, 6]
+    assert all("refresh_dhcp" not in r["report"]["tier_invocations"] for r in results)
+    bad = list(sweep(BASE, parse_grid(["check_interval_seconds=1"]), Scenario(days=0.1)))
+    assert "error" in bad[0]
+
+
+def test_verification_holdoff_spaces_tiers_during_a_converging_outage():
+    scenario = Scenario(days=1, base_loss=0.0, outage_every_seconds=6 * 3600, outage_seconds=3600,
+                        outage_loss=0.7, seed=5)
+    tiers = [{"name": "refresh_dhcp", "min_interval_seconds": 60}, {"name": "cycle_interface", "min_interval_seconds": 60}]
+    cfg = {**BASE, "adaptive": {"enabled": False}, "escalation": {"tiers": tiers}}
+    unverified = simulate(Config.from_dict({**cfg, "verification": {"enabled": False}}), scenario)
+    verified = simulate(Config.from_dict({**cfg, "verification": {"holdoff_seconds": 600}}), scenario)
+    assert verified.outages == unverified.outages
+    assert 0 < sum(verified.tier_invocations.values()) < sum(unverified.tier_invocations.values())
@@ -0,0 +1,115 @@
+import json
+import time
+
+from watchdog import supervisor
+from watchdog.config import Config
+from watchdog.metrics import HealthWindow, WindowEntry
+from watchdog.state_snapshot import snapshot_path
+
+
+def make_cfg(tmp_path, **overrides):
+    data = {
+        "interface": "wlan5",
+        "history_size": 4,
+        "history_horizons": [8],
+        "paths": {"status_json": str(tmp_path / "status.json"), "state_dir": str(tmp_path),
+                  "status_shm": None, "action_history": str(tmp_path / "history.log")},
+        "features": {"sample_ring_records": 0},
+        "escalation": {"tiers": [{"name": "refresh_dhcp"}, {"name": "cycle_interface"}, {"name": "reboot"}]},
+    }
+    data.update(overrides)
+    return Config.from_dict(data)
+
+
+def test_window_export_restores_aggregates_exactly():
+    window = HealthWindow(4, [8])
+    for i in range(11):
+        window.add(WindowEntry(success_ratio=0.5 if i % 3 == 0 or i > 8 else 1.0, rssi=None if i == 5 else -50 - i))
+    restored = HealthWindow.restore(4, [8], json.loads(json.dumps(window.export())))
+    assert list(restored.entries()) == list(window.entries())
+    assert restored.aggregates() == window.aggregates()
+    assert restored.consecutive_non_full_success() == window.consecutive_non_full_success() == 2
+
+
+def _lost_monitor(tmp_path, monkeypatch):
+    monkeypatch.setattr(supervisor, "boot_id", lambda: "boot-1")
+    monitor = supervisor.InterfaceMonitor(make_cfg(tmp_path))
+    for _ in range(3):
+        monitor.window.add(WindowEntry(success_ratio=0.0, rssi=-70))
+    monitor.escalator._current_index = 1  # refresh_dhcp ran, cycle_interface is next
+    monitor.escalator._tier_states["refresh_dhcp"].last_invoked = time.time() - 30
+    monitor.escalator._last_reboot_ts = time.time() - 7200
+    monitor.current_interval = 40
+    monitor.close()  # writes the snapshot on shutdown
+    return monitor
+
+
+def test_restart_resumes_window_ladder_and_interval(tmp_path, monkeypatch):
+    before = _lost_monitor(tmp_path, monkeypatch)
+    after = supervisor.InterfaceMonitor(make_cfg(tmp_path))
+    assert list(after.window.entries()) == list(before.window.entries())
+    assert after.window.consecutive_non_full_success() == 3
+    assert after.escalator.export_state() == before.escalator.export_state()
+    assert after.current_interval == 40
+    after.close()
+
+
+def test_reboot_or_stale_snapshot_restores_less(tmp_path, monkeypatch):
+    before = _lost_monitor(tmp_path, monkeypatch)
+    invoked = before.escalator.export_state()["tiers"]["refresh_dhcp"]
+    last_reboot = before.escalator.export_state()["last_reboot_ts"]
+
+    monkeypatch.setattr(supervisor, "boot_id", lambda: "boot-2")
+    rebooted = supervisor.InterfaceMonitor(make_cfg(tmp_path))
+    assert len(rebooted.window) == 0 and rebooted.current_interval == 15  # old samples describe the old boot
+    state = rebooted.escalator.export_state()
+    # The ladder describes the old boot too; only the reboot spacing carries over.
+    assert state["ladder_tier"] == "refresh_dhcp" and state["tiers"]["refresh_dhcp"] == 0.0
+    assert state["last_reboot_ts"] == last_reboot
+    monkeypatch.setattr(supervisor, "boot_id", lambda: "boot-1")
+
+    path = snapshot_path(before.cfg)
+    data = json.loads(path.read_text())
+    data["written_ts"] -= 3600
+    data["escalation"]["tiers"]["reboot"] = time.time() + 600  # clock went backwards since
+    path.write_text(json.dumps(data))
+    stale = supervisor.InterfaceMonitor(make_cfg(tmp_path))
+    state = stale.escalator.export_state()
+    assert state["ladder_tier"] == "refresh_dhcp" and len(stale.window) == 0
+    assert state["tiers"] == {"refresh_dhcp": invoked, "cycle_interface": 0.0, "reboot": 0.0}
+
+    data["version"] = 99
+    path.write_text(json.dumps(data))
+    assert supervisor.InterfaceMonitor(make_cfg(tmp_path)).escalator.export_state()["tiers"]["refresh_dhcp"] == 0.0
+
+
+def test_reboot_tier_snapshot_is_written_after_the_reboot_is_allowed(tmp_path, monkeypatch):
+    import asyncio
+    import threading
+
+    from watchdog import recovery_steps
+    from watchdog.status import close_action_history
+
+    monkeypatch.setattr(supervisor, "boot_id", lambda: "boot-1")
+    cfg = make_cfg(tmp_path, verification={"enabled": False})
+    monitor = supervisor.InterfaceMonitor(cfg)
+    monitor.escalator._uptime_seconds = lambda: 1e6
+    seen = {}
+
+    def fake_reboot(c, control=None):
+        seen["thread"] = threading.current_thread().name
+        seen["snapshot"] = json.loads(snapshot_path(c).read_text())
+        return True
+
+    monkeypatch.setattr(recovery_steps, "reboot_system", fake_reboot)
+
+    async def scenario():
+        monitor._start_recovery(cfg.escalation.tiers[2])
+        while monitor._job is not None:
+            await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+    monitor.close()
+    close_action_history()
+    assert seen["thread"].startswith("recovery-")
+    assert seen["snapshot"]["escalation"]["last_reboot_ts"] == monitor.escalator.export_state()["last_reboot_ts"] > 0
@@ -0,0 +1,71 @@
+from watchdog.config import Config
+from watchdog.metrics import ClassificationResult, HealthState
+from watchdog.shm_status import read_status_segment
+from watchdog.status import write_status
+
+
+def test_status_written_on_change_and_mirrored_to_shm(tmp_path):
+    status = tmp_path / "status.json"
+    cfg = Config.from_dict({
+        "interface": "wlan9",
+        "paths": {"status_json": str(status), "status_shm": str(tmp_path / "status.bin")},
+        "features": {"status_heartbeat_seconds": 3600},
+    })
+    healthy = ClassificationResult(state=HealthState.HEALTHY, fail_ratio=0.0, consecutive_fail_packets=0, rssi=-50)
+    write_status(cfg, healthy, {"invoked_tier": None})
+    first_mtime = status.stat().st_mtime_ns
+    status.write_text("sentinel")
+    write_status(cfg, healthy, {"invoked_tier": None})
+    assert status.read_text() == "sentinel"  # unchanged content: no rewrite
+
+    lost = ClassificationResult(state=HealthState.LOST, fail_ratio=1.0, consecutive_fail_packets=6, rssi=None)
+    write_status(cfg, lost, {"invoked_tier": "refresh_dhcp"})
+    assert '"state":"LOST"' in status.read_text()
+    assert status.stat().st_mtime_ns >= first_mtime
+    assert not list(tmp_path.glob(".*.tmp"))
+
+    rec = read_status_segment(tmp_path / "status.bin")
+    assert rec is not None
+    assert (rec.interface, rec.state, rec.invoked_tier, rec.rssi, rec.cycles) == ("wlan9", "LOST", "refresh_dhcp", None, 3)
+
+
+def test_gateway_rtt_and_lease_jitter_do_not_rewrite_status(tmp_path):
+    status = tmp_path / "status.json"
+    cfg = Config.from_dict({
+        "interface": "wlan9",
+        "paths": {"status_json": str(status), "status_shm": None},
+        "features": {"status_heartbeat_seconds": 3600},
+    })
+    healthy = ClassificationResult(state=HealthState.HEALTHY, fail_ratio=0.0, consecutive_fail_packets=0, rssi=-50)
+
+    def gateway(latency_ms, lease, reachable=True):
+        return {"invoked_tier": None, "gateway": {"address": "192.168.1.1", "reachable": reachable, "arp": reachable,
+                                                  "icmp": reachable, "latency_ms": latency_ms,
+                                                  "lease_remaining_s": lease}}
+
+    write_status(cfg, healthy, gateway(1.2, 3000))
+    status.write_text("sentinel")
+    write_status(cfg, healthy, gateway(3.9, 2985))
+    assert status.read_text() == "sentinel"
+    write_status(cfg, healthy, gateway(None, 2970, reachable=False))
+    assert '"reachable":false' in status.read_text()
+
+
+def test_rssi_jitter_does_not_rewrite_status(tmp_path):
+    status = tmp_path / "status.json"
+    cfg = Config.from_dict({
+        "interface": "wlan9",
+        "paths": {"status_json": str(status), "status_shm": None},
+        "features": {"status_heartbeat_seconds": 3600},
+    })
+
+    def at(rssi):
+        return ClassificationResult(state=HealthState.HEALTHY, fail_ratio=0.0, consecutive_fail_packets=0, rssi=rssi)
+
+    write_status(cfg, at(-61), {"invoked_tier": None})
+    status.write_text("sentinel")
+    for rssi in (-63, -59, -64, -60, -58, -62):  # a steady link, +/- 3 dB
+        write_status(cfg, at(rssi), {"invoked_tier": None})
+    assert status.read_text() == "sentinel"
+    write_status(cfg, at(-67), {"invoked_tier": None})  # a real move
+    assert '"rssi":-67' in status.read_text()
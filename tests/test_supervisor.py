@@ -0,0 +1,177 @@
+import asyncio
+import json
+import threading
+import time
+
+from watchdog import supervisor
+from watchdog.command_runner import CommandResult
+from watchdog.config import Config, interface_configs
+from watchdog.connectivity import ConnectivitySnapshot, DnsResult, LinkMetrics, PingResult
+from watchdog.status import close_action_history
+from watchdog.supervisor import Supervisor
+
+
+def test_interfaces_run_independently(tmp_path, monkeypatch):
+    cfg = Config.from_dict({
+        "paths": {"status_json": str(tmp_path / "status.json"), "state_dir": str(tmp_path),
+                  "status_shm": str(tmp_path / "status.bin"),
+                  "action_history": str(tmp_path / "history.log")},
+        "escalation": {"tiers": [{"name": "refresh_dhcp", "enabled": True, "min_interval_seconds": 0}]},
+        "interfaces": ["wlan0", "wlan1"],
+    })
+    cfgs = interface_configs(cfg)
+    assert [c.interface for c in cfgs] == ["wlan0", "wlan1"]
+
+    async def fake_snapshot(c):
+        ok = c.interface == "wlan0"
+        return ConnectivitySnapshot(
+            ping_results=[PingResult(host="h", success=ok, latency_ms=1.0)],
+            dns_result=DnsResult(hostname="example.com", success=ok, latency_ms=1.0),
+            http_result=None,
+            link=LinkMetrics(rssi=-50, bitrate_mbps=72.2),
+        )
+
+    monkeypatch.setattr(supervisor, "gather_snapshot_async", fake_snapshot)
+    sup = Supervisor(cfgs)
+    slow, fast = sup.monitors[1], sup.monitors[0]
+    monkeypatch.setattr(slow.escalator, "_invoke_tier", lambda tier, control=None: time.sleep(0.5) or True)
+
+    async def scenario():
+        t0 = time.perf_counter()
+        slow_task = asyncio.create_task(slow.run_cycle())
+        await fast.run_cycle()
+        fast_elapsed = time.perf_counter() - t0
+        await slow_task
+        return fast_elapsed
+
+    fast_elapsed = asyncio.run(scenario())
+    for m in sup.monitors:
+        m.close()
+    assert fast_elapsed < 0.3  # not held up by wlan1's recovery action
+    s0 = json.loads((tmp_path / "status.wlan0.json").read_text())
+    s1 = json.loads((tmp_path / "status.wlan1.json").read_text())
+    assert (s0["interface"], s0["state"]) == ("wlan0", "HEALTHY")
+    assert s1["interface"] == "wlan1" and s1["invoked_tier"] == "refresh_dhcp"
+
+
+def test_cadence_runs_probe_kinds_on_their_own_periods(tmp_path, monkeypatch):
+    cfg = Config.from_dict({
+        "interface": "wlan7",
+        "paths": {"status_json": str(tmp_path / "status.json"), "state_dir": str(tmp_path),
+                  "status_shm": None, "action_history": str(tmp_path / "history.log")},
+        "features": {"sample_ring_records": 0},
+        "adaptive": {"enabled": False},
+        "gateway": {"enabled": False},
+        "cadence": {"enabled": True, "link": {"period_seconds": 0.02, "jitter": 0},
+                    "ping": {"period_seconds": 0.1, "jitter": 0}, "dns": {"period_seconds": 10}},
+    })
+    link = LinkMetrics(rssi=-50, bitrate_mbps=72.2)
+
+    async def fake_snapshot(c):
+        return ConnectivitySnapshot(
+            ping_results=[PingResult(host="h", success=True, latency_ms=1.0)],
+            dns_result=DnsResult(hostname="example.com", success=True, latency_ms=1.0),
+            http_result=None, link=link,
+        )
+
+    calls = {"link": 0, "ping": 0, "dns": 0}
+
+    async def fake_probe(c, kind):
+        calls[kind] += 1
+        if kind == "ping":
+            return [PingResult(host="h", success=True, latency_ms=1.0)]
+        if kind == "link":
+            # Signal collapses after a few samples; status must follow before the next ping round.
+            return LinkMetrics(rssi=-90 if calls["link"] > 3 else -50, bitrate_mbps=72.2)
+        return DnsResult(hostname="example.com", success=True, latency_ms=1.0)
+
+    monkeypatch.setattr(supervisor, "gather_snapshot_async", fake_snapshot)
+    monkeypatch.setattr("watchdog.scheduler.probe_once", fake_probe)
+    monitor = supervisor.InterfaceMonitor(cfg)
+    cycles = []
+    original = monitor.run_cycle
+
+    async def counting(snapshot=None):
+        cycles.append(snapshot)
+        return await original(snapshot)
+
+    monitor.run_cycle = counting
+
+    async def scenario():
+        stop = asyncio.Event()
+        task = asyncio.create_task(monitor.run(stop))
+        await asyncio.sleep(0.35)
+        stop.set()
+        await task
+
+    asyncio.run(scenario())
+    monitor.close()
+    assert calls["dns"] == 1  # 10 s period never came due; the RSSI collapse pulled it in once
+    assert calls["link"] > 2 * calls["ping"] >= 4
+    assert len(cycles) == 1 + calls["ping"]  # one seed cycle, then one per ping round
+    assert json.loads((tmp_path / "status.json").read_text())["state"] == "LOST"
+
+
+def test_tier_runs_in_background_and_aborts_when_link_answers(tmp_path, monkeypatch):
+    cfg = Config.from_dict({
+        "interface": "wlan5",
+        "paths": {"status_json": str(tmp_path / "status.json"), "state_dir": str(tmp_path),
+                  "status_shm": None, "action_history": str(tmp_path / "history.log")},
+        "features": {"sample_ring_records": 0},
+        "verification": {"enabled": False},
+        "escalation": {"tiers": [{"name": "restart_network_services", "min_interval_seconds": 0,
+                                  "services": ["a", "b", "c", "d"], "parallel": False}]},
+    })
+    link_up = False
+
+    async def fake_snapshot(c):
+        return ConnectivitySnapshot(
+            ping_results=[PingResult(host="h", success=link_up, latency_ms=1.0 if link_up else None)],
+            dns_result=DnsResult(hostname="example.com", success=link_up, latency_ms=1.0),
+            http_result=None, link=LinkMetrics(rssi=-50, bitrate_mbps=72.2),
+        )
+
+    restarted = []
+
+    def slow_restart(c, argv, timeout=10):
+        restarted.append(argv[-1])
+        time.sleep(0.1)
+        return CommandResult(argv=argv, returncode=0, stdout="", stderr="")
+
+    monkeypatch.setattr(supervisor, "gather_snapshot_async", fake_snapshot)
+    monkeypatch.setattr("watchdog.recovery_steps.run_command", slow_restart)
+    monitor = supervisor.InterfaceMonitor(cfg)
+    recorded_on = []
+    record = monitor.escalator.record_invocation
+
+    def record_invocation(tier, success):
+        recorded_on.append(threading.get_ident())
+        record(tier, success)
+
+    monitor.escalator.record_invocation = record_invocation
+
+    async def scenario():
+        nonlocal link_up
+        t0 = time.perf_counter()
+        await monitor.run_cycle()
+        assert time.perf_counter() - t0 < 0.05  # the tier does not hold up the cycle
+        while len(monitor._job.steps) < 2:
+            await asyncio.sleep(0.01)
+        await monitor.run_cycle()  # still down: no second tier while one is running
+        status = json.loads((tmp_path / "status.json").read_text())
+        assert status["recovering"]["tier"] == "restart_network_services"
+        assert status["recovering"]["step"] == "restart_service"
+        link_up = True
+        await monitor.run_cycle()
+        while monitor._job is not None:
+            await asyncio.sleep(0.02)
+
+    asyncio.run(scenario())
+    monitor.close()
+    close_action_history()
+    assert restarted == ["a", "b"]
+    assert recorded_on == [threading.get_ident()]  # history and counters only touched on the loop
+    events = [json.loads(line) for line in (tmp_path / "history.log").read_text().splitlines()]
+    done = [e for e in events if e["event"].startswith("tier_")]
+    assert [e["event"] for e in done] == ["tier_invoke", "tier_aborted"]
+    assert done[1]["reason"] == "link_recovered" and done[1]["steps"] == ["restart_service"] * 2
@@ -0,0 +1,69 @@
+import os
+import socket
+
+from watchdog import recovery_steps
+from watchdog.command_runner import CommandResult
+from watchdog.config import Config, EscalationTier
+from watchdog.usb_topology import UsbIndex
+
+
+def make_device(root, name, vid, pid, busnum, devnum):
+    d = root / name
+    d.mkdir()
+    for attr, value in (("idVendor", vid), ("idProduct", pid), ("busnum", busnum), ("devnum", devnum)):
+        (d / attr).write_text(f"{value}\n")
+    return d
+
+
+def fake_sysfs(tmp_path):
+    devices = tmp_path / "devices"
+    devices.mkdir()
+    make_device(devices, "usb1", "1d6b", "0002", 1, 1)
+    make_device(devices, "1-1", "2109", "3431", 1, 2)
+    dongle = make_device(devices, "1-1.3", "0BDA", "B812", 1, 5)
+    (dongle / "1-1.3:1.0").mkdir()
+    os.symlink(dongle / "1-1.3:1.0", devices / "1-1.3:1.0")
+    net = tmp_path / "net" / "wlan1"
+    net.mkdir(parents=True)
+    os.symlink(devices / "1-1.3:1.0", net / "device")
+    return devices
+
+
+def test_index_maps_ids_and_interfaces_and_rescans_only_on_usb_uevents(tmp_path):
+    devices = fake_sysfs(tmp_path)
+    index = UsbIndex(str(devices), str(tmp_path / "net"), listen=False)
+    ours, kernel = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    ours.setblocking(False)
+    index._sock = ours
+    dongle, = index.lookup("0bda:b812")
+    assert (dongle.name, dongle.dev_path) == ("1-1.3", "/dev/bus/usb/001/005")
+    assert (dongle.parent, dongle.hub_location, dongle.port) == ("1-1", "1-1", 3)
+    assert index.get("1-1").hub_location == "1" and index.get("1-1").port == 1
+    assert index.for_interface("wlan1") is dongle
+    assert index.for_interface("eth0") is None
+    assert index.scans == 1  # every lookup above came from memory
+
+    (devices / "1-1.3" / "devnum").write_text("6\n")  # re-enumerated after a reset
+    kernel.send(b"change@/devices/platform/soc/1-1/1-1.3\0ACTION=change\0SUBSYSTEM=net\0")
+    assert index.lookup("0bda:b812")[0].devnum == 5 and index.scans == 1
+    kernel.send(b"add@/devices/platform/soc/1-1/1-1.3\0ACTION=add\0SUBSYSTEM=usb\0DEVTYPE=usb_device\0")
+    assert index.lookup("0bda:b812")[0].devnum == 6 and index.scans == 2
+    index.close()
+    kernel.close()
+
+
+def test_power_cycle_hub_finds_the_dongle_port(tmp_path, monkeypatch):
+    index = UsbIndex(str(fake_sysfs(tmp_path)), str(tmp_path / "net"), listen=False)
+    calls = []
+
+    def fake_run(cfg, argv, timeout=10):
+        calls.append(argv[1:])
+        return CommandResult(argv=argv, returncode=0, stdout="", stderr="")
+
+    monkeypatch.setattr(recovery_steps, "USB_INDEX", index)
+    monkeypatch.setattr(recovery_steps, "run_command", fake_run)
+    monkeypatch.setattr(recovery_steps.shutil, "which", lambda name: "/usr/sbin/" + name)
+    monkeypatch.setattr(recovery_steps.time, "sleep", lambda s: None)
+    cfg = Config.from_dict({"interface": "wlan1"})
+    assert recovery_steps.power_cycle_hub(cfg, EscalationTier(name="power_cycle_hub"))
+    assert calls == [["-l", "1-1", "-p", "3", "-a", "off"], ["-l", "1-1", "-p", "3", "-a", "on"]]
@@ -0,0 +1,121 @@
+import asyncio
+import json
+
+from watchdog import supervisor, verify
+from watchdog.config import Config
+from watchdog.connectivity import PingResult, read_default_gateway
+from watchdog.metrics import ClassificationResult, HealthState
+from watchdog.status import close_action_history
+
+ROUTES = """Iface\tDestination\tGateway \tFlags\tRefCnt\tUse\tMetric\tMask\t\tMTU\tWindow\tIRTT
+eth0\t00000000\t0101A8C0\t0003\t0\t0\t100\t00000000\t0\t0\t0
+wlan0\t0032A8C0\t00000000\t0001\t0\t0\t600\t00FFFFFF\t0\t0\t0
+wlan0\t00000000\t0132A8C0\t0003\t0\t0\t600\t00000000\t0\t0\t0
+"""
+
+
+def test_default_gateway_per_interface(tmp_path):
+    routes = tmp_path / "route"
+    routes.write_text(ROUTES)
+    assert read_default_gateway("wlan0", str(routes)) == "192.168.50.1"
+    assert read_default_gateway("wlan1", str(routes)) is None
+
+
+def test_tier_verified_records_time_to_recover_and_holds_ladder(tmp_path, monkeypatch):
+    cfg = Config.from_dict({
+        "interface": "wlan3",
+        "hosts": {"ping": ["1.1.1.1"]},
+        "paths": {"status_json": str(tmp_path / "status.json"), "state_dir": str(tmp_path),
+                  "status_shm": None, "action_history": str(tmp_path / "history.log")},
+        "features": {"sample_ring_records": 0},
+        "verification": {"interval_ms": 10, "required_successes": 2, "holdoff_seconds": 60,
+                         "reference": "9.9.9.9"},
+        "escalation": {"tiers": [{"name": "refresh_dhcp", "min_interval_seconds": 0}]},
+    })
+    monkeypatch.setattr(verify, "read_default_gateway", lambda iface: "192.168.50.1")
+    rounds = []
+
+    async def fake_ping(hosts, timeout_ms, icmp, interface=None):
+        rounds.append(list(hosts))
+        ok = len(rounds) > 3
+        return [PingResult(host=h, success=ok, latency_ms=1.0 if ok else None) for h in hosts]
+
+    monkeypatch.setattr(verify, "ping_hosts_async", fake_ping)
+    monitor = supervisor.InterfaceMonitor(cfg)
+    lost = ClassificationResult(state=HealthState.LOST, fail_ratio=1.0, consecutive_fail_packets=6, rssi=-60)
+
+    async def scenario():
+        monitor._incident_started = supervisor.time.monotonic() - 5.0
+        monitor._start_verification("refresh_dhcp")
+        assert monitor.escalator.maybe_escalate(lost) is None  # held while verifying
+        await monitor._verification
+
+    asyncio.run(scenario())
+    close_action_history()
+    supervisor.write_status(cfg, lost, {"invoked_tier": None})
+    monitor.close()
+    assert rounds[0] == ["192.168.50.1", "9.9.9.9"] and len(rounds) == 5
+    record = json.loads((tmp_path / "history.log").read_text().splitlines()[-1])
+    assert record["event"] == "tier_verify" and record["recovered"] is True
+    assert 5.0 <= record["time_to_recover_s"] < 6.0
+    assert monitor.escalator.maybe_escalate(lost) is None  # holdoff after recovery
+    status = json.loads((tmp_path / "status.json").read_text())
+    assert status["recovery"]["refresh_dhcp"]["recovered"] == 1
+
+
+def test_shutdown_stops_verification_before_the_loop_closes(tmp_path, monkeypatch):
+    cfg = Config.from_dict({
+        "interface": "wlan3",
+        "paths": {"status_json": str(tmp_path / "status.json"), "state_dir": str(tmp_path),
+                  "status_shm": None, "action_history": str(tmp_path / "history.log")},
+        "features": {"sample_ring_records": 0},
+        "escalation": {"tiers": [{"name": "refresh_dhcp"}]},
+    })
+
+    async def endless(c):
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(supervisor, "verify_recovery", endless)
+    monitor = supervisor.InterfaceMonitor(cfg)
+    monitor.run_cycle = lambda snapshot=None: asyncio.sleep(0)
+
+    async def scenario():
+        monitor._start_verification("refresh_dhcp")
+        task = monitor._verification
+        stop = asyncio.Event()
+        stop.set()
+        await monitor.run(stop)
+        assert task.cancelled() and monitor._verification is None
+
+    asyncio.run(scenario())
+    # A verification started by a tier finishing during asyncio.run()'s teardown outlives the loop.
+    loop = asyncio.new_event_loop()
+    monitor._verification = loop.create_task(endless(cfg))
+    loop.run_until_complete(asyncio.sleep(0))
+    loop.close()
+    task = monitor._verification
+    monitor.close()  # must not raise "Event loop is closed"
+    task._log_destroy_pending = False  # left pending on purpose; keep its garbage collection quiet
+    close_action_history()
+
+
+def test_verification_picks_up_a_gateway_that_appears_mid_window(monkeypatch):
+    cfg = Config.from_dict({
+        "interface": "wlan3",
+        "hosts": {"ping": []},
+        "verification": {"interval_ms": 10, "required_successes": 2, "window_seconds": 2},
+        "escalation": {"tiers": [{"name": "refresh_dhcp"}]},
+    })
+    gateways = iter([None, None, "192.168.50.1", "192.168.60.1"])
+    monkeypatch.setattr(verify, "read_default_gateway", lambda iface: next(gateways, "192.168.60.1"))
+    pinged = []
+
+    async def fake_ping(hosts, timeout_ms, icmp, interface=None):
+        pinged.append(list(hosts))
+        return [PingResult(host=h, success=True, latency_ms=1.0) for h in hosts]
+
+    monkeypatch.setattr(verify, "ping_hosts_async", fake_ping)
+    result = asyncio.run(verify.verify_recovery(cfg))
+    # The lease arrives on the third round; a new gateway after it restarts the streak.
+    assert pinged == [["192.168.50.1"], ["192.168.60.1"], ["192.168.60.1"]]
+    assert result.recovered and result.targets == ["192.168.60.1"]